@@ -0,0 +1,4 @@
+"""okstdio 基准测试
+
+在仓库根目录运行 `python -m benchmarks`，结果写入 JSON 文件，便于在版本之间对比。
+"""
@@ -0,0 +1,117 @@
+"""基准测试入口
+
+在仓库根目录运行：
+
+    python -m benchmarks                                  # 运行全部用例
+    python -m benchmarks --quick                          # 缩小规模，快速检查
+    python -m benchmarks echo_latency payload_scaling     # 只运行指定用例
+    python -m benchmarks -o results/v1.0.1.json           # 指定结果文件
+    python -m benchmarks --compare old.json new.json      # 对比两次结果
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime, timezone
+from importlib import metadata
+from pathlib import Path
+
+from .cases import BENCHMARKS
+
+
+def _version() -> str:
+    try:
+        return metadata.version("okstdio")
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+async def _run(names: list[str], quick: bool) -> dict:
+    results = {}
+    for name in names:
+        print(f"== {name}", flush=True)
+        started = time.perf_counter()
+        rows = await BENCHMARKS[name](quick)
+        for row in rows:
+            print(f"   {json.dumps(row, ensure_ascii=False)}", flush=True)
+        results[name] = {"seconds": round(time.perf_counter() - started, 3), "results": rows}
+    return results
+
+
+def _headline(row: dict) -> float | None:
+    """结果行的主要指标：吞吐量（越大越好）或 p50 延迟（越小越好，取负值）"""
+    for key in ("req_per_s", "mb_per_s", "msg_per_s", "round_trips_per_s"):
+        if key in row:
+            return row[key]
+    for key in ("latency", "system_request"):
+        if key in row and row[key].get("p50_ms") is not None:
+            return -row[key]["p50_ms"]
+    return None
+
+
+def _compare(old_path: str, new_path: str) -> None:
+    """逐行对比两次结果的主要指标，正的百分比表示变好"""
+    old = json.loads(Path(old_path).read_text(encoding="utf-8"))["benchmarks"]
+    new = json.loads(Path(new_path).read_text(encoding="utf-8"))["benchmarks"]
+    for name, result in new.items():
+        if name not in old:
+            continue
+        print(f"== {name}")
+        for old_row, new_row in zip(old[name]["results"], result["results"]):
+            before, after = _headline(old_row), _headline(new_row)
+            if not before or after is None:
+                continue
+            label = ", ".join(
+                f"{key}={value}"
+                for key, value in new_row.items()
+                if not isinstance(value, dict) and key not in ("seconds",)
+            )
+            change = (after - before) / abs(before) * 100
+            print(f"   {change:+7.1f}%  {label}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="okstdio 基准测试")
+    parser.add_argument("names", nargs="*", metavar="NAME", help=f"要运行的用例，默认全部：{', '.join(BENCHMARKS)}")
+    parser.add_argument("--quick", action="store_true", help="缩小规模，快速检查")
+    parser.add_argument("-o", "--output", default="benchmark-results.json", help="结果文件，默认 benchmark-results.json")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="对比两个结果文件")
+    args = parser.parse_args()
+
+    if args.compare:
+        _compare(*args.compare)
+        return 0
+
+    unknown = [name for name in args.names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"未知的用例: {', '.join(unknown)}")
+    names = args.names or list(BENCHMARKS)
+
+    started_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    results = asyncio.run(_run(names, args.quick))
+    report = {
+        "meta": {
+            "okstdio": _version(),
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "quick": args.quick,
+            "started_at": started_at,
+        },
+        "benchmarks": results,
+    }
+    output = Path(args.output)
+    if output.parent != Path("."):
+        output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"结果已写入 {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,337 @@
+"""基准测试用例
+
+每个用例是一个协程函数，接收 quick 参数（缩小规模的快速模式），
+返回可 JSON 序列化的结果行列表。延迟统计使用 LatencyHistogram 的快照（毫秒）。
+"""
+
+import asyncio
+import os
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from okstdio.client import ClientManager, ForkServer, RPCClient
+from okstdio.general import JSONRPCResponse, LatencyHistogram
+from okstdio.server import RPCRouter, RPCServer
+
+
+# 基准测试服务器模块，需在仓库根目录运行
+SERVER = "benchmarks.server"
+
+Benchmark = Callable[[bool], Awaitable[List[dict]]]
+
+BENCHMARKS: Dict[str, Benchmark] = {}
+
+
+def benchmark(name: str) -> Callable[[Benchmark], Benchmark]:
+    """注册基准测试用例"""
+
+    def decorator(func: Benchmark) -> Benchmark:
+        BENCHMARKS[name] = func
+        return func
+
+    return decorator
+
+
+def _rate(count: float, seconds: float) -> float:
+    return round(count / seconds, 1) if seconds > 0 else 0.0
+
+
+async def _warm_up(client: RPCClient, count: int = 200) -> None:
+    await asyncio.gather(*(client.call("echo", {"data": "x"}) for _ in range(count)))
+
+
+@benchmark("echo_latency")
+async def echo_latency(quick: bool) -> List[dict]:
+    """逐个发送小请求的往返延迟"""
+    count = 500 if quick else 5000
+    histogram = LatencyHistogram()
+    async with RPCClient("bench", SERVER) as client:
+        await _warm_up(client)
+        started = time.perf_counter()
+        for _ in range(count):
+            sent = time.perf_counter()
+            await client.call("echo", {"data": "x"})
+            histogram.record(time.perf_counter() - sent)
+        elapsed = time.perf_counter() - started
+    return [
+        {
+            "requests": count,
+            "seconds": round(elapsed, 4),
+            "req_per_s": _rate(count, elapsed),
+            "latency": histogram.snapshot(),
+        }
+    ]
+
+
+@benchmark("pipelined_throughput")
+async def pipelined_throughput(quick: bool) -> List[dict]:
+    """不同客户端并发度下的流水线吞吐量（服务器 max_concurrency=64）"""
+    total = 2000 if quick else 20000
+    rows = []
+    async with RPCClient("bench", SERVER, "64") as client:
+        await _warm_up(client)
+        for concurrency in (1, 8, 64, 512):
+            per_worker = max(1, total // concurrency)
+
+            async def worker():
+                for _ in range(per_worker):
+                    await client.call("echo", {"data": "x"})
+
+            started = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+            elapsed = time.perf_counter() - started
+            requests = per_worker * concurrency
+            rows.append(
+                {
+                    "concurrency": concurrency,
+                    "requests": requests,
+                    "seconds": round(elapsed, 4),
+                    "req_per_s": _rate(requests, elapsed),
+                }
+            )
+    return rows
+
+
+@benchmark("payload_scaling")
+async def payload_scaling(quick: bool) -> List[dict]:
+    """请求和响应大小从 100 B 到 50 MB 的往返吞吐量"""
+    sizes = [100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000, 50_000_000]
+    budget = 2_000_000 if quick else 50_000_000
+    if quick:
+        sizes = [size for size in sizes if size <= 1_000_000]
+    rows = []
+    async with RPCClient("bench", SERVER) as client:
+        await _warm_up(client)
+        for size in sizes:
+            data = "x" * size
+            rounds = max(2, min(1000, budget // size))
+            started = time.perf_counter()
+            for _ in range(rounds):
+                await client.call("echo", {"data": data})
+            elapsed = time.perf_counter() - started
+            rows.append(
+                {
+                    "size": size,
+                    "rounds": rounds,
+                    "seconds": round(elapsed, 4),
+                    "round_trips_per_s": _rate(rounds, elapsed),
+                    # 请求和响应各传输一次
+                    "mb_per_s": _rate(2 * size * rounds / 1_000_000, elapsed),
+                }
+            )
+    return rows
+
+
+@benchmark("stream_rate")
+async def stream_rate(quick: bool) -> List[dict]:
+    """IOWrite 推送速率，包括启用额度流控时"""
+    rows = []
+    async with RPCClient("bench", SERVER) as client:
+        await _warm_up(client)
+        for size in (100, 10_000):
+            count = (2000 if quick else 20000) if size <= 100 else (200 if quick else 2000)
+            for credit in (None, 64):
+                stream_id = f"stream-{size}-{credit}"
+                async with client.stream(stream_id, credit=credit, timeout=30) as listener:
+                    started = time.perf_counter()
+                    future = client.call(
+                        "stream", {"stream_id": stream_id, "count": count, "size": size}
+                    )
+                    for _ in range(count):
+                        await listener.get()
+                    await future
+                    elapsed = time.perf_counter() - started
+                rows.append(
+                    {
+                        "size": size,
+                        "credit": credit,
+                        "messages": count,
+                        "seconds": round(elapsed, 4),
+                        "msg_per_s": _rate(count, elapsed),
+                        "mb_per_s": _rate(size * count / 1_000_000, elapsed),
+                    }
+                )
+    return rows
+
+
+@benchmark("broadcast_fanout")
+async def broadcast_fanout(quick: bool) -> List[dict]:
+    """ClientManager.broadcast 扇出到 1 ~ 256 个子进程的延迟
+
+    POSIX 平台上子进程由 ForkServer 派生，以降低启动时间和内存占用。
+    """
+    children = (1, 4, 16) if quick else (1, 4, 16, 64, 256)
+    rounds = 10 if quick else 50
+    fork_server: Optional[ForkServer] = None
+    if os.name == "posix":
+        fork_server = ForkServer(SERVER)
+        await fork_server.start()
+
+    rows = []
+    try:
+        for count in children:
+            async with ClientManager() as manager:
+                for i in range(count):
+                    manager.add(f"bench{i}", SERVER, fork_server=fork_server)
+                started = time.perf_counter()
+                await manager.start_all()
+                start_seconds = time.perf_counter() - started
+
+                await manager.broadcast("echo", {"data": "x"})
+                histogram = LatencyHistogram()
+                for _ in range(rounds):
+                    sent = time.perf_counter()
+                    results = await manager.broadcast("echo", {"data": "x"})
+                    histogram.record(time.perf_counter() - sent)
+                    assert all(result.error is None for result in results)
+            rows.append(
+                {
+                    "children": count,
+                    "spawn": "fork_server" if fork_server else "exec",
+                    "start_seconds": round(start_seconds, 4),
+                    "rounds": rounds,
+                    "latency": histogram.snapshot(),
+                }
+            )
+    finally:
+        if fork_server is not None:
+            await fork_server.close()
+    return rows
+
+
+@benchmark("cold_start")
+async def cold_start(quick: bool) -> List[dict]:
+    """RPCClient.start 冷启动耗时（到收到就绪通知为止）"""
+    samples = 3 if quick else 10
+    rows = []
+
+    async def measure(fork_server: Optional[ForkServer]) -> LatencyHistogram:
+        histogram = LatencyHistogram()
+        for _ in range(samples):
+            client = RPCClient("bench", SERVER, fork_server=fork_server)
+            started = time.perf_counter()
+            await client.start()
+            histogram.record(time.perf_counter() - started)
+            await client.stop()
+        return histogram
+
+    rows.append({"spawn": "exec", "samples": samples, "latency": (await measure(None)).snapshot()})
+
+    if os.name == "posix":
+        fork_server = ForkServer(SERVER)
+        started = time.perf_counter()
+        await fork_server.start()
+        preload_seconds = time.perf_counter() - started
+        try:
+            histogram = await measure(fork_server)
+        finally:
+            await fork_server.close()
+        rows.append(
+            {
+                "spawn": "fork_server",
+                "samples": samples,
+                "preload_seconds": round(preload_seconds, 4),
+                "latency": histogram.snapshot(),
+            }
+        )
+    return rows
+
+
+def _build_tree(routers: int, methods: int) -> RPCServer:
+    """构建包含 routers 个路由器、每个路由器 methods 个方法的服务器"""
+    server = RPCServer("tree")
+
+    def method(user_id: int, name: str = "", tags: Optional[List[str]] = None) -> dict:
+        """基准测试方法"""
+        return {}
+
+    for r in range(routers):
+        router = RPCRouter(f"router{r}", label=f"路由器 {r}")
+        for m in range(methods):
+            router.add_method(name=f"method{m}", label=f"方法 {m}")(method)
+        server.include_router(router)
+    return server
+
+
+@benchmark("method_tree")
+async def method_tree(quick: bool) -> List[dict]:
+    """大型路由树上 get_method_tree() 与 __system__ 请求的耗时（进程内）
+
+    __system__ 的方法树在首次请求时生成并缓存；system_conditional 为携带 etag 的条件请求。
+    """
+    shapes = ((10, 10), (50, 20)) if quick else ((10, 10), (50, 20), (200, 20))
+    rounds = 5 if quick else 20
+    request = b'{"jsonrpc":"2.0","id":1,"method":"__system__","params":{}}'
+    rows = []
+    for routers, methods in shapes:
+        server = _build_tree(routers, methods)
+
+        tree = LatencyHistogram()
+        for _ in range(rounds):
+            started = time.perf_counter()
+            server.get_method_tree()
+            tree.record(time.perf_counter() - started)
+
+        system = LatencyHistogram()
+        size = 0
+        for _ in range(rounds):
+            started = time.perf_counter()
+            response = await server.handle_request(request)
+            assert isinstance(response, JSONRPCResponse)
+            size = len(response.encode("utf-8"))
+            system.record(time.perf_counter() - started)
+
+        etag = response.result["etag"]
+        conditional_request = (
+            b'{"jsonrpc":"2.0","id":1,"method":"__system__","params":{"etag":"%s"}}'
+            % etag.encode()
+        )
+        conditional = LatencyHistogram()
+        for _ in range(rounds):
+            started = time.perf_counter()
+            response = await server.handle_request(conditional_request)
+            assert response.result["not_modified"]
+            response.encode("utf-8")
+            conditional.record(time.perf_counter() - started)
+
+        rows.append(
+            {
+                "routers": routers,
+                "methods": routers * methods,
+                "rounds": rounds,
+                "response_bytes": size,
+                "get_method_tree": tree.snapshot(),
+                "system_request": system.snapshot(),
+                "system_conditional": conditional.snapshot(),
+            }
+        )
+    return rows
+
+
+@benchmark("result_cache")
+async def result_cache(quick: bool) -> List[dict]:
+    """启用结果缓存前后，同一查询请求在服务器内的处理耗时（进程内）"""
+    rounds = 2000 if quick else 20000
+    server = RPCServer("cache")
+
+    def lookup(user_id: int, fields: Optional[List[str]] = None) -> dict:
+        """基准测试查询"""
+        return {"id": user_id, "fields": fields, "profile": {str(i): i for i in range(50)}}
+
+    server.add_method(name="plain")(lookup)
+    server.add_method(name="cached", cache=True)(lookup)
+
+    rows = []
+    for method in ("plain", "cached"):
+        request = (
+            b'{"jsonrpc":"2.0","id":1,"method":"%s","params":{"user_id":1,"fields":["a","b"]}}'
+            % method.encode()
+        )
+        histogram = LatencyHistogram()
+        for _ in range(rounds):
+            started = time.perf_counter()
+            response = await server.handle_request(request)
+            response.encode("utf-8")
+            histogram.record(time.perf_counter() - started)
+        rows.append({"method": method, "rounds": rounds, "latency": histogram.snapshot()})
+    return rows
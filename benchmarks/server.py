@@ -0,0 +1,35 @@
+"""基准测试服务器
+
+启动参数：max_concurrency（可选，默认 1）
+
+    python -m benchmarks.server 64
+"""
+
+import sys
+
+from okstdio.server import RPCServer, IOWrite
+
+
+app = RPCServer("bench", label="基准测试服务器")
+
+
+@app.add_method(name="echo", label="回显")
+def echo(data: str = "") -> str:
+    """原样返回 data"""
+    return data
+
+
+@app.add_method(name="stream", label="流式推送")
+async def stream(stream_id: str, count: int, size: int, io_write: IOWrite) -> int:
+    """向 stream_id 连续推送 count 条长度为 size 的消息"""
+    payload = "x" * size
+    for _ in range(count):
+        await io_write.write({"id": stream_id, "result": payload})
+    return count
+
+
+if __name__ == "__main__":
+    # 在入口处解析参数，模块被 ForkServer 预加载时不读取 sys.argv
+    if len(sys.argv) > 1:
+        app.max_concurrency = int(sys.argv[1])
+    app.runserver()
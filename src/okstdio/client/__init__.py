@@ -3,8 +3,30 @@
 提供基于 Stdio 的 JSON-RPC 客户端实现，用于与子进程进行通信。
 """
 
-from .application import RPCClient, StreamListener
+from .application import RPCClient, RPCBatch, StreamListener
 from .future import RPCFuture
-from .manager import ClientManager, BroadcastResult
+from .manager import ClientManager, BroadcastResult, WarmPool
+from .group import ClientGroup
+from .hashring import HashRing
+from .forkserver import ForkServer, ForkedProcess
+from .ids import counter_ids, prefixed_ids
+from .stream import StreamQueue
+from .metrics import ClientMetrics
 
-__all__ = ["RPCClient", "RPCFuture", "StreamListener", "ClientManager", "BroadcastResult"]
+__all__ = [
+    "RPCClient",
+    "RPCBatch",
+    "RPCFuture",
+    "StreamListener",
+    "StreamQueue",
+    "ClientMetrics",
+    "ClientManager",
+    "BroadcastResult",
+    "WarmPool",
+    "ClientGroup",
+    "HashRing",
+    "ForkServer",
+    "ForkedProcess",
+    "counter_ids",
+    "prefixed_ids",
+]
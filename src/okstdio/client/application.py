@@ -4,21 +4,51 @@
 客户端通过标准输入输出与子进程进行 JSON-RPC 协议的消息交换。
 """
 
-from typing import Callable, Any, Optional, Dict
+from typing import TYPE_CHECKING, Annotated, Callable, Any, Optional, Dict, Iterable, List, Tuple, Union
 from contextlib import asynccontextmanager
 import asyncio
 import sys
 import os
+import re
 import subprocess
-import uuid
 import json
 import logging
 import shutil
-from pydantic import ValidationError
+import time
+from pydantic import Field, TypeAdapter, ValidationError
 
 from ..general.jsonrpc_model import *
 from ..general.errors import *
 from .future import RPCFuture
+from .ids import IDGenerator, counter_ids
+from .stream import OverflowPolicy, StreamQueue
+from .metrics import ClientMetrics, RequestTiming
+
+if TYPE_CHECKING:
+    from .forkserver import ForkServer
+
+
+# 服务器发往客户端的消息：响应、错误响应或服务器通知。
+# 三者分别以必填的 result / error / method 字段区分，按顺序尝试即可确定类型；
+# 成功响应（最常见的情况）只需一次校验。可调用对象形式的 Discriminator 需要先把消息
+# 构造为 Python 字典再回调判别函数，实测反而比按顺序校验更慢。
+JSONRPCMessage = Annotated[
+    Union[JSONRPCResponse, JSONRPCError, JSONRPCNotification],
+    Field(union_mode="left_to_right"),
+]
+
+# 预先编译的校验器，直接从字节一次完成 JSON 解析和模型构造
+_MESSAGE_ADAPTER: TypeAdapter[JSONRPCMessage] = TypeAdapter(JSONRPCMessage)
+_BATCH_ADAPTER: TypeAdapter[List[JSONRPCMessage]] = TypeAdapter(List[JSONRPCMessage])
+
+# read_loop 单次读取的最大字节数
+_READ_CHUNK_SIZE = 64 * 1024
+
+# 待写出数据超过该字节数时，发送方等待 stdin 写出
+_WRITE_HIGH_WATER = 1024 * 1024
+
+# 批量响应以 "[" 开头（允许前导空白），只匹配开头，不扫描整条消息
+_BATCH_PREFIX = re.compile(rb"[ \t\r\n]*\[")
 
 
 class StreamListener:
@@ -50,6 +80,44 @@ class StreamListener:
         return await self._queue.get()
 
 
+class RPCBatch:
+    """批量调用收集器，由 RPCClient.batch() 创建
+
+    登记的调用在退出 RPCClient.batch() 上下文时以一个批量请求发送。
+
+    例子：
+        ```python
+        async with client.batch() as batch:
+            f1 = batch.call("healthy")
+            f2 = batch.call("hello", {"name": "张三"})
+        print(await f1, await f2)
+        ```
+    """
+
+    def __init__(self, client: "RPCClient", timeout: Optional[float] = None):
+        self._client = client
+        self._timeout = timeout
+        self.requests: List[JSONRPCRequest] = []
+
+    def call(self, method: str, params: Any = None) -> RPCFuture:
+        """登记一个调用
+
+        Args:
+            method: 要调用的 RPC 方法名称
+            params: 方法参数
+
+        Returns:
+            RPCFuture: 批量请求发送后可 await 的 Future，支持 then/error 链式调用
+        """
+        request, future = self._client._register_request(method, params)
+        self.requests.append(request)
+        timing = self._client._timings.get(request.id)
+        return RPCFuture(future, timeout=self._timeout, timing=timing)
+
+    def __len__(self) -> int:
+        return len(self.requests)
+
+
 class RPCClient:
     """RPC 客户端
 
@@ -74,37 +142,114 @@ class RPCClient:
 
     Args:
         client_name: 客户端名称，用于日志标识，默认 "rpc_client"
+        raw_responses: 为 True 时跳过模型构造，响应以原始字典交付（Future、监听队列），默认 False
+        id_generator: 请求 ID 生成器，默认为从 1 开始递增的整数
+        ready_timeout: 启动时等待服务器就绪通知的最长时间（秒），默认 10.0
+        fork_server: 由 ForkServer 派生子进程（仅 POSIX），默认 None 即每次启动新的解释器
+        metrics: 是否按方法统计请求各阶段耗时，默认 False
+        max_line_length: 单条响应的最大字节数，超出的行被丢弃并记录错误日志，默认 None（不限制）
 
     Raises:
         RuntimeError: 当客户端未启动时发送请求
         RuntimeError: 当子进程启动失败时
     """
 
-    def __init__(self, client_name: str = "rpc_client", app: Optional[str] = None, *extra_args):
+    def __init__(
+        self,
+        client_name: str = "rpc_client",
+        app: Optional[str] = None,
+        *extra_args,
+        raw_responses: bool = False,
+        id_generator: Optional[IDGenerator] = None,
+        ready_timeout: Optional[float] = 10.0,
+        fork_server: Optional["ForkServer"] = None,
+        metrics: bool = False,
+        max_line_length: Optional[int] = None,
+    ):
         """初始化 RPC 客户端
 
         Args:
             client_name: 客户端名称，用于日志标识
             app: 应用程序路径，传入后 async with 会自动启动
             *extra_args: 应用程序启动参数
+            raw_responses: 为 True 时响应只做 JSON 解析，以字典形式交付，不构造模型。
+                call() 返回的 RPCFuture 行为不变；send() 的 Future 和监听队列得到的是字典
+            id_generator: 请求 ID 生成器（无参数可调用对象），默认 counter_ids()，
+                即每个客户端从 1 开始递增的整数。多个客户端共用日志时可使用 prefixed_ids()
+            ready_timeout: start() 等待服务器 __ready__ 就绪通知的最长时间（秒），默认 10.0。
+                为 None 时不等待就绪通知（用于不发送就绪通知的服务器）
+            fork_server: 已启动的 ForkServer。指定后子进程由它从预加载好的进程 fork 出来，
+                app 默认为 fork_server.app
+            metrics: 是否按方法统计请求各阶段耗时（排队、反压等待、响应、恢复执行、then 处理器、
+                总耗时），默认 False。统计结果见 self.metrics，也可稍后调用 enable_metrics() 启用
+            max_line_length: 单条响应（一行）的最大字节数，默认 None 即不限制。
+                超出的行被丢弃并记录错误日志，之后的行照常处理，防止异常的子进程输出耗尽内存
         """
-        self._lock = asyncio.Lock()
         self._running = False
         self._read_task: Optional[asyncio.Task] = None
         self._pending_future: Dict[
             int | str, asyncio.Future[JSONRPCResponse | JSONRPCError]
         ] = {}
-        self._listen_queue: Dict[
-            int | str, asyncio.Queue[JSONRPCResponse | JSONRPCError]
-        ] = {}
+        self._listen_queue: Dict[int | str, StreamQueue] = {}
 
         self.client_name = client_name
-        self._app = app
+        self._app = app or (fork_server.app if fork_server is not None else None)
         self._extra_args = extra_args
+        self._raw_responses = raw_responses
+        self._next_id: IDGenerator = id_generator or counter_ids()
+        self._ready_timeout = ready_timeout
+        self._fork_server = fork_server
+        self._max_line_length = max_line_length
+        self._ready: Optional[asyncio.Future] = None
+        # 待写出的帧片段，同一事件循环迭代内的写入合并为一次写出
+        self._out_chunks: List[bytes] = []
+        self._out_size = 0
+        self._flush_handle: Optional[asyncio.Handle] = None
+        self._drain_task: Optional[asyncio.Future] = None
+        # 请求各阶段耗时统计，未启用时为 None
+        self.metrics: Optional[ClientMetrics] = ClientMetrics() if metrics else None
+        # 请求 ID → 计时点，以及尚未写出的请求的计时点
+        self._timings: Dict[int | str, RequestTiming] = {}
+        self._unflushed: List[RequestTiming] = []
+        # 最近一次获取的服务器方法树，再次获取时携带其 etag 进行条件请求
+        self._method_tree: Optional[dict] = None
         self.process: Optional[asyncio.subprocess.Process] = None
         self.logger = logging.getLogger(self.client_name)
 
-    def add_listen_queue(self, listen_id: int | str):
+    @property
+    def running(self) -> bool:
+        """客户端是否已启动且未停止"""
+        return self._running
+
+    @property
+    def pending_count(self) -> int:
+        """已发送、尚未收到响应的请求数量"""
+        return len(self._pending_future)
+
+    def enable_metrics(self) -> ClientMetrics:
+        """启用请求耗时统计，已启用时返回现有的统计对象
+
+        Returns:
+            ClientMetrics: 统计对象
+        """
+        if self.metrics is None:
+            self.metrics = ClientMetrics()
+        return self.metrics
+
+    def disable_metrics(self) -> None:
+        """停用请求耗时统计并丢弃已有统计"""
+        self.metrics = None
+        self._timings.clear()
+        self._unflushed.clear()
+
+    def add_listen_queue(
+        self,
+        listen_id: int | str,
+        maxsize: int = 0,
+        overflow: OverflowPolicy = "block",
+        *,
+        credit: Optional[int] = None,
+    ) -> StreamQueue:
         """添加监听队列
 
         用于接收服务器主动推送的消息。当收到的消息 ID 匹配监听队列 ID 时，
@@ -112,40 +257,63 @@ class RPCClient:
 
         Args:
             listen_id: 监听队列的 ID
+            maxsize: 队列容量，小于等于 0 时不限制，默认 0
+            overflow: 队列满时的溢出策略（"block" / "drop_oldest" / "drop_newest" / "latest"），
+                默认 "block"，详见 StreamQueue
+            credit: 流控额度。指定后立即向服务器发放该额度，服务器端 IOWrite.write 向该 ID
+                推送的未消费消息达到额度时等待，消息被取出后归还额度。默认 None 即不启用流控
 
         Returns:
-            asyncio.Queue: 创建的监听队列，如果已存在则返回现有队列
-        """
-        if self._listen_queue.get(listen_id):
-            return
-        self._listen_queue[listen_id] = asyncio.Queue()
-        return self._listen_queue[listen_id]
+            StreamQueue: 创建的监听队列，如果已存在则返回现有队列
 
-    def get_listen_queue(self, listen_id: int | str):
+        Raises:
+            ValueError: 当溢出策略不受支持或额度小于 1 时
+        """
+        queue = self._listen_queue.get(listen_id)
+        if queue is not None:
+            return queue
+
+        on_credit = None
+        if credit is not None:
+            on_credit = lambda count: self._send_credit(listen_id, count)
+        queue = StreamQueue(maxsize, overflow, credit=credit, on_credit=on_credit)
+        self._listen_queue[listen_id] = queue
+        if credit is not None:
+            self._send_credit(listen_id, credit)
+        return queue
+
+    def get_listen_queue(self, listen_id: int | str) -> Optional[StreamQueue]:
         """获取监听队列
 
         Args:
             listen_id: 监听队列的 ID
 
         Returns:
-            asyncio.Queue | None: 监听队列，如果不存在则返回 None
+            StreamQueue | None: 监听队列，如果不存在则返回 None
         """
-        if not self._listen_queue.get(listen_id):
-            return None
-        return self._listen_queue[listen_id]
+        return self._listen_queue.get(listen_id)
 
     def del_listen_queue(self, listen_id: int | str):
         """删除监听队列
 
+        启用了流控的队列会通知服务器取消该 ID 的流控，避免推送方一直等待额度。
+
         Args:
             listen_id: 监听队列的 ID
         """
-        self._listen_queue.pop(listen_id, None)
+        queue = self._listen_queue.pop(listen_id, None)
+        if queue is not None and queue.credit is not None:
+            self._send_credit(listen_id, None)
 
-    async def get_server_methods(self) -> dict:
+    async def get_server_methods(self, refresh: bool = False) -> dict:
         """获取服务器方法树
 
         通过调用服务器的 __system__ 方法获取完整的方法树结构。
+        方法树会缓存在客户端，再次获取时携带其 etag 发起条件请求，
+        服务器方法树未变化时只返回 not_modified，不再传输整棵方法树。
+
+        Args:
+            refresh: 为 True 时忽略缓存，重新获取整棵方法树，默认 False
 
         Returns:
             dict: 服务器方法树字典，包含：
@@ -155,6 +323,7 @@ class RPCClient:
                 - methods: 方法列表
                 - middlewares: 中间件列表
                 - routers: 路由器字典
+                - etag: 方法树内容的摘要
 
         Raises:
             RuntimeError: 当客户端未启动时
@@ -176,9 +345,15 @@ class RPCClient:
                     print(f"路由：{router_name}, 方法数：{len(router_info['methods'])}")
             ```
         """
-        future = await self.send("__system__")
-        response = await future
-        return response.result
+        cached = self._method_tree
+        params = {}
+        if cached is not None and not refresh and "etag" in cached:
+            params["etag"] = cached["etag"]
+        tree = await self.call("__system__", params)
+        if cached is not None and tree.get("not_modified"):
+            return cached
+        self._method_tree = tree
+        return tree
 
     async def read_loop(self):
         """读循环
@@ -186,68 +361,202 @@ class RPCClient:
         持续从子进程的标准输出读取 JSON-RPC 响应消息。
         根据消息 ID 将响应分发到对应的 Future 或监听队列。
 
+        完全由数据到达驱动：每次读取当前可用的数据块（最多 64 KiB），自行切分出完整的行，
+        空闲时不会定时唤醒；单行长度不受 StreamReader 缓冲区上限的限制，
+        设置了 max_line_length 时丢弃超长的行。
+
         循环会在以下情况停止：
-            - 子进程关闭输出流
+            - 子进程关闭输出流（EOF）
+            - 读任务被取消（stop()）
             - 发生未处理的异常
         """
+        stdout = self.process.stdout
+        max_line_length = self._max_line_length
+        buffer = bytearray()
+        # 缓冲区中已确认不含换行符的前缀长度，下次从此处开始查找
+        scanned = 0
+        # 正在丢弃超长行，直到遇到下一个换行符
+        discarding = False
         while self._running:
-
             try:
-                # 读取消息
-                response_line = await asyncio.wait_for(
-                    self.process.stdout.readline(), timeout=1.0
-                )
+                data = await stdout.read(_READ_CHUNK_SIZE)
+            except Exception as e:
+                self.logger.exception(f"READ 触发未处理异常: {e}")
+                break
 
-                if not response_line:
-                    self.logger.debug("连接已断开")
+            if not data:
+                # 最后一行可能没有换行符
+                if buffer.strip() and not discarding:
+                    await self._handle_line(bytes(buffer))
+                self.logger.debug("连接已断开")
+                # 子进程已关闭输出，不再接受新的请求
+                self._running = False
+                break
+
+            buffer += data
+            start = 0
+            end = buffer.find(b"\n", scanned)
+            while end != -1:
+                if discarding:
+                    discarding = False
+                elif max_line_length is not None and end - start > max_line_length:
+                    self.logger.error(f"响应超过 {max_line_length} 字节，已丢弃")
+                elif start == 0 and end + 1 == len(buffer):
+                    # 缓冲区恰好是一整行：直接交出，避免再复制一次
+                    line, buffer = buffer, bytearray()
+                    await self._handle_line(line)
                     break
+                else:
+                    await self._handle_line(buffer[start : end + 1])
+                start = end + 1
+                end = buffer.find(b"\n", start)
+            if start:
+                del buffer[:start]
+            scanned = len(buffer)
+
+            if max_line_length is not None and scanned > max_line_length:
+                if not discarding:
+                    self.logger.error(f"响应超过 {max_line_length} 字节，已丢弃")
+                discarding = True
+                buffer.clear()
+                scanned = 0
+
+    async def _handle_line(self, line: bytes) -> None:
+        """解析一行消息并分发
+
+        默认模式下由预编译的 TypeAdapter 直接从字节校验为响应模型，只解析一次；
+        raw_responses 模式下只做 JSON 解析。批量响应（数组）逐个分发。
 
-                try:
-                    response_text = response_line.decode("utf-8").strip()
-                    self.logger.debug(response_text)
-                except UnicodeDecodeError as e:
-                    self.logger.warning(f"解码错误，跳过此行: {e}")
-                    continue
+        Args:
+            line: 从子进程标准输出读取的一行原始字节
+        """
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(line.decode("utf-8", errors="replace").rstrip())
 
-                if not response_text:
-                    continue
+        try:
+            if self._raw_responses:
+                message = json.loads(line)
+            elif _BATCH_PREFIX.match(line):
+                message = _BATCH_ADAPTER.validate_json(line)
+            else:
+                message = _MESSAGE_ADAPTER.validate_json(line)
+        except ValidationError as e:
+            if not line.strip():
+                return
+            # 批量响应中个别消息无效时，逐个校验，保证其余响应仍能送达
+            if _BATCH_PREFIX.match(line):
+                await self._handle_invalid_batch(line)
+            else:
+                self.logger.error(f"响应校验错误 {e.errors(include_url=False)}")
+            return
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            if line.strip():
+                self.logger.error(f"解析消息失败: {e}")
+            return
 
-                try:
-                    response = json.loads(response_text)
-                    response_id = response.get("id")
-                    if not response_id:
-                        continue
-
-                    if response.get("result"):
-                        response = JSONRPCResponse.model_validate(response)
-                    elif response.get("error"):
-                        response = JSONRPCError.model_validate(response)
-
-                    # 如果是监听队列需要的响应,则将结果推入队列
-                    if response_id in self._listen_queue.keys():
-                        await self._listen_queue[response_id].put(response)
-                        continue
-
-                    future = self._pending_future.pop(response_id, None)
-                    # 防止 future 已被取消.
-                    if not future:
-                        continue
-                    future.set_result(response)
-
-                except json.JSONDecodeError as e:
-                    self.logger.error(f"解析消息失败: {e}")
-                except ValidationError as e:
-                    self.logger.error(f"响应校验错误 {e.errors(include_url=False)}")
-                except Exception as e:
-                    self.logger.error(f"处理消息时出错: {e}")
-
-            except asyncio.TimeoutError:
-                # 超时是正常的，继续循环
+        try:
+            # 批量响应为数组，逐个分发
+            if isinstance(message, list):
+                for item in message:
+                    await self._dispatch_message(item)
+            else:
+                await self._dispatch_message(message)
+        except Exception as e:
+            self.logger.error(f"处理消息时出错: {e}")
+
+    async def _handle_invalid_batch(self, line: bytes) -> None:
+        """逐个校验并分发批量响应，跳过其中无效的消息
+
+        Args:
+            line: 校验失败的批量响应原始字节
+        """
+        try:
+            items = json.loads(line)
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            self.logger.error(f"解析消息失败: {e}")
+            return
+        for item in items:
+            try:
+                message = _MESSAGE_ADAPTER.validate_python(item)
+            except ValidationError as e:
+                self.logger.error(f"响应校验错误 {e.errors(include_url=False)}")
                 continue
-            except Exception as e:
-                self.logger.exception(f"READ 触发未处理异常: {e}")
-                break
-                
+            await self._dispatch_message(message)
+
+    async def _dispatch_message(
+        self, message: JSONRPCResponse | JSONRPCError | JSONRPCNotification | dict
+    ) -> None:
+        """将一条消息分发到对应的 Future、监听队列或通知处理
+
+        Args:
+            message: 已校验的消息模型；raw_responses 模式下为原始字典
+        """
+        if isinstance(message, dict):
+            if "id" not in message and "method" in message:
+                self._on_notification(message)
+                return
+            response_id = message.get("id")
+        elif isinstance(message, JSONRPCNotification):
+            self._on_notification(message)
+            return
+        else:
+            response_id = message.id
+
+        if not response_id:
+            return
+
+        # 如果是监听队列需要的响应,则将结果推入队列
+        queue = self._listen_queue.get(response_id)
+        if queue is not None:
+            if not queue.offer(message):
+                await queue.put(message)
+            return
+
+        future = self._pending_future.pop(response_id, None)
+        if self._timings:
+            timing = self._timings.pop(response_id, None)
+            if timing is not None:
+                if isinstance(message, dict):
+                    error = message.get("error") is not None
+                else:
+                    error = isinstance(message, JSONRPCError)
+                timing.on_response(time.perf_counter(), error)
+        # 防止 future 已被取消.
+        if future is None or future.done():
+            self._on_unmatched(response_id, message)
+            return
+        future.set_result(message)
+
+    def _on_notification(self, notification: JSONRPCNotification | dict) -> None:
+        """收到服务器通知（没有 id 的消息）时调用
+
+        处理 __ready__ 就绪通知，其他通知默认只记录调试日志。
+        子类可重写以处理服务器主动推送的通知（需调用父类方法以保留就绪处理）。
+
+        Args:
+            notification: 通知模型；raw_responses 模式下为原始字典
+        """
+        if isinstance(notification, dict):
+            method, params = notification.get("method"), notification.get("params")
+        else:
+            method, params = notification.method, notification.params
+        if method == READY_METHOD:
+            if self._ready is not None and not self._ready.done():
+                self._ready.set_result(params)
+            return
+        self.logger.debug(f"收到服务器通知: {notification}")
+
+    def _on_unmatched(
+        self, response_id: int | str, message: JSONRPCResponse | JSONRPCError | dict
+    ) -> None:
+        """收到的响应没有对应的 Future 或监听队列时调用（如请求已超时取消），默认忽略
+
+        子类可重写以处理服务器主动推送的消息。
+
+        Args:
+            response_id: 响应 ID
+            message: 响应模型；raw_responses 模式下为原始字典
+        """
 
     async def send(
         self,
@@ -262,7 +571,7 @@ class RPCClient:
         Args:
             method: 要调用的 RPC 方法名称
             params: 方法参数，默认为空字典
-            request_id: 请求 ID，如果未提供则自动生成 UUID
+            request_id: 请求 ID，如果未提供则由 id_generator 生成
 
         Returns:
             asyncio.Future: 用于等待响应的 Future 对象
@@ -280,22 +589,13 @@ class RPCClient:
         if not self._running:
             raise RuntimeError("子进程未启动")
 
-        async with self._lock:
-
-            if request_id is None:
-                request_id = uuid.uuid1().hex
-
-            # 创建等待响应的 Future
-            future = asyncio.get_event_loop().create_future()
-            self._pending_future[request_id] = future
-
-            # 发送请求
-            request = JSONRPCRequest(id=request_id, method=method, params=params)
-
-            self.process.stdin.write(request.encode("utf-8") + b"\n")
-            await self.process.stdin.drain()
-
-            return future
+        request, future = self._register_request(method, params, request_id)
+        self._send_request(request)
+        timing = self._timings.get(request.id)
+        waited = await self._drain()
+        if waited and timing is not None:
+            timing.record("drain", waited)
+        return future
 
     async def start(self, app: Optional[str] = None, *extra_args) -> None:
         """启动子进程
@@ -309,8 +609,11 @@ class RPCClient:
             app: 应用程序路径，可以是模块名、脚本路径或可执行文件
             *extra_args: 应用程序启动参数
 
+        启动后等待服务器发送 __ready__ 就绪通知（最长 ready_timeout 秒）。
+        子进程在就绪前退出或等待超时都会抛出 RuntimeError。
+
         Raises:
-            RuntimeError: 当子进程启动失败时
+            RuntimeError: 当子进程启动失败、就绪前退出或就绪超时时
 
         例子：
             ```python
@@ -329,6 +632,11 @@ class RPCClient:
         """
 
         app = app or self._app
+        if self._fork_server is not None:
+            if app != self._fork_server.app:
+                raise RuntimeError(
+                    f"应用程序 {app} 与 ForkServer 预加载的应用 {self._fork_server.app} 不一致"
+                )
         if app is None:
             raise RuntimeError("未指定应用程序路径，请在构造时或 start() 时传入 app 参数")
         extra_args = extra_args or self._extra_args
@@ -348,6 +656,11 @@ class RPCClient:
             return shutil.which(app) is not None
 
         try:
+            if self._fork_server is not None:
+                self.process = await self._fork_server.spawn(*extra_args)
+                await self._start_session()
+                return
+
             creationflags = 0
             if _is_module_ref(app):
                 cmd = [sys.executable, "-m", app, *extra_args]
@@ -373,27 +686,84 @@ class RPCClient:
                 creationflags=creationflags,
                 env=env,
             )
+            await self._start_session()
+
+        except Exception as e:
+            raise e
+
+    async def _start_session(self) -> None:
+        """子进程创建后启动读循环并等待就绪"""
+        self._running = True
+        self._ready = asyncio.get_running_loop().create_future()
+        self._read_task = asyncio.create_task(self.read_loop())
+
+        # 等待子进程就绪
+        try:
+            await self._wait_ready()
+        except asyncio.CancelledError:
+            await self._abort_start()
+            raise
+
+    async def _wait_ready(self) -> None:
+        """等待服务器的 __ready__ 就绪通知
 
-            # 等待子进程启动
-            await asyncio.sleep(1)
+        同时监视子进程退出：子进程在就绪前退出时立即失败，而不是等到超时。
+        ready_timeout 为 None 时不等待就绪通知，只检查子进程是否已退出。
 
+        Raises:
+            RuntimeError: 当子进程在就绪前退出或等待就绪超时时
+        """
+        if self._ready_timeout is None:
             if self.process.returncode is not None:
-                stderr_data = await self.process.stderr.read()
-                error_msg = "未知错误"
-                if stderr_data:
-                    for encoding in ["utf-8", "gbk", "cp936", "latin-1"]:
-                        try:
-                            error_msg = stderr_data.decode(encoding)
-                            break
-                        except UnicodeDecodeError:
-                            continue
-                raise RuntimeError(f"子进程启动失败: {error_msg}")
-
-            self._running = True
-            self._read_task = asyncio.create_task(self.read_loop())
+                await self._abort_start()
+                raise RuntimeError(f"子进程启动失败: {await self._read_stderr()}")
+            return
 
-        except Exception as e:
-            raise e
+        exited = asyncio.ensure_future(self.process.wait())
+        try:
+            done, _ = await asyncio.wait(
+                {self._ready, exited},
+                timeout=self._ready_timeout,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+        finally:
+            exited.cancel()
+
+        if self._ready.done():
+            self.logger.debug(f"服务器已就绪: {self._ready.result()}")
+            return
+
+        await self._abort_start()
+        if exited in done:
+            raise RuntimeError(f"子进程启动失败: {await self._read_stderr()}")
+        raise RuntimeError(f"子进程启动超时: {self._ready_timeout} 秒内未收到就绪通知")
+
+    async def _abort_start(self) -> None:
+        """启动失败时停止读循环并结束子进程"""
+        self._running = False
+        if self._read_task:
+            self._read_task.cancel()
+            try:
+                await self._read_task
+            except asyncio.CancelledError:
+                pass
+            self._read_task = None
+        if self.process.returncode is None:
+            self.process.kill()
+            await self.process.wait()
+
+    async def _read_stderr(self) -> str:
+        """读取子进程的标准错误输出，用于启动失败时的错误信息"""
+        stderr_data = await self.process.stderr.read()
+        error_msg = "未知错误"
+        if stderr_data:
+            for encoding in ["utf-8", "gbk", "cp936", "latin-1"]:
+                try:
+                    error_msg = stderr_data.decode(encoding)
+                    break
+                except UnicodeDecodeError:
+                    continue
+        return error_msg
 
     async def stop(self) -> None:
         """停止客户端
@@ -407,6 +777,8 @@ class RPCClient:
             - 清理待处理的 Future
             - 清理监听队列
         """
+        self._running = False
+
         # 停止读循环
         if self._read_task:
             self._read_task.cancel()
@@ -417,27 +789,48 @@ class RPCClient:
 
         # 关闭子进程
         if self.process:
-            self.process.stdin.close()
+            self._flush_frames()
+            # 读循环已停止：继续读取并丢弃子进程剩余的输出，否则子进程可能因输出管道写满
+            # 而不再读取 stdin，输出管道也无法读到 EOF，process.wait() 将一直等待
+            discard = asyncio.ensure_future(self._discard_output())
             try:
-                await self.process.stdin.wait_closed()
-            except Exception:
-                pass
-        try:
-            await asyncio.wait_for(self.process.wait(), timeout=5.0)
-        except asyncio.TimeoutError:
-            self.process.kill()
-            await self.process.wait()
+                self.process.stdin.close()
+                try:
+                    await asyncio.wait_for(self.process.stdin.wait_closed(), timeout=5.0)
+                except asyncio.TimeoutError:
+                    self.process.stdin.transport.abort()
+                except Exception:
+                    pass
+                try:
+                    await asyncio.wait_for(self.process.wait(), timeout=5.0)
+                except asyncio.TimeoutError:
+                    self.process.kill()
+                    await self.process.wait()
+            finally:
+                discard.cancel()
 
         # 清理未完成的 future
         for future in self._pending_future.values():
             future.cancel()
         self._pending_future.clear()
+        self._timings.clear()
+        self._unflushed.clear()
 
         self.process = None
         self._read_task = None
         self._pending_future = {}
         self._listen_queue = {}
 
+    async def _discard_output(self) -> None:
+        """读取并丢弃子进程标准输出和标准错误中剩余的数据，直到 EOF"""
+
+        async def discard(stream: asyncio.StreamReader) -> None:
+            while await stream.read(_READ_CHUNK_SIZE):
+                pass
+
+        streams = [self.process.stdout, self.process.stderr]
+        await asyncio.gather(*(discard(stream) for stream in streams if stream is not None))
+
     async def __aenter__(self):
         """异步上下文管理器进入，如果构造时传入了 app 则自动启动"""
         if self._app and not self._running:
@@ -452,11 +845,13 @@ class RPCClient:
         """发送请求并返回可链式调用的 RPCFuture
 
         同步方法，使得 `await client.call("method").then(handler)` 可以自然书写。
+        请求在当前事件循环迭代结束时写出；await 返回的 RPCFuture 时，
+        写缓冲超过高水位则先等待 stdin 写出，与 send() 一样受反压限制。
 
         Args:
             method: 要调用的 RPC 方法名称
             params: 方法参数，默认为空字典
-            request_id: 请求 ID，如果未提供则自动生成 UUID
+            request_id: 请求 ID，如果未提供则由 id_generator 生成
             timeout: 超时时间（秒）
 
         Returns:
@@ -467,25 +862,266 @@ class RPCClient:
         """
         if not self._running:
             raise RuntimeError("子进程未启动")
+
+        request, future = self._register_request(method, params, request_id)
+        self._send_request(request)
+
+        return RPCFuture(
+            future,
+            timeout=timeout,
+            timing=self._timings.get(request.id),
+            drain=self._drain,
+        )
+
+    def call_many(
+        self,
+        calls: Iterable[str | Tuple[str, Any]],
+        *,
+        timeout: Optional[float] = None,
+    ) -> List[RPCFuture]:
+        """以一个 JSON-RPC 批量请求发送多个调用
+
+        所有请求编码为一个 JSON 数组，一次写入；服务器并发执行后以一个数组返回全部响应。
+
+        Args:
+            calls: 调用列表，每项为方法名或 (方法名, 参数) 元组
+            timeout: 每个调用的超时时间（秒）
+
+        Returns:
+            List[RPCFuture]: 与调用顺序一致的 RPCFuture 列表
+
+        Raises:
+            RuntimeError: 当客户端未启动时
+
+        例子：
+            ```python
+            futures = client.call_many([
+                "healthy",
+                ("hello", {"name": "张三"}),
+            ])
+            results = await asyncio.gather(*futures)
+            ```
+        """
+        if not self._running:
+            raise RuntimeError("子进程未启动")
+
+        requests = []
+        futures = []
+        for item in calls:
+            method, params = (item, None) if isinstance(item, str) else item
+            request, future = self._register_request(method, params)
+            requests.append(request)
+            futures.append(
+                RPCFuture(
+                    future,
+                    timeout=timeout,
+                    timing=self._timings.get(request.id),
+                    drain=self._drain,
+                )
+            )
+
+        if requests:
+            self._send_batch(requests)
+        return futures
+
+    @asynccontextmanager
+    async def batch(self, *, timeout: Optional[float] = None):
+        """批量调用上下文管理器
+
+        在上下文中通过 RPCBatch.call 登记调用，退出上下文时以一个批量请求发送。
+
+        上下文内发生异常时不发送请求，已登记的调用被取消。
+
+        Args:
+            timeout: 每个调用的超时时间（秒）
+
+        Raises:
+            RuntimeError: 当客户端未启动时
+
+        例子：
+            ```python
+            async with client.batch() as batch:
+                health = batch.call("healthy")
+                hello = batch.call("hello", {"name": "张三"})
+
+            print(await health, await hello)
+            ```
+        """
+        if not self._running:
+            raise RuntimeError("子进程未启动")
+
+        batch = RPCBatch(self, timeout=timeout)
+        try:
+            yield batch
+        except BaseException:
+            for request in batch.requests:
+                future = self._pending_future.pop(request.id, None)
+                if future:
+                    future.cancel()
+            raise
+        if batch.requests:
+            self._send_batch(batch.requests)
+            timings = [self._timings.get(request.id) for request in batch.requests]
+            waited = await self._drain()
+            if waited:
+                for timing in timings:
+                    if timing is not None:
+                        timing.record("drain", waited)
+
+    def _register_request(
+        self, method: str, params: Any = None, request_id: int | str | None = None
+    ) -> Tuple[JSONRPCRequest, asyncio.Future]:
+        """创建请求并登记等待响应的 Future
+
+        Args:
+            method: RPC 方法名称
+            params: 方法参数，默认为空字典
+            request_id: 请求 ID，如果未提供则自动生成
+
+        Returns:
+            Tuple[JSONRPCRequest, asyncio.Future]: 请求对象与 Future
+        """
         if request_id is None:
-            request_id = uuid.uuid1().hex
+            request_id = self._next_id()
 
         future = asyncio.get_running_loop().create_future()
         self._pending_future[request_id] = future
+        if self.metrics is not None:
+            self._timings[request_id] = self.metrics.begin(method)
 
         request = JSONRPCRequest(id=request_id, method=method, params=params or {})
-        asyncio.create_task(self._do_send(request))
+        return request, future
+
+    async def notify(self, method: str, params: Any = None) -> None:
+        """发送 JSON-RPC 通知
 
-        return RPCFuture(future, timeout=timeout)
+        通知不包含 id，服务器执行后不返回响应，客户端也不登记等待响应的 Future。
+        适合日志、遥测等不关心结果的推送。
 
-    async def _do_send(self, request: JSONRPCRequest):
-        """内部发送方法，通过 stdin 写入请求"""
-        async with self._lock:
-            self.process.stdin.write(request.encode("utf-8") + b"\n")
-            await self.process.stdin.drain()
+        Args:
+            method: 要调用的 RPC 方法名称
+            params: 方法参数
+
+        Raises:
+            RuntimeError: 当客户端未启动时
+
+        例子：
+            ```python
+            await client.notify("telemetry.report", {"cpu": 0.3})
+            ```
+        """
+        if not self._running:
+            raise RuntimeError("子进程未启动")
+
+        notification = JSONRPCNotification(method=method, params=params or {})
+        self._send_frame(notification.encode("utf-8"), b"\n")
+        await self._drain()
+
+    def _send_credit(self, listen_id: int | str, credit: Optional[int]) -> None:
+        """向服务器发送 __credit__ 流控通知
+
+        Args:
+            listen_id: 流 ID
+            credit: 发放的额度，None 表示取消该流的流控
+        """
+        if not self._running:
+            return
+        notification = JSONRPCNotification(
+            method=CREDIT_METHOD, params={"id": listen_id, "credit": credit}
+        )
+        self._send_frame(notification.encode("utf-8"), b"\n")
+
+    def _send_request(self, request: JSONRPCRequest) -> None:
+        """内部发送方法，将请求编码为一帧放入写缓冲"""
+        self._send_frame(request.encode("utf-8"), b"\n")
+        if self._timings:
+            timing = self._timings.get(request.id)
+            if timing is not None:
+                self._unflushed.append(timing)
+
+    def _send_batch(self, requests: List[JSONRPCRequest]) -> None:
+        """内部发送方法，将多个请求编码为一个 JSON 数组放入写缓冲"""
+        chunks = [b"["]
+        for i, request in enumerate(requests):
+            if i:
+                chunks.append(b",")
+            chunks.append(request.encode("utf-8"))
+        chunks.append(b"]\n")
+        self._send_frame(*chunks)
+        if self._timings:
+            for request in requests:
+                timing = self._timings.get(request.id)
+                if timing is not None:
+                    self._unflushed.append(timing)
+
+    def _send_frame(self, *chunks: bytes) -> None:
+        """将一帧数据放入写缓冲，不加锁、不等待
+
+        一帧的所有片段同步追加，不会与其他帧交错。缓冲在当前事件循环迭代结束时
+        一次写入 stdin，因此并发发起的大量调用会合并为少量的大块管道写入。
+
+        Args:
+            *chunks: 一帧数据的各个片段
+        """
+        self._out_chunks.extend(chunks)
+        for chunk in chunks:
+            self._out_size += len(chunk)
+        if self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_soon(
+                self._flush_frames
+            )
+
+    def _flush_frames(self) -> None:
+        """将写缓冲中的帧一次写入 stdin 的传输层"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._out_chunks:
+            return
+        chunks, self._out_chunks = self._out_chunks, []
+        self._out_size = 0
+        unflushed, self._unflushed = self._unflushed, []
+        if self.process is None or self.process.stdin.is_closing():
+            self.logger.warning(f"stdin 已关闭，丢弃 {len(chunks)} 个待发送片段")
+            return
+        self.process.stdin.writelines(chunks)
+        if unflushed:
+            now = time.perf_counter()
+            for timing in unflushed:
+                timing.on_flushed(now)
+
+    async def _drain(self) -> float:
+        """写缓冲超过高水位时等待数据写出
+
+        未写出的数据（包括传输层缓冲）不超过 _WRITE_HIGH_WATER 时立即返回。
+        并发调用共享同一个 drain 等待，兼容不支持并发 drain() 的 Python 版本。
+
+        Returns:
+            float: 等待的时间（秒），未等待时为 0.0
+        """
+        if self.process is None or self.process.stdin.is_closing():
+            # 已停止：请求的 Future 已被取消，无需等待
+            return 0.0
+        stdin = self.process.stdin
+        if self._out_size + stdin.transport.get_write_buffer_size() <= _WRITE_HIGH_WATER:
+            return 0.0
+        started = time.perf_counter()
+        self._flush_frames()
+        if self._drain_task is None or self._drain_task.done():
+            self._drain_task = asyncio.ensure_future(stdin.drain())
+        await asyncio.shield(self._drain_task)
+        return time.perf_counter() - started
 
     @asynccontextmanager
-    async def stream(self, listen_id: int | str, *, timeout: Optional[float] = None):
+    async def stream(
+        self,
+        listen_id: int | str,
+        *,
+        timeout: Optional[float] = None,
+        maxsize: int = 0,
+        overflow: OverflowPolicy = "block",
+        credit: Optional[int] = None,
+    ):
         """流式推送上下文管理器
 
         自动管理监听队列的生命周期。
@@ -493,15 +1129,22 @@ class RPCClient:
         Args:
             listen_id: 监听队列 ID
             timeout: 每条消息的超时时间（秒）
+            maxsize: 队列容量，小于等于 0 时不限制，默认 0
+            overflow: 队列满时的溢出策略，默认 "block"
+            credit: 流控额度，默认 None 即不启用流控，详见 add_listen_queue()
 
         例子：
             ```python
             async with client.stream(task_id) as listener:
                 async for msg in listener:
                     print(msg.result)
+
+            # 慢消费者：最多缓存 100 条，只保留最新进度；服务器最多领先 100 条
+            async with client.stream(task_id, maxsize=100, overflow="latest", credit=100) as listener:
+                ...
             ```
         """
-        queue = self.add_listen_queue(listen_id)
+        queue = self.add_listen_queue(listen_id, maxsize, overflow, credit=credit)
         try:
             yield StreamListener(queue, timeout)
         finally:
@@ -0,0 +1,515 @@
+"""ForkServer 子进程预热派生模块
+
+类似 multiprocessing 的 forkserver：启动一个派生服务进程，预先导入 okstdio、pydantic
+和目标服务器模块，之后每次需要子进程时由它 fork 出已完成初始化的子进程，
+子进程的标准输入输出连接到新建的管道。子进程不必重新启动解释器和导入模块，
+启动耗时从数百毫秒降到数毫秒。
+
+仅支持 POSIX 平台（依赖 os.fork 和 socket.send_fds）。
+
+控制通道为 AF_UNIX SOCK_SEQPACKET 套接字对，每条消息是一个 JSON 对象：
+    - 客户端 → 派生服务: {"op": "spawn", "id": n, "args": [...]}，附带子进程的
+      stdin 读端、stdout 写端、stderr 写端三个文件描述符
+    - 派生服务 → 客户端: {"op": "ready"} / {"op": "error", "message": ...}（预加载结果）
+    - 派生服务 → 客户端: {"op": "spawned", "id": n, "pid": pid}
+    - 派生服务 → 客户端: {"op": "exit", "pid": pid, "returncode": code}
+"""
+
+import asyncio
+import json
+import logging
+import os
+import runpy
+import selectors
+import signal
+import socket
+import sys
+import threading
+import traceback
+import warnings
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# 控制消息的最大字节数
+_MAX_MESSAGE = 64 * 1024
+
+# 派生服务进程的入口。与 "python -m app" 一样以当前目录为 sys.path[0]
+_SERVE_COMMAND = (
+    "import sys; from okstdio.client.forkserver import _serve; "
+    "sys.exit(_serve(sys.argv[1], int(sys.argv[2])))"
+)
+
+
+def _is_script(app: str) -> bool:
+    """判断是否python脚本"""
+    return app.endswith(".py") and os.path.exists(app)
+
+
+class ForkedProcess:
+    """由 ForkServer 派生的子进程
+
+    提供 RPCClient 使用的 asyncio.subprocess.Process 接口子集：
+    stdin、stdout、stderr、pid、returncode、wait()、kill()、terminate()。
+    子进程由派生服务进程回收，退出码通过控制通道送回。
+    """
+
+    def __init__(
+        self,
+        pid: int,
+        stdin: asyncio.StreamWriter,
+        stdout: asyncio.StreamReader,
+        stderr: asyncio.StreamReader,
+        exited: asyncio.Future,
+    ):
+        self.pid = pid
+        self.stdin = stdin
+        self.stdout = stdout
+        self.stderr = stderr
+        self._exited = exited
+
+    @property
+    def returncode(self) -> Optional[int]:
+        """退出码，尚未退出时为 None；被信号终止时为负的信号值"""
+        if self._exited.done() and not self._exited.cancelled():
+            return self._exited.result()
+        return None
+
+    async def wait(self) -> int:
+        """等待子进程退出
+
+        Returns:
+            int: 退出码
+        """
+        return await asyncio.shield(self._exited)
+
+    def send_signal(self, sig: int) -> None:
+        """向子进程发送信号，已退出时忽略"""
+        if self.returncode is not None:
+            return
+        try:
+            os.kill(self.pid, sig)
+        except ProcessLookupError:
+            pass
+
+    def kill(self) -> None:
+        """强制结束子进程"""
+        self.send_signal(signal.SIGKILL)
+
+    def terminate(self) -> None:
+        """请求子进程结束"""
+        self.send_signal(signal.SIGTERM)
+
+
+class ForkServer:
+    """派生服务
+
+    预先导入目标应用并按需 fork 子进程。通过 RPCClient 的 fork_server 参数使用：
+
+    例子：
+        ```python
+        fork_server = ForkServer("tests.test_server")
+        await fork_server.start()            # 只在这里付出一次导入开销
+
+        async with RPCClient("worker", fork_server=fork_server) as client:
+            await client.call("healthy")
+
+        await fork_server.close()
+        ```
+
+    子进程继承派生服务进程启动时的工作目录和环境变量。目标模块在导入阶段不应启动线程，
+    fork 只会复制调用 fork 的线程。
+
+    Args:
+        app: 应用程序路径，模块引用（如 "example.server"）或 Python 脚本
+
+    Raises:
+        RuntimeError: 当平台不支持 fork 时
+    """
+
+    def __init__(self, app: str):
+        if os.name != "posix" or not hasattr(socket, "send_fds"):
+            raise RuntimeError("ForkServer 仅支持 POSIX 平台")
+        self.app = app
+        self._process: Optional[asyncio.subprocess.Process] = None
+        self._sock: Optional[socket.socket] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._ready: Optional[asyncio.Future] = None
+        self._spawning: Dict[int, asyncio.Future] = {}
+        self._children: Dict[int, asyncio.Future] = {}
+        self._next_id = 0
+
+    @property
+    def running(self) -> bool:
+        """派生服务是否正在运行"""
+        return self._sock is not None
+
+    async def start(self, timeout: float = 60.0) -> None:
+        """启动派生服务并等待目标应用预加载完成
+
+        Args:
+            timeout: 等待预加载完成的最长时间（秒）
+
+        Raises:
+            RuntimeError: 当预加载失败或超时时
+        """
+        self._loop = asyncio.get_running_loop()
+        parent, child = socket.socketpair(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+        try:
+            self._process = await asyncio.create_subprocess_exec(
+                sys.executable,
+                "-c",
+                _SERVE_COMMAND,
+                self.app,
+                str(child.fileno()),
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.DEVNULL,
+                pass_fds=(child.fileno(),),
+            )
+        except Exception:
+            parent.close()
+            raise
+        finally:
+            child.close()
+
+        parent.setblocking(False)
+        self._sock = parent
+        self._ready = self._loop.create_future()
+        self._loop.add_reader(parent.fileno(), self._on_readable)
+
+        try:
+            await asyncio.wait_for(asyncio.shield(self._ready), timeout=timeout)
+        except Exception as e:
+            await self.close()
+            if isinstance(e, asyncio.TimeoutError):
+                raise RuntimeError(f"ForkServer 预加载超时: {self.app}") from None
+            raise
+
+    async def spawn(self, *args: str) -> ForkedProcess:
+        """派生一个子进程
+
+        Args:
+            *args: 应用程序启动参数（子进程中的 sys.argv[1:]）
+
+        Returns:
+            ForkedProcess: 子进程
+
+        Raises:
+            RuntimeError: 当派生服务未运行或派生失败时
+        """
+        if self._sock is None:
+            raise RuntimeError("ForkServer 未启动")
+
+        stdin_r, stdin_w = os.pipe()
+        stdout_r, stdout_w = os.pipe()
+        stderr_r, stderr_w = os.pipe()
+        self._next_id += 1
+        request_id = self._next_id
+        future = self._loop.create_future()
+        self._spawning[request_id] = future
+        try:
+            message = {"op": "spawn", "id": request_id, "args": list(args)}
+            socket.send_fds(
+                self._sock, [json.dumps(message).encode("utf-8")], [stdin_r, stdout_w, stderr_w]
+            )
+        except Exception:
+            self._spawning.pop(request_id, None)
+            for fd in (stdin_w, stdout_r, stderr_r):
+                os.close(fd)
+            raise
+        finally:
+            # 子进程一端已交给派生服务
+            for fd in (stdin_r, stdout_w, stderr_w):
+                os.close(fd)
+
+        # 父进程一端包装为文件对象，失败或取消时统一关闭（关闭可重复调用）
+        stdin_pipe = os.fdopen(stdin_w, "wb", buffering=0)
+        stdout_pipe = os.fdopen(stdout_r, "rb", buffering=0)
+        stderr_pipe = os.fdopen(stderr_r, "rb", buffering=0)
+        transports: List[asyncio.BaseTransport] = []
+        try:
+            pid = await future
+            stdout = await self._connect_reader(stdout_pipe, transports)
+            stderr = await self._connect_reader(stderr_pipe, transports)
+            protocol = asyncio.StreamReaderProtocol(asyncio.StreamReader())
+            transport, _ = await self._loop.connect_write_pipe(lambda: protocol, stdin_pipe)
+            transports.append(transport)
+        except BaseException:
+            # 已派生的子进程在 stdin 关闭后读到 EOF 自行退出
+            self._spawning.pop(request_id, None)
+            for transport in transports:
+                transport.close()
+            for pipe in (stdin_pipe, stdout_pipe, stderr_pipe):
+                pipe.close()
+            raise
+        stdin = asyncio.StreamWriter(transport, protocol, None, self._loop)
+        return ForkedProcess(pid, stdin, stdout, stderr, self._children[pid])
+
+    async def _connect_reader(
+        self, pipe, transports: List[asyncio.BaseTransport]
+    ) -> asyncio.StreamReader:
+        """将管道读端连接为 StreamReader，建立的传输追加到 transports"""
+        reader = asyncio.StreamReader()
+        transport, _ = await self._loop.connect_read_pipe(
+            lambda: asyncio.StreamReaderProtocol(reader), pipe
+        )
+        transports.append(transport)
+        return reader
+
+    def _on_readable(self) -> None:
+        """控制通道可读回调，处理派生服务发回的消息"""
+        try:
+            data = self._sock.recv(_MAX_MESSAGE)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError as e:
+            logger.error(f"ForkServer 控制通道读取错误: {e}")
+            data = b""
+        if not data:
+            self._on_lost()
+            return
+
+        message = json.loads(data)
+        op = message.get("op")
+        if op == "spawned":
+            # 先登记退出 Future：退出消息总在 spawned 消息之后到达
+            self._children[message["pid"]] = self._loop.create_future()
+            future = self._spawning.pop(message["id"], None)
+            if future is not None and not future.done():
+                future.set_result(message["pid"])
+        elif op == "exit":
+            future = self._children.pop(message["pid"], None)
+            if future is not None and not future.done():
+                future.set_result(message["returncode"])
+        elif op == "ready":
+            if not self._ready.done():
+                self._ready.set_result(None)
+        elif op == "error":
+            error = RuntimeError(f"ForkServer 错误: {message.get('message')}")
+            future = self._spawning.pop(message.get("id"), None)
+            if future is not None and not future.done():
+                future.set_exception(error)
+            elif not self._ready.done():
+                self._ready.set_exception(error)
+
+    def _on_lost(self) -> None:
+        """派生服务退出：派生中的请求失败，改为轮询已派生子进程的存活状态"""
+        if self._sock is not None:
+            self._loop.remove_reader(self._sock.fileno())
+            self._sock.close()
+            self._sock = None
+
+        error = RuntimeError("ForkServer 已退出")
+        if not self._ready.done():
+            self._ready.set_exception(error)
+        for future in self._spawning.values():
+            if not future.done():
+                future.set_exception(error)
+        self._spawning.clear()
+
+        children, self._children = self._children, {}
+        for pid, future in children.items():
+            self._loop.create_task(self._poll_exit(pid, future))
+
+    @staticmethod
+    async def _poll_exit(pid: int, future: asyncio.Future) -> None:
+        """派生服务退出后，子进程由 init 回收，只能轮询其是否存在；退出码未知，记为 -1"""
+        while not future.done():
+            try:
+                os.kill(pid, 0)
+            except ProcessLookupError:
+                future.set_result(-1)
+                return
+            except PermissionError:
+                pass
+            await asyncio.sleep(0.2)
+
+    async def close(self) -> None:
+        """关闭派生服务
+
+        已派生的子进程不受影响，由各自的 RPCClient 负责停止；应先停止客户端再关闭派生服务，
+        这样子进程的退出码仍能由派生服务送回。
+        """
+        if self._sock is not None:
+            self._on_lost()
+        if self._process is not None:
+            try:
+                await asyncio.wait_for(self._process.wait(), timeout=5.0)
+            except asyncio.TimeoutError:
+                self._process.kill()
+                await self._process.wait()
+            self._process = None
+
+
+# ---------------------------------------------------------------------------
+# 派生服务进程
+# ---------------------------------------------------------------------------
+
+
+def _send(sock: socket.socket, message: dict) -> None:
+    sock.send(json.dumps(message).encode("utf-8"))
+
+
+def _preload(app: str) -> None:
+    """导入 okstdio 服务器模块和目标应用，使其依赖进入 sys.modules"""
+    import okstdio.server  # noqa: F401
+
+    if _is_script(app):
+        sys.path.insert(0, os.path.dirname(os.path.abspath(app)))
+        runpy.run_path(app, run_name="__okstdio_preload__")
+    else:
+        __import__(app)
+
+
+def _run_child(app: str, args: List[str]) -> int:
+    """在派生出的子进程中以 __main__ 身份运行目标应用
+
+    Returns:
+        int: 退出码
+    """
+    # 目标模块已在预加载时导入，以 __main__ 再次执行时 runpy 会给出警告
+    warnings.filterwarnings("ignore", category=RuntimeWarning, module="runpy")
+    sys.argv = [app, *args]
+    try:
+        if _is_script(app):
+            runpy.run_path(app, run_name="__main__")
+        else:
+            runpy.run_module(app, run_name="__main__", alter_sys=True)
+    except SystemExit as e:
+        if e.code is None:
+            return 0
+        if isinstance(e.code, int):
+            return e.code
+        print(e.code, file=sys.stderr)
+        return 1
+    except BaseException:
+        traceback.print_exc()
+        return 1
+    return 0
+
+
+def _fork_child(app: str, args: List[str], fds: List[int], close_fds: List[int]) -> int:
+    """fork 一个子进程，将传入的管道作为其标准输入输出
+
+    Returns:
+        int: 子进程 pid（在父进程中返回）
+    """
+    sys.stdout.flush()
+    sys.stderr.flush()
+    pid = os.fork()
+    if pid:
+        return pid
+
+    code = 1
+    try:
+        for fd in close_fds:
+            os.close(fd)
+        signal.set_wakeup_fd(-1)
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        for target, fd in enumerate(fds):
+            os.dup2(fd, target)
+        for fd in fds:
+            if fd > 2:
+                os.close(fd)
+        code = _run_child(app, args)
+        _join_threads()
+    except BaseException:
+        traceback.print_exc()
+    finally:
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        finally:
+            os._exit(code)
+
+
+def _join_threads() -> None:
+    """等待子进程中的非守护线程结束
+
+    子进程以 os._exit 结束，不经过解释器的退出流程（与 multiprocessing 的 fork 子进程一样，
+    atexit 回调不会执行）。这里像解释器退出时一样等待非守护线程：服务器停止时已关闭执行池，
+    执行池的管理线程随之结束进程池的工作进程后退出。
+    """
+    current = threading.current_thread()
+    for thread in threading.enumerate():
+        if thread is not current and not thread.daemon:
+            thread.join()
+
+
+def _reap(sock: socket.socket) -> None:
+    """回收已退出的子进程并报告退出码"""
+    while True:
+        try:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            return
+        if pid == 0:
+            return
+        _send(sock, {"op": "exit", "pid": pid, "returncode": os.waitstatus_to_exitcode(status)})
+
+
+def _serve(app: str, fd: int) -> int:
+    """派生服务主循环
+
+    Args:
+        app: 目标应用
+        fd: 控制通道套接字的文件描述符
+
+    Returns:
+        int: 退出码
+    """
+    sock = socket.socket(fileno=fd)
+    # Ctrl+C 由客户端进程处理，派生服务随控制通道关闭而退出
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    try:
+        _preload(app)
+    except BaseException:
+        _send(sock, {"op": "error", "message": traceback.format_exc()})
+        return 1
+
+    wake_r, wake_w = os.pipe()
+    os.set_blocking(wake_r, False)
+    os.set_blocking(wake_w, False)
+    signal.set_wakeup_fd(wake_w)
+    signal.signal(signal.SIGCHLD, lambda signum, frame: None)
+
+    selector = selectors.DefaultSelector()
+    selector.register(sock, selectors.EVENT_READ)
+    selector.register(wake_r, selectors.EVENT_READ)
+    close_in_child = [sock.fileno(), wake_r, wake_w]
+
+    _send(sock, {"op": "ready"})
+    try:
+        while True:
+            for key, _ in selector.select():
+                if key.fileobj == wake_r:
+                    try:
+                        while os.read(wake_r, 4096):
+                            pass
+                    except BlockingIOError:
+                        pass
+                    _reap(sock)
+                    continue
+
+                message, fds, _, _ = socket.recv_fds(sock, _MAX_MESSAGE, 3)
+                if not message:
+                    # 客户端关闭了控制通道
+                    return 0
+                request = json.loads(message)
+                try:
+                    if len(fds) != 3:
+                        raise RuntimeError(f"需要 3 个文件描述符，收到 {len(fds)} 个")
+                    pid = _fork_child(app, request.get("args", []), fds, close_in_child)
+                except Exception as e:
+                    _send(sock, {"op": "error", "id": request.get("id"), "message": str(e)})
+                else:
+                    _send(sock, {"op": "spawned", "id": request.get("id"), "pid": pid})
+                finally:
+                    for received in fds:
+                        os.close(received)
+    except (BrokenPipeError, ConnectionResetError):
+        # 客户端已关闭控制通道，无法再回复
+        return 0
+
@@ -5,13 +5,17 @@
 
 import asyncio
 import inspect
-from typing import Any, Callable, Optional
+import time
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Optional
 
 from pydantic import BaseModel
 
 from ..general.jsonrpc_model import JSONRPCResponse, JSONRPCError
 from ..general.errors import _make_rpc_exception, RPCError
 
+if TYPE_CHECKING:
+    from .metrics import RequestTiming
+
 
 class RPCFuture:
     """Promise-like 的 awaitable 对象，支持链式调用
@@ -27,11 +31,28 @@ class RPCFuture:
         # 后台任务模式
         task = await client.call("method").then(handler, create_task=True)
         ```
+
+    Args:
+        future: 等待响应的 Future
+        timeout: 超时时间（秒）
+        timing: 客户端启用指标时的请求计时点，由 RPCFuture 记录 resume / then / total 阶段
+        drain: 等待请求写出的协程函数，await 时先等待写缓冲降到高水位以下再等待响应，
+            返回等待的时间（秒）
     """
 
-    def __init__(self, future: asyncio.Future, timeout: Optional[float] = None):
+    def __init__(
+        self,
+        future: asyncio.Future,
+        timeout: Optional[float] = None,
+        timing: Optional["RequestTiming"] = None,
+        drain: Optional[Callable[[], Awaitable[float]]] = None,
+    ):
         self._future = future
         self._timeout = timeout
+        self._timing = timing
+        self._drain = drain
+        if timing is not None:
+            timing.deferred = True
         self._then_handler: Optional[Callable] = None
         self._then_extra_params: dict = {}
         self._then_create_task: bool = False
@@ -55,38 +76,78 @@ class RPCFuture:
         return self
 
     async def _resolve(self) -> Any:
+        if self._drain is not None:
+            waited = await self._drain()
+            if waited and self._timing is not None:
+                self._timing.record("drain", waited)
+
         if self._timeout is not None:
             response = await asyncio.wait_for(self._future, timeout=self._timeout)
         else:
             response = await self._future
 
-        # 错误分支
-        if isinstance(response, JSONRPCError):
-            if self._error_handler:
+        timing = self._timing
+        if timing is None:
+            return await self._settle(response)
+        if timing.responded is not None:
+            timing.record("resume", time.perf_counter() - timing.responded)
+        try:
+            return await self._settle(response)
+        finally:
+            timing.record("total", time.perf_counter() - timing.started)
+
+    async def _settle(self, response: JSONRPCResponse | JSONRPCError | dict) -> Any:
+        """按响应类型调用处理器或返回结果
+
+        Args:
+            response: 响应，raw_responses 模式下为原始字典
+        """
+        # raw_responses 模式下响应为原始字典
+        if isinstance(response, dict):
+            error = response.get("error")
+            if error is not None:
                 err = _make_rpc_exception(
-                    code=response.error.code,
-                    message=response.error.message,
-                    data=response.error.data,
-                    from_id=response.id,
+                    code=error.get("code"),
+                    message=error.get("message"),
+                    data=error.get("data"),
+                    from_id=response.get("id", 0),
                 )
-                result = self._error_handler(err)
-                if asyncio.iscoroutine(result):
-                    return await result
-                return result
-            raise _make_rpc_exception(
+                return await self._handle_error(err)
+            if self._then_handler:
+                return await self._invoke_then(response, response.get("result"))
+            return response.get("result")
+
+        # 错误分支
+        if isinstance(response, JSONRPCError):
+            err = _make_rpc_exception(
                 code=response.error.code,
                 message=response.error.message,
                 data=response.error.data,
                 from_id=response.id,
             )
+            return await self._handle_error(err)
 
         # 成功分支
         if self._then_handler:
-            return await self._invoke_then(response)
+            return await self._invoke_then(response, response.result)
         return response.result
 
-    async def _invoke_then(self, response: JSONRPCResponse) -> Any:
-        """用 inspect.signature 解析 handler 参数，自动注入"""
+    async def _handle_error(self, err: RPCError) -> Any:
+        """调用错误处理器，未注册时抛出异常"""
+        if self._error_handler is None:
+            raise err
+        result = self._error_handler(err)
+        if asyncio.iscoroutine(result):
+            return await result
+        return result
+
+    async def _invoke_then(self, response: JSONRPCResponse | dict, result: Any) -> Any:
+        """用 inspect.signature 解析 handler 参数，自动注入
+
+        Args:
+            response: 完整响应，raw_responses 模式下为原始字典
+            result: 响应结果
+        """
         if self._then_handler is None:
             raise ValueError("then() Not Registered handler function")
 
@@ -96,32 +157,35 @@ class RPCFuture:
         for name, param in sig.parameters.items():
             annotation = param.annotation
 
-            # 1. Pydantic BaseModel 子类 → response.result 验证为该类型
+            # 1. Pydantic BaseModel 子类 → result 验证为该类型
             if (
                 annotation is not inspect.Parameter.empty
                 and isinstance(annotation, type)
                 and issubclass(annotation, BaseModel)
             ):
-                kwargs[name] = annotation.model_validate(response.result)
+                kwargs[name] = annotation.model_validate(result)
             # 2. extra_params 中的同名参数
             elif name in self._then_extra_params:
                 kwargs[name] = self._then_extra_params[name]
-            # 3. 参数名为 "result" → 注入 response.result
+            # 3. 参数名为 "result" → 注入 result
             elif name == "result":
-                kwargs[name] = response.result
-            # 4. 参数名为 "response" → 注入完整 JSONRPCResponse
+                kwargs[name] = result
+            # 4. 参数名为 "response" → 注入完整响应
             elif name == "response":
                 kwargs[name] = response
             # 5. 有默认值 → 使用默认值
             elif param.default is not inspect.Parameter.empty:
                 continue
-            # 6. 兜底 → 注入 response.result
+            # 6. 兜底 → 注入 result
             else:
-                kwargs[name] = response.result
+                kwargs[name] = result
 
+        started = time.perf_counter() if self._timing is not None else None
         result = self._then_handler(**kwargs)
         if asyncio.iscoroutine(result):
             result = await result
+        if started is not None:
+            self._timing.record("then", time.perf_counter() - started)
         return result
 
     def __await__(self):
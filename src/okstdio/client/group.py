@@ -0,0 +1,214 @@
+"""ClientGroup 负载均衡客户端组模块
+
+将运行同一应用的多个 RPCClient 视为一个逻辑端点，按负载均衡策略为每个调用选择客户端。
+"""
+
+import asyncio
+import random
+from typing import Any, Dict, Iterable, List, Literal, Optional, get_args
+
+from .application import RPCClient
+from .future import RPCFuture
+from .hashring import HashRing
+
+
+BalanceStrategy = Literal["round_robin", "least_outstanding", "p2c", "consistent_hash"]
+BALANCE_STRATEGIES = get_args(BalanceStrategy)
+
+
+class ClientGroup:
+    """负载均衡客户端组
+
+    组内的客户端应运行同一应用。每次调用按策略选择一个正在运行的客户端：
+        - "round_robin": 轮询
+        - "least_outstanding": 选择未完成请求最少的客户端
+        - "p2c": 随机取两个客户端，选择未完成请求较少的一个（power of two choices），
+          在客户端数量较多时以 O(1) 开销获得接近 least_outstanding 的效果
+        - "consistent_hash": 按调用方指定的键做一致性哈希，同一个键总是路由到同一个客户端，
+          适合客户端持有按实体 ID 分片的内存状态。增删客户端时只有约 1/N 的键改变归属；
+          键所属的客户端未运行时沿哈希环选择下一个客户端
+
+    例子：
+        ```python
+        async with ClientManager() as manager:
+            for i in range(4):
+                manager.add(f"worker{i}", "tests.test_server")
+            await manager.start_all()
+
+            group = manager.group(strategy="least_outstanding")
+            results = await asyncio.gather(*(group.call("healthy") for _ in range(100)))
+        ```
+
+    Args:
+        clients: 组内的客户端
+        strategy: 负载均衡策略，默认 "round_robin"
+        key_param: consistent_hash 策略下，调用未显式传入 key 时从 params 中取该字段作为键
+        replicas: consistent_hash 策略下每个客户端的虚拟节点数量，默认 160
+
+    Raises:
+        ValueError: 当策略不受支持时
+    """
+
+    def __init__(
+        self,
+        clients: Iterable[RPCClient] = (),
+        strategy: BalanceStrategy = "round_robin",
+        *,
+        key_param: Optional[str] = None,
+        replicas: int = 160,
+    ):
+        if strategy not in BALANCE_STRATEGIES:
+            raise ValueError(
+                f"不支持的负载均衡策略: {strategy}，可选值: {', '.join(BALANCE_STRATEGIES)}"
+            )
+        self.strategy = strategy
+        self._clients: List[RPCClient] = list(clients)
+        self._next = 0
+        self._pick = getattr(self, f"_pick_{strategy}")
+        self.key_param = key_param
+        self._ring: Optional[HashRing] = None
+        if strategy == "consistent_hash":
+            self._by_name: Dict[str, RPCClient] = {c.client_name: c for c in self._clients}
+            self._ring = HashRing(self._by_name, replicas=replicas)
+
+    def add(self, client: RPCClient) -> None:
+        """添加客户端
+
+        Args:
+            client: RPCClient 实例
+        """
+        self._clients.append(client)
+        if self._ring is not None:
+            self._by_name[client.client_name] = client
+            self._ring.add(client.client_name)
+
+    def remove(self, client_name: str) -> Optional[RPCClient]:
+        """移除客户端（不停止）
+
+        Args:
+            client_name: 客户端名称
+
+        Returns:
+            移除的客户端实例，不存在则返回 None
+        """
+        for i, client in enumerate(self._clients):
+            if client.client_name == client_name:
+                if self._ring is not None:
+                    self._by_name.pop(client_name, None)
+                    self._ring.remove(client_name)
+                return self._clients.pop(i)
+        return None
+
+    @property
+    def clients(self) -> List[RPCClient]:
+        """返回组内所有客户端"""
+        return list(self._clients)
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    def pick(self, key: Any = None) -> RPCClient:
+        """按策略选择一个正在运行的客户端
+
+        Args:
+            key: consistent_hash 策略下的路由键，其他策略忽略
+
+        Returns:
+            RPCClient: 选中的客户端
+
+        Raises:
+            RuntimeError: 当组内没有正在运行的客户端时
+            ValueError: consistent_hash 策略下未提供路由键时
+        """
+        client = self._pick(key)
+        if client is None:
+            raise RuntimeError("客户端组内没有正在运行的客户端")
+        return client
+
+    def call(
+        self,
+        method: str,
+        params: Any = None,
+        *,
+        key: Any = None,
+        timeout: Optional[float] = None,
+    ) -> RPCFuture:
+        """选择一个客户端发送请求（链式调用风格）
+
+        Args:
+            method: RPC 方法名
+            params: 方法参数
+            key: consistent_hash 策略下的路由键，默认取 params[key_param]
+            timeout: 超时时间（秒）
+
+        Returns:
+            RPCFuture: 可链式调用的 Future
+
+        Raises:
+            RuntimeError: 当组内没有正在运行的客户端时
+            ValueError: consistent_hash 策略下无法确定路由键时
+        """
+        return self.pick(self._route_key(params, key)).call(method, params, timeout=timeout)
+
+    async def send(self, method: str, params: Any = {}, *, key: Any = None) -> asyncio.Future:
+        """选择一个客户端发送请求
+
+        Args:
+            method: RPC 方法名
+            params: 方法参数
+            key: consistent_hash 策略下的路由键，默认取 params[key_param]
+
+        Returns:
+            asyncio.Future: 用于等待响应的 Future
+
+        Raises:
+            RuntimeError: 当组内没有正在运行的客户端时
+            ValueError: consistent_hash 策略下无法确定路由键时
+        """
+        return await self.pick(self._route_key(params, key)).send(method, params)
+
+    def _route_key(self, params: Any, key: Any) -> Any:
+        """确定路由键：显式传入的 key 优先，否则从 params 中取 key_param 字段"""
+        if key is not None or self._ring is None:
+            return key
+        if self.key_param is not None and isinstance(params, dict):
+            return params.get(self.key_param)
+        return None
+
+    def _pick_round_robin(self, key: Any = None) -> Optional[RPCClient]:
+        """轮询，跳过未运行的客户端"""
+        clients = self._clients
+        for _ in range(len(clients)):
+            self._next = (self._next + 1) % len(clients)
+            client = clients[self._next]
+            if client.running:
+                return client
+        return None
+
+    def _pick_least_outstanding(self, key: Any = None) -> Optional[RPCClient]:
+        """选择未完成请求最少的客户端"""
+        best = None
+        for client in self._clients:
+            if client.running and (best is None or client.pending_count < best.pending_count):
+                best = client
+        return best
+
+    def _pick_p2c(self, key: Any = None) -> Optional[RPCClient]:
+        """随机取两个客户端，选择未完成请求较少的一个"""
+        clients = self._clients
+        if len(clients) >= 2:
+            a, b = random.sample(clients, 2)
+            if a.running and b.running:
+                return a if a.pending_count <= b.pending_count else b
+        # 客户端不足两个或抽中了未运行的客户端：退回到完整扫描
+        return self._pick_least_outstanding()
+
+    def _pick_consistent_hash(self, key: Any = None) -> Optional[RPCClient]:
+        """按路由键的一致性哈希选择客户端，所属客户端未运行时沿环选择下一个"""
+        if key is None:
+            raise ValueError("consistent_hash 策略需要路由键：传入 key 或设置 key_param")
+        for name in self._ring.iter_nodes(key):
+            client = self._by_name[name]
+            if client.running:
+                return client
+        return None
@@ -0,0 +1,127 @@
+"""一致性哈希环模块
+
+为 ClientGroup 的 "consistent_hash" 策略提供键到节点的映射。
+每个节点在环上放置多个虚拟节点，增删节点时只有约 1/N 的键改变归属。
+"""
+
+import bisect
+import hashlib
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+
+def _hash(value: str) -> int:
+    """取 8 字节 blake2b 摘要作为环上的位置
+
+    不使用 md5：启用 FIPS 的 Python 构建中 hashlib.md5 会报错。
+    """
+    return int.from_bytes(
+        hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big"
+    )
+
+
+class HashRing:
+    """一致性哈希环
+
+    例子：
+        ```python
+        ring = HashRing(["w1", "w2", "w3"])
+        ring.get("user:42")   # 例如 "w2"，同一个键总是映射到同一个节点
+        ring.remove("w2")     # 只有原本属于 w2 的键改变归属
+        ```
+
+    Args:
+        nodes: 初始节点名称
+        replicas: 每个节点的虚拟节点数量，越多分布越均匀，默认 160
+    """
+
+    def __init__(self, nodes: Iterable[str] = (), replicas: int = 160):
+        if replicas < 1:
+            raise ValueError("虚拟节点数量必须大于 0")
+        self.replicas = replicas
+        self._points: List[int] = []
+        self._owners: Dict[int, str] = {}
+        self._nodes: Dict[str, List[int]] = {}
+        for node in nodes:
+            self.add(node)
+
+    def add(self, node: str) -> None:
+        """添加节点，已存在时忽略
+
+        Args:
+            node: 节点名称
+        """
+        if node in self._nodes:
+            return
+        points = []
+        for i in range(self.replicas):
+            point = _hash(f"{node}#{i}")
+            # 极少数哈希冲突时保留先加入的节点
+            if point in self._owners:
+                continue
+            self._owners[point] = node
+            bisect.insort(self._points, point)
+            points.append(point)
+        self._nodes[node] = points
+
+    def remove(self, node: str) -> None:
+        """移除节点，不存在时忽略
+
+        Args:
+            node: 节点名称
+        """
+        points = self._nodes.pop(node, None)
+        if not points:
+            return
+        removed = set(points)
+        for point in points:
+            del self._owners[point]
+        self._points = [p for p in self._points if p not in removed]
+
+    @property
+    def nodes(self) -> List[str]:
+        """返回所有节点名称"""
+        return list(self._nodes)
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def __contains__(self, node: str) -> bool:
+        return node in self._nodes
+
+    def get(self, key: Any) -> Optional[str]:
+        """返回键所属的节点
+
+        Args:
+            key: 任意键，按 str(key) 计算哈希
+
+        Returns:
+            节点名称，环为空时返回 None
+        """
+        if not self._points:
+            return None
+        index = bisect.bisect(self._points, _hash(str(key)))
+        return self._owners[self._points[index % len(self._points)]]
+
+    def iter_nodes(self, key: Any) -> Iterator[str]:
+        """从键所属的节点开始，沿环顺时针依次返回各个不同的节点
+
+        用于键所属节点不可用时按固定顺序选择后备节点。
+
+        Args:
+            key: 任意键
+
+        Yields:
+            str: 节点名称
+        """
+        points = self._points
+        if not points:
+            return
+        start = bisect.bisect(points, _hash(str(key)))
+        seen = set()
+        for i in range(len(points)):
+            node = self._owners[points[(start + i) % len(points)]]
+            if node not in seen:
+                seen.add(node)
+                yield node
+                if len(seen) == len(self._nodes):
+                    return
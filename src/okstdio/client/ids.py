@@ -0,0 +1,57 @@
+"""请求 ID 生成器模块
+
+提供 RPCClient 可用的请求 ID 生成器。生成器是无参数的可调用对象，每次调用返回一个新的 ID。
+"""
+
+import itertools
+from typing import Callable
+
+
+IDGenerator = Callable[[], int | str]
+
+
+def counter_ids(start: int = 1) -> IDGenerator:
+    """单调递增的整数 ID（RPCClient 的默认生成器）
+
+    整数 ID 生成开销低、作为字典键哈希快，编码后也只占几个字节。
+    ID 0 保留给服务器无法识别请求 ID 时的错误响应，因此从 1 开始。
+
+    Args:
+        start: 起始值，默认 1
+
+    Returns:
+        IDGenerator: ID 生成器
+
+    例子：
+        ```python
+        next_id = counter_ids()
+        next_id()  # 1
+        next_id()  # 2
+        ```
+    """
+    if start < 1:
+        raise ValueError("请求 ID 必须从 1 开始，0 保留给无 ID 的错误响应")
+    return itertools.count(start).__next__
+
+
+def prefixed_ids(prefix: str, start: int = 1) -> IDGenerator:
+    """带前缀的紧凑字符串 ID
+
+    多个客户端共用日志时，用前缀区分请求来源；序号以十六进制表示，保持 ID 简短。
+
+    Args:
+        prefix: ID 前缀，如客户端名称
+        start: 起始序号，默认 1
+
+    Returns:
+        IDGenerator: ID 生成器
+
+    例子：
+        ```python
+        next_id = prefixed_ids("w3-")
+        next_id()  # "w3-1"
+        next_id()  # "w3-2"
+        ```
+    """
+    counter = counter_ids(start)
+    return lambda: f"{prefix}{counter():x}"
@@ -4,10 +4,20 @@
 """
 
 from dataclasses import dataclass, field
-from typing import Any, Optional, Dict, List
+from collections import deque
+from typing import Any, Deque, Optional, Dict, List, Set
 import asyncio
+import itertools
+import logging
 
 from .application import RPCClient
+from .group import ClientGroup, BalanceStrategy
+from .metrics import ClientMetrics
+
+logger = logging.getLogger(__name__)
+
+# 预热池客户端编号，进程内所有预热池共用，前缀相同的预热池不会生成相同的名称
+_warm_client_ids = itertools.count(1)
 
 
 @dataclass
@@ -38,19 +48,21 @@ class ClientManager:
 
     def __init__(self):
         self._clients: Dict[str, RPCClient] = {}
+        self._pools: List["WarmPool"] = []
 
-    def add(self, client_name: str, app: str, *extra_args) -> RPCClient:
+    def add(self, client_name: str, app: str, *extra_args, **client_options) -> RPCClient:
         """创建并添加客户端
 
         Args:
             client_name: 客户端名称
             app: 应用程序路径
             *extra_args: 应用程序启动参数
+            **client_options: 传给 RPCClient 的其他参数（如 metrics、ready_timeout）
 
         Returns:
             RPCClient: 创建的客户端实例
         """
-        client = RPCClient(client_name, app=app, *extra_args)
+        client = RPCClient(client_name, app, *extra_args, **client_options)
         self._clients[client_name] = client
         return client
 
@@ -136,13 +148,115 @@ class ClientManager:
             raise RuntimeError(f"部分客户端启动失败: {details}")
 
     async def stop_all(self) -> None:
-        """并发停止所有客户端，静默忽略异常"""
+        """并发停止所有客户端（包括预热池中的空闲客户端），静默忽略异常"""
         tasks = [
             asyncio.create_task(client.stop())
             for client in self._clients.values()
         ]
+        tasks.extend(asyncio.create_task(pool.close()) for pool in self._pools)
         await asyncio.gather(*tasks, return_exceptions=True)
 
+    def metrics(self, client_names: Optional[List[str]] = None) -> ClientMetrics:
+        """汇总各客户端的请求耗时统计
+
+        未启用指标的客户端被跳过。
+
+        Args:
+            client_names: 要汇总的客户端名称，默认为所有客户端
+
+        Returns:
+            ClientMetrics: 新的汇总统计，按方法合并各客户端的直方图
+
+        例子：
+            ```python
+            snapshot = manager.metrics().snapshot()
+            phases = snapshot["methods"]["compute"]["phases"]
+            print(phases["response"]["p99_ms"], phases["resume"]["p99_ms"])
+            ```
+        """
+        names = self._clients.keys() if client_names is None else client_names
+        return ClientMetrics.combine(
+            client.metrics
+            for name in names
+            if (client := self._clients.get(name)) is not None
+            and client.metrics is not None
+        )
+
+    def group(
+        self,
+        client_names: Optional[List[str]] = None,
+        *,
+        strategy: BalanceStrategy = "round_robin",
+        key_param: Optional[str] = None,
+    ) -> ClientGroup:
+        """创建负载均衡客户端组
+
+        将运行同一应用的多个客户端视为一个逻辑端点，每次调用按策略选择一个客户端。
+
+        Args:
+            client_names: 组内客户端名称列表，None 表示当前所有客户端
+            strategy: 负载均衡策略，"round_robin"、"least_outstanding"、"p2c" 或 "consistent_hash"
+            key_param: consistent_hash 策略下从 params 中取路由键的字段名
+
+        Returns:
+            ClientGroup: 客户端组
+
+        Raises:
+            KeyError: 客户端不存在
+            ValueError: 当策略不受支持时
+
+        例子：
+            ```python
+            group = manager.group(["w1", "w2", "w3"], strategy="p2c")
+            result = await group.call("healthy")
+
+            # 按实体 ID 分片：同一个 user_id 总是路由到同一个客户端
+            shards = manager.group(strategy="consistent_hash", key_param="user_id")
+            profile = await shards.call("user.profile", {"user_id": 42})
+            ```
+        """
+        names = client_names if client_names is not None else list(self._clients)
+        return ClientGroup(
+            (self._clients[name] for name in names), strategy=strategy, key_param=key_param
+        )
+
+    def warm_pool(
+        self,
+        app: str,
+        size: int,
+        *extra_args,
+        name_prefix: Optional[str] = None,
+        **client_options,
+    ) -> "WarmPool":
+        """创建预热池
+
+        预热池保持 size 个已启动的空闲服务器，acquire() 立即交出一个并在后台补充，
+        突发流量不必等待子进程的解释器启动和模块导入。
+
+        Args:
+            app: 应用程序路径
+            size: 保持的空闲客户端数量
+            *extra_args: 应用程序启动参数
+            name_prefix: 客户端名称前缀，默认为 app，客户端命名为 "{name_prefix}-{序号}"
+            **client_options: 传给 RPCClient 的其他参数（如 ready_timeout、raw_responses）
+
+        Returns:
+            WarmPool: 预热池，需调用 start() 开始预热
+
+        例子：
+            ```python
+            async with ClientManager() as manager:
+                pool = manager.warm_pool("tests.test_server", size=4)
+                await pool.start()
+
+                client = await pool.acquire()   # 立即可用，已加入 manager
+                await client.call("healthy")
+            ```
+        """
+        pool = WarmPool(self, app, size, *extra_args, name_prefix=name_prefix, **client_options)
+        self._pools.append(pool)
+        return pool
+
     async def send_to(self, client_name: str, method: str, params: Any = {}) -> asyncio.Future:
         """向指定客户端发送请求
 
@@ -213,9 +327,13 @@ class ClientManager:
                     response = await asyncio.wait_for(future, timeout=timeout)
                 else:
                     response = await future
+                if isinstance(response, dict):
+                    result = response.get("result")
+                else:
+                    result = getattr(response, "result", None)
                 return BroadcastResult(
                     client_name=name,
-                    result=response.result if hasattr(response, 'result') else None,
+                    result=result,
                     response=response,
                 )
             except Exception as e:
@@ -229,3 +347,207 @@ class ClientManager:
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         await self.stop_all()
+
+
+class WarmPool:
+    """预热池，由 ClientManager.warm_pool() 创建
+
+    预先启动指定数量的同一应用的服务器并保持空闲。acquire() 交出一个已就绪的客户端
+    （同时加入所属 ClientManager），并在后台启动新的客户端补足空闲数量。
+    后台启动失败时，错误交给等待中的 acquire()；下一次 acquire() 会重新补充。
+
+    Args:
+        manager: 所属的 ClientManager，交出的客户端会加入其中
+        app: 应用程序路径
+        size: 保持的空闲客户端数量
+        *extra_args: 应用程序启动参数
+        name_prefix: 客户端名称前缀，默认为 app
+        **client_options: 传给 RPCClient 的其他参数
+    """
+
+    def __init__(
+        self,
+        manager: ClientManager,
+        app: str,
+        size: int,
+        *extra_args,
+        name_prefix: Optional[str] = None,
+        **client_options,
+    ):
+        if size < 1:
+            raise ValueError("预热池大小必须大于 0")
+        self._manager = manager
+        self._app = app
+        self._extra_args = extra_args
+        self._client_options = client_options
+        self._name_prefix = name_prefix or app
+        self.size = size
+        self._idle: Deque[RPCClient] = deque()
+        # 等待客户端的 acquire()，按先后顺序交出新启动的客户端或启动错误
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._starting: Set[asyncio.Task] = set()
+        # 停止已退出的空闲客户端的后台任务，close() 时等待完成
+        self._stopping: Set[asyncio.Task] = set()
+        self._closed = False
+
+    @property
+    def idle_count(self) -> int:
+        """空闲（已就绪、未交出）的客户端数量"""
+        return len(self._idle)
+
+    @property
+    def starting_count(self) -> int:
+        """正在启动的客户端数量"""
+        return len(self._starting)
+
+    async def start(self) -> None:
+        """启动预热，等待空闲客户端全部就绪
+
+        Raises:
+            RuntimeError: 当有客户端启动失败时
+        """
+        self._replenish()
+        results = await asyncio.gather(*self._starting, return_exceptions=True)
+        failures = [r for r in results if isinstance(r, BaseException)]
+        if failures:
+            raise RuntimeError(f"预热池部分客户端启动失败: {failures[0]}")
+
+    async def acquire(self, timeout: Optional[float] = None) -> RPCClient:
+        """取出一个已就绪的客户端
+
+        有空闲客户端时立即返回，否则等待正在启动的客户端就绪。
+        取出的客户端加入所属 ClientManager，由其负责停止；池在后台补充新的空闲客户端。
+
+        Args:
+            timeout: 没有空闲客户端时的最长等待时间（秒）
+
+        Returns:
+            RPCClient: 已启动的客户端
+
+        Raises:
+            RuntimeError: 当预热池已关闭，或等待的客户端启动失败时
+            asyncio.TimeoutError: 等待超时
+        """
+        if self._closed:
+            raise RuntimeError("预热池已关闭")
+
+        while True:
+            if self._idle:
+                client = self._idle.popleft()
+            else:
+                self._replenish()
+                client = await self._wait_client(timeout)
+            # 空闲期间退出的子进程不交出
+            if client.process is not None and client.process.returncode is None:
+                break
+            logger.warning(f"预热池客户端 {client.client_name} 已退出，丢弃")
+            task = asyncio.create_task(client.stop())
+            self._stopping.add(task)
+            task.add_done_callback(self._on_stopped)
+
+        self._manager.add_client(client)
+        self._replenish()
+        return client
+
+    async def _wait_client(self, timeout: Optional[float]) -> RPCClient:
+        """等待下一个启动完成的客户端
+
+        Raises:
+            RuntimeError: 当客户端启动失败或预热池关闭时
+            asyncio.TimeoutError: 等待超时
+        """
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            return await asyncio.wait_for(waiter, timeout=timeout)
+        except BaseException:
+            # 超时或取消的同时已被交出客户端时，放回空闲队列
+            if waiter.done() and not waiter.cancelled() and waiter.exception() is None:
+                self._idle.appendleft(waiter.result())
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+    def _hand_over(self, client: RPCClient) -> None:
+        """将启动完成的客户端交给最早的等待者，没有等待者时放入空闲队列"""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(client)
+                return
+        self._idle.append(client)
+
+    def _fail_waiter(self, error: BaseException) -> None:
+        """将启动错误交给最早的等待者，没有等待者时丢弃"""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_exception(error)
+                return
+
+    def _next_name(self) -> str:
+        """生成不与所属 ClientManager 中已有客户端重名的名称"""
+        while True:
+            name = f"{self._name_prefix}-{next(_warm_client_ids)}"
+            if name not in self._manager:
+                return name
+
+    def _replenish(self) -> None:
+        """在后台启动新的客户端，补足空闲数量"""
+        if self._closed:
+            return
+        missing = self.size - len(self._idle) - len(self._starting)
+        for _ in range(missing):
+            task = asyncio.create_task(self._start_one())
+            self._starting.add(task)
+            task.add_done_callback(self._on_started)
+
+    def _on_started(self, task: asyncio.Task) -> None:
+        """启动任务结束回调，失败已在 _start_one 中记录日志并交给等待者"""
+        self._starting.discard(task)
+        if not task.cancelled():
+            task.exception()
+
+    def _on_stopped(self, task: asyncio.Task) -> None:
+        """停止任务结束回调，记录停止失败"""
+        self._stopping.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"预热池客户端停止失败: {task.exception()}")
+
+    async def _start_one(self) -> None:
+        """启动一个客户端并放入空闲队列"""
+        name = self._next_name()
+        client = RPCClient(name, self._app, *self._extra_args, **self._client_options)
+        try:
+            await client.start()
+        except Exception as e:
+            logger.error(f"预热池客户端 {name} 启动失败: {e}")
+            error = RuntimeError(f"预热池客户端 {name} 启动失败: {e}")
+            error.__cause__ = e
+            self._fail_waiter(error)
+            raise
+        if self._closed:
+            await client.stop()
+            return
+        self._hand_over(client)
+
+    async def close(self) -> None:
+        """关闭预热池：取消正在启动的客户端，停止所有空闲客户端，并等待后台停止任务完成
+
+        已交出的客户端属于 ClientManager，不在此停止。
+        """
+        self._closed = True
+        for task in list(self._starting):
+            task.cancel()
+        await asyncio.gather(*self._starting, return_exceptions=True)
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_exception(RuntimeError("预热池已关闭"))
+
+        clients = list(self._idle)
+        self._idle.clear()
+        await asyncio.gather(
+            *(c.stop() for c in clients), *self._stopping, return_exceptions=True
+        )
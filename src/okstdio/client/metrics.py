@@ -0,0 +1,172 @@
+"""客户端指标模块
+
+按方法统计请求在客户端各阶段的耗时，用于区分慢在子进程、管道还是本进程的事件循环。
+"""
+
+import time
+from typing import Dict, Iterable, Optional
+
+from ..general.metrics import LatencyHistogram
+
+
+# 请求的耗时阶段
+PHASES = ("queue", "drain", "response", "resume", "then", "total")
+
+
+class MethodTimings:
+    """单个方法的各阶段耗时
+
+    阶段：
+        - queue: 发起调用到请求帧交给 stdin 传输层（同一事件循环迭代内的帧合并写出）
+        - drain: send() / batch() 等待 stdin 写缓冲降到高水位以下的时间，只在发生反压时记录
+        - response: 请求帧写出到读循环读到响应，包含管道传输和子进程处理时间
+        - resume: 读到响应到等待结果的协程恢复执行，反映本进程事件循环的繁忙程度
+        - then: RPCFuture 的 then() 处理器耗时
+        - total: 发起调用到调用方拿到结果
+
+    Args:
+        calls: 收到响应的请求数量
+        errors: 收到错误响应的请求数量
+        phases: 阶段名称 → 延迟直方图
+    """
+
+    __slots__ = ("calls", "errors", "phases")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.phases: Dict[str, LatencyHistogram] = {
+            phase: LatencyHistogram() for phase in PHASES
+        }
+
+    def merge(self, other: "MethodTimings") -> None:
+        """合并另一个方法统计"""
+        self.calls += other.calls
+        self.errors += other.errors
+        for phase, histogram in other.phases.items():
+            self.phases[phase].merge(histogram)
+
+    def snapshot(self) -> dict:
+        """统计快照，没有记录的阶段不输出"""
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "phases": {
+                phase: histogram.snapshot()
+                for phase, histogram in self.phases.items()
+                if histogram.count
+            },
+        }
+
+
+class RequestTiming:
+    """单个请求的计时点，由 RPCClient 在启用指标时为每个请求创建
+
+    Args:
+        stats: 所属方法的统计
+        started: 发起调用的时间（time.perf_counter）
+        flushed: 请求帧写出的时间
+        responded: 读到响应的时间
+        deferred: 是否由 RPCFuture 负责记录 resume / then / total 阶段
+    """
+
+    __slots__ = ("stats", "started", "flushed", "responded", "deferred")
+
+    def __init__(self, stats: MethodTimings, started: float):
+        self.stats = stats
+        self.started = started
+        self.flushed: Optional[float] = None
+        self.responded: Optional[float] = None
+        self.deferred = False
+
+    def record(self, phase: str, seconds: float) -> None:
+        """记录一个阶段的耗时"""
+        self.stats.phases[phase].record(seconds)
+
+    def on_flushed(self, now: float) -> None:
+        """请求帧写出"""
+        self.flushed = now
+        self.record("queue", now - self.started)
+
+    def on_response(self, now: float, error: bool) -> None:
+        """读到响应"""
+        self.responded = now
+        self.stats.calls += 1
+        if error:
+            self.stats.errors += 1
+        self.record("response", now - (self.flushed or self.started))
+        if not self.deferred:
+            self.record("total", now - self.started)
+
+
+class ClientMetrics:
+    """客户端指标
+
+    例子：
+        ```python
+        client = RPCClient("worker", "tests.test_server", metrics=True)
+        ...
+        snapshot = client.metrics.snapshot()
+        snapshot["methods"]["hello"]["phases"]["response"]["p99_ms"]
+
+        # ClientManager 汇总所有客户端
+        manager.metrics().snapshot()
+        ```
+    """
+
+    def __init__(self):
+        self.methods: Dict[str, MethodTimings] = {}
+
+    def method(self, method: str) -> MethodTimings:
+        """获取方法的统计，不存在时创建"""
+        stats = self.methods.get(method)
+        if stats is None:
+            stats = self.methods[method] = MethodTimings()
+        return stats
+
+    def begin(self, method: str) -> RequestTiming:
+        """开始一个请求的计时
+
+        Args:
+            method: RPC 方法名称
+
+        Returns:
+            RequestTiming: 请求计时点
+        """
+        return RequestTiming(self.method(method), time.perf_counter())
+
+    def merge(self, other: "ClientMetrics") -> None:
+        """合并另一个客户端的统计"""
+        for method, stats in other.methods.items():
+            self.method(method).merge(stats)
+
+    @classmethod
+    def combine(cls, metrics: Iterable["ClientMetrics"]) -> "ClientMetrics":
+        """汇总多个客户端的统计
+
+        Args:
+            metrics: 各客户端的统计
+
+        Returns:
+            ClientMetrics: 新的汇总统计
+        """
+        combined = cls()
+        for item in metrics:
+            combined.merge(item)
+        return combined
+
+    def reset(self) -> None:
+        """清空统计"""
+        self.methods.clear()
+
+    def snapshot(self) -> dict:
+        """统计快照
+
+        Returns:
+            dict: {"methods": {方法名: {"calls", "errors", "phases": {阶段: 延迟统计（毫秒）}}}}
+        """
+        return {
+            "methods": {
+                method: stats.snapshot() for method, stats in self.methods.items()
+            }
+        }
@@ -0,0 +1,112 @@
+"""流式推送队列模块
+
+为监听队列提供容量上限、溢出策略和基于额度的流控。
+"""
+
+import asyncio
+from typing import Any, Callable, Literal, Optional, get_args
+
+
+OverflowPolicy = Literal["block", "drop_oldest", "drop_newest", "latest"]
+OVERFLOW_POLICIES = get_args(OverflowPolicy)
+
+
+class StreamQueue(asyncio.Queue):
+    """有界流式推送队列
+
+    队列满时按溢出策略处理新消息：
+        - "block": 读循环等待队列有空位（会同时阻塞该客户端其他响应的接收，
+          最终经管道反压减慢服务器写出）
+        - "drop_oldest": 丢弃最早的一条未读消息，放入新消息
+        - "drop_newest": 丢弃新消息
+        - "latest": 用新消息替换最后一条未读消息，较早的消息保持不变，
+          适合只关心最新状态的进度推送
+
+    指定 credit 时启用基于额度的流控：队列中的消息被取出或丢弃后，累计归还的额度达到
+    credit 的一半时调用 on_credit(归还数量)，由 RPCClient 以 __credit__ 通知发回服务器。
+
+    例子：
+        ```python
+        queue = StreamQueue(maxsize=100, overflow="drop_oldest")
+        queue.offer(message)    # 队列满时丢弃最早的消息
+        queue.dropped           # 已丢弃的消息数量
+        ```
+
+    Args:
+        maxsize: 队列容量，小于等于 0 时不限制，默认 0
+        overflow: 溢出策略，默认 "block"
+        credit: 流控额度（服务器最多可领先客户端消费的消息数），默认 None 即不启用流控
+        on_credit: 归还额度的回调
+
+    Raises:
+        ValueError: 当溢出策略不受支持或额度小于 1 时
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 0,
+        overflow: OverflowPolicy = "block",
+        *,
+        credit: Optional[int] = None,
+        on_credit: Optional[Callable[[int], Any]] = None,
+    ):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(
+                f"不支持的溢出策略: {overflow}，可选值: {', '.join(OVERFLOW_POLICIES)}"
+            )
+        if credit is not None and credit < 1:
+            raise ValueError("流控额度必须大于 0")
+        super().__init__(maxsize)
+        self.overflow = overflow
+        self.credit = credit
+        self.dropped = 0
+        self._on_credit = on_credit if credit is not None else None
+        self._credit_threshold = max(1, (credit or 0) // 2)
+        self._released = 0
+
+    def offer(self, item: Any) -> bool:
+        """不等待地放入一条消息，队列满时按溢出策略处理
+
+        Args:
+            item: 消息
+
+        Returns:
+            bool: 消息已处理（放入或按策略丢弃）时为 True；
+                "block" 策略下队列已满时为 False，调用方应改为 await put()
+        """
+        if not self.full():
+            self.put_nowait(item)
+            return True
+        if self.overflow == "block":
+            return False
+
+        self.dropped += 1
+        if self.overflow == "drop_newest":
+            # 被丢弃的消息同样占用过服务器的额度
+            self._release(1)
+            return True
+
+        # 被丢弃的消息视为已处理（task_done），新消息经 put_nowait 计入未完成数，
+        # 保证 join() 能够返回
+        if self.overflow == "drop_oldest":
+            self.get_nowait()
+        else:
+            self._queue.pop()
+            self._release(1)
+        self.task_done()
+        self.put_nowait(item)
+        return True
+
+    def _get(self) -> Any:
+        item = super()._get()
+        self._release(1)
+        return item
+
+    def _release(self, count: int) -> None:
+        """累计归还额度，达到阈值时通过回调发回"""
+        if self._on_credit is None:
+            return
+        self._released += count
+        if self._released >= self._credit_threshold:
+            released, self._released = self._released, 0
+            self._on_credit(released)
@@ -4,13 +4,18 @@
 """
 
 from .jsonrpc_model import (
+    READY_METHOD,
+    CREDIT_METHOD,
     BaseJSONRPC,
     JSONRPCRequest,
+    JSONRPCNotification,
     JSONRPCResponse,
+    EncodedJSONRPCResponse,
     JSONRPCErrorDetail,
     JSONRPCServerErrorDetail,
     JSONRPCError,
 )
+from .metrics import LatencyHistogram
 from .errors import (
     RPCError,
     RPCParseError,
@@ -22,12 +27,17 @@ from .errors import (
 )
 
 __all__ = [
+    "READY_METHOD",
+    "CREDIT_METHOD",
     "BaseJSONRPC",
     "JSONRPCRequest",
+    "JSONRPCNotification",
     "JSONRPCResponse",
+    "EncodedJSONRPCResponse",
     "JSONRPCErrorDetail",
     "JSONRPCServerErrorDetail",
     "JSONRPCError",
+    "LatencyHistogram",
     "RPCError",
     "RPCParseError",
     "RPCInvalidRequestError",
@@ -4,10 +4,22 @@
 """
 
 from pydantic import BaseModel, Field, field_validator, ValidationInfo
+from pydantic_core import to_json
 from typing import Any
 from .errors import RPCInvalidRequestError
 
 
+# 服务器开始读取请求时发送的就绪通知方法名
+READY_METHOD = "__ready__"
+
+# 客户端向服务器发放流式推送额度的通知方法名，参数为 {"id": 流 ID, "credit": 额度}，
+# credit 为 null 时取消该流的流控
+CREDIT_METHOD = "__credit__"
+
+# EncodedJSONRPCResponse 缺少预先序列化的结果时的占位
+_NOT_ENCODED = object()
+
+
 class BaseJSONRPC(BaseModel):
     """JSON-RPC 基础模型
     
@@ -45,6 +57,8 @@ class BaseJSONRPC(BaseModel):
 
     def encode(self, encoding: str = "utf-8"):
         """编码为字节
+
+        直接由序列化器输出 UTF-8 JSON 字节，不经过 model_dump_json 的字符串中转。
         
         Args:
             encoding: 编码格式，默认 "utf-8"
@@ -52,7 +66,8 @@ class BaseJSONRPC(BaseModel):
         Returns:
             bytes: 编码后的字节数据
         """
-        return self.model_dump_json().encode(encoding)
+        data = self.__pydantic_serializer__.to_json(self)
+        return data if encoding == "utf-8" else data.decode("utf-8").encode(encoding)
 
 
 class JSONRPCRequest(BaseJSONRPC):
@@ -80,6 +95,49 @@ class JSONRPCRequest(BaseJSONRPC):
     method: str = Field(description="请求方法")
     params: Any = Field(description="请求参数")
 
+    @property
+    def is_notification(self) -> bool:
+        """是否为通知（请求中没有 id 字段），通知不需要返回响应"""
+        return "id" not in self.model_fields_set
+
+
+class JSONRPCNotification(BaseModel):
+    """JSON-RPC 通知模型
+
+    用于表示不需要响应的 JSON-RPC 通知消息。通知不包含 id 字段，
+    接收方处理后不会返回任何响应（包括错误响应）。
+
+    Args:
+        jsonrpc: JSON-RPC 版本
+        method: 通知方法名称
+        params: 通知参数
+
+    例子：
+        ```json
+        {
+            "jsonrpc": "2.0",
+            "method": "log",
+            "params": {"level": "info", "message": "started"}
+        }
+        ```
+    """
+
+    jsonrpc: str = Field(default="2.0", description="JSON-RPC版本")
+    method: str = Field(description="通知方法")
+    params: Any = Field(default=None, description="通知参数")
+
+    def encode(self, encoding: str = "utf-8"):
+        """编码为字节
+
+        Args:
+            encoding: 编码格式，默认 "utf-8"
+
+        Returns:
+            bytes: 编码后的字节数据
+        """
+        data = self.__pydantic_serializer__.to_json(self)
+        return data if encoding == "utf-8" else data.decode("utf-8").encode(encoding)
+
 
 class JSONRPCResponse(BaseJSONRPC):
     """JSON-RPC 响应模型
@@ -104,6 +162,62 @@ class JSONRPCResponse(BaseJSONRPC):
     result: Any = Field(description="响应结果")
 
 
+class EncodedJSONRPCResponse(JSONRPCResponse):
+    """结果已预先序列化的 JSON-RPC 响应
+
+    用于内容不常变化的大型结果（如 __system__ 方法树）：结果只序列化一次并缓存为字节，
+    之后每次响应只需拼接请求 ID，不再重复序列化。result 字段仍保存原始对象，
+    供进程内调用方直接使用；result 被替换（如中间件改写响应）后按常规方式序列化。
+
+    例子：
+        ```python
+        result_json = pydantic_core.to_json(tree)
+        response = EncodedJSONRPCResponse.from_encoded(1, tree, result_json)
+        response.encode()  # b'{"id":1,"jsonrpc":"2.0","result":...}'
+        ```
+    """
+
+    # 使用 __slots__ 而不是 PrivateAttr，避免每次构造时初始化私有属性的开销；
+    # model_copy 等复制出的对象没有这两个属性，按常规方式序列化
+    __slots__ = ("_result_json", "_encoded_result")
+
+    @classmethod
+    def from_encoded(
+        cls, id: int | str, result: Any, result_json: bytes
+    ) -> "EncodedJSONRPCResponse":
+        """由结果对象及其序列化后的字节创建响应
+
+        Args:
+            id: 请求 ID
+            result: 响应结果
+            result_json: result 序列化后的 JSON 字节，调用方需保证两者一致
+
+        Returns:
+            EncodedJSONRPCResponse: 响应对象
+        """
+        response = cls(id=id, result=result)
+        object.__setattr__(response, "_result_json", result_json)
+        object.__setattr__(response, "_encoded_result", result)
+        return response
+
+    def encode(self, encoding: str = "utf-8"):
+        """编码为字节，结果部分直接使用预先序列化的字节
+
+        Args:
+            encoding: 编码格式，默认 "utf-8"
+
+        Returns:
+            bytes: 编码后的字节数据
+        """
+        if self.result is not getattr(self, "_encoded_result", _NOT_ENCODED):
+            return super().encode(encoding)
+        data = b'{"id":%b,"jsonrpc":"2.0","result":%b}' % (
+            to_json(self.id),
+            self._result_json,
+        )
+        return data if encoding == "utf-8" else data.decode("utf-8").encode(encoding)
+
+
 class JSONRPCErrorDetail(BaseModel):
     """JSON-RPC 错误详情模型
     
@@ -9,6 +9,8 @@ from .appdoc import AppDoc
 from .stream import StdioStream
 from .middleware import MiddlewareManager
 from .dependencies import DependencyContainer, Inject
+from .metrics import ServerMetrics
+from .cache import CachePolicy, ResultCache
 
 __all__ = [
     "RPCServer",
@@ -19,4 +21,7 @@ __all__ = [
     "MiddlewareManager",
     "DependencyContainer",
     "Inject",
+    "ServerMetrics",
+    "CachePolicy",
+    "ResultCache",
 ]
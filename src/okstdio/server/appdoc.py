@@ -227,7 +227,7 @@ class AppDoc:
             methods = []
             for method_name, (func, label) in router.methods.items():
                 # 跳过系统方法
-                if method_name == "__system__":
+                if router.methods.get_options(method_name).get("system"):
                     continue
                 
                 path = ".".join(filter(None, [full_prefix, method_name]))
@@ -4,23 +4,100 @@
 服务器通过标准输入输出与父进程进行 JSON-RPC 协议的消息交换。
 """
 
-import inspect
 import json
-from typing import Callable, Any, Type
+import re
+import os
+import sys
+import functools
+from collections import deque
+import hashlib
+from dataclasses import replace
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Callable, Any, NamedTuple, Type, Optional
 import asyncio
 import logging
-from pydantic import BaseModel, ValidationError
+from pydantic import ValidationError
+from pydantic_core import to_json
 from .stream import StdioStream
-from .router import RPCRouter
+from .router import RPCRouter, Route
 from .middleware import MiddlewareManager
 from .appdoc import AppDoc
-from .dependencies import DependencyContainer, is_inject_param, unwrap_inject_type
+from .dependencies import DependencyContainer
+from .callplan import CallPlan
+from .metrics import ServerMetrics
+from .cache import ResultCache
 from ..general.jsonrpc_model import *
 from ..general.errors import *
 
 logger = logging.getLogger(__name__)
 
 
+# 批量请求以 "[" 开头（允许前导空白），只匹配开头，不扫描整个请求
+_BATCH_PREFIX = re.compile(rb"[ \t\r\n]*\[")
+
+# __credit__ 流控通知在读循环中直接处理，先以子串快速筛选
+_CREDIT_MARKER = f'"{CREDIT_METHOD}"'.encode()
+
+
+def _init_process_worker() -> None:
+    """进程池工作进程初始化
+
+    工作进程继承了服务器的标准输入输出，而标准输出是 JSON-RPC 通道。
+    将标准输入指向空设备、标准输出重定向到标准错误，避免方法中的输出破坏通信。
+    """
+    devnull = os.open(os.devnull, os.O_RDONLY)
+    os.dup2(devnull, 0)
+    os.close(devnull)
+    sys.stdout.flush()
+    os.dup2(2, 1)
+
+
+class _MethodTree(NamedTuple):
+    """缓存的方法树
+
+    Args:
+        tree: 方法树字典（含 etag 字段）
+        json: 方法树序列化后的 JSON 字节
+        etag: 方法树内容的摘要，内容不变时跨进程、跨重启保持一致
+    """
+
+    tree: dict
+    json: bytes
+    etag: str
+
+
+class _CreditWindow:
+    """单个流的推送额度
+
+    客户端通过 __credit__ 通知发放额度，IOWrite.write 每推送一条消息消耗一个额度，
+    额度用完时等待客户端归还。关闭后不再限制。
+    """
+
+    def __init__(self):
+        self.credit = 0
+        self.closed = False
+        self._event = asyncio.Event()
+
+    def grant(self, credit: int) -> None:
+        """发放额度"""
+        self.credit += credit
+        if self.credit > 0:
+            self._event.set()
+
+    def close(self) -> None:
+        """取消流控，唤醒所有等待者"""
+        self.closed = True
+        self._event.set()
+
+    async def acquire(self) -> None:
+        """消耗一个额度，没有额度时等待"""
+        while not self.closed and self.credit <= 0:
+            self._event.clear()
+            await self._event.wait()
+        if not self.closed:
+            self.credit -= 1
+
+
 class IOWrite:
     """写入依赖，用于在方法中注入写入依赖
 
@@ -38,6 +115,9 @@ class IOWrite:
                 await asyncio.sleep(1)
         ```
 
+    客户端为某个流 ID 启用了额度流控（stream(..., credit=n)）时，write 向该 ID 推送的
+    未消费消息达到额度后会等待客户端归还额度，从而减慢生产者。
+
     Args:
         app: 关联的 RPCServer 实例
     """
@@ -67,6 +147,9 @@ class IOWrite:
         """
         if isinstance(response, dict):
             response = JSONRPCResponse(**response)
+        window = self.__app._credit_windows.get(response.id)
+        if window is not None:
+            await window.acquire()
         await self.__app.write_line(response)
 
 
@@ -143,14 +226,44 @@ class RPCServer(StdioStream, RPCRouter, AppDoc):
             await io_write.write({"result": "progress"})
         ```
 
+    并发处理示例：
+        ```python
+        # 最多同时处理 32 个请求，慢方法不再阻塞其他请求
+        app = RPCServer("app", max_concurrency=32, process_workers=4)
+
+        # 阻塞的同步方法放入线程池，CPU 密集方法放入进程池
+        @app.add_method(executor="thread")
+        def read_device(path: str) -> str:
+            ...
+
+        @app.add_method(executor="process")
+        def resize(path: str, width: int) -> str:
+            ...
+        ```
+
     Args:
         server_name: 服务器名称，默认 "app"
         label: 服务器标签/描述，默认 ""
         version: 服务器版本，默认 "v0.1.0"
+        max_concurrency: 同时处理的最大请求数，默认 1（逐条顺序处理）
+        thread_workers: 线程池大小，默认 None（由 ThreadPoolExecutor 决定）
+        process_workers: 进程池大小，默认 None（CPU 核心数）
+        flush_interval: 响应合并写出的最长等待时间（秒），默认 0.0
+        max_line_length: 单条请求的最大字节数，默认 64 MiB
+        metrics: 是否启用方法指标统计，默认 False
     """
 
     def __init__(
-        self, server_name: str = "app", label: str = "", version: str = "v0.1.0"
+        self,
+        server_name: str = "app",
+        label: str = "",
+        version: str = "v0.1.0",
+        max_concurrency: int = 1,
+        thread_workers: Optional[int] = None,
+        process_workers: Optional[int] = None,
+        flush_interval: float = 0.0,
+        max_line_length: int = 64 * 1024 * 1024,
+        metrics: bool = False,
     ):
         """初始化 RPC 服务器
 
@@ -158,11 +271,46 @@ class RPCServer(StdioStream, RPCRouter, AppDoc):
             server_name: 服务器名称，默认 "app"
             label: 服务器标签/描述，默认 ""
             version: 服务器版本，默认 "v0.1.0"
+            max_concurrency: 同时处理的最大请求数，默认 1。
+                为 1 时按读取顺序逐条处理请求；
+                大于 1 时为每个请求创建任务并发处理，响应按完成顺序写回。
+            thread_workers: executor="thread" 方法使用的线程池大小，默认 None
+            process_workers: executor="process" 方法使用的进程池大小，默认 None
+            flush_interval: 响应写出前的最长合并等待时间（秒），默认 0.0，
+                即同一事件循环迭代内产生的响应合并为一次写出
+            max_line_length: 单条请求（一行）的最大字节数，默认 64 MiB，超出的请求被丢弃
+            metrics: 是否启用方法指标统计（调用次数、错误次数、正在执行数、延迟直方图），
+                默认 False。可通过 __metrics__ 系统方法查询，也可稍后调用 enable_metrics() 启用
+
+        执行池在第一次使用时创建，服务器停止时关闭。
+
+        Raises:
+            ValueError: 当 max_concurrency 小于 1 时
         """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency 必须大于等于 1")
+
         self.server_name = server_name
         self.version = version
-
-        StdioStream.__init__(self)
+        self.max_concurrency = max_concurrency
+        self.thread_workers = thread_workers
+        self.process_workers = process_workers
+        self._executors: dict[str, Executor] = {}
+
+        # 完整方法路径 → 路由项，路由树变化时置空，下次请求时重建
+        self._routes: Optional[dict[str, Route]] = None
+        # __system__ 返回的方法树缓存，与路由表同时失效
+        self._method_tree: Optional[_MethodTree] = None
+        # 方法指标，未启用时为 None
+        self.metrics: Optional[ServerMetrics] = ServerMetrics() if metrics else None
+        # 启用了结果缓存的方法的缓存结果
+        self.result_cache = ResultCache()
+        # 流 ID → 客户端发放的推送额度
+        self._credit_windows: dict[int | str, _CreditWindow] = {}
+
+        StdioStream.__init__(
+            self, flush_interval=flush_interval, max_line_length=max_line_length
+        )
         RPCRouter.__init__(self, server_name, label)
 
         # 初始化依赖注入容器
@@ -259,6 +407,36 @@ class RPCServer(StdioStream, RPCRouter, AppDoc):
         """
         return self._dependency_container.has(key)
 
+    def _get_executor(self, kind: str) -> Executor:
+        """获取（必要时创建）指定类型的执行池
+
+        Args:
+            kind: 执行策略，"thread" 或 "process"
+
+        Returns:
+            Executor: 对应的执行池
+        """
+        executor = self._executors.get(kind)
+        if executor is None:
+            if kind == "process":
+                executor = ProcessPoolExecutor(
+                    max_workers=self.process_workers,
+                    initializer=_init_process_worker,
+                )
+            else:
+                executor = ThreadPoolExecutor(
+                    max_workers=self.thread_workers,
+                    thread_name_prefix=f"{self.server_name}-worker",
+                )
+            self._executors[kind] = executor
+        return executor
+
+    def _shutdown_executors(self) -> None:
+        """关闭所有已创建的执行池"""
+        for executor in self._executors.values():
+            executor.shutdown(wait=False, cancel_futures=True)
+        self._executors.clear()
+
     def _register_system_methods(self):
         """注册系统方法
 
@@ -267,11 +445,160 @@ class RPCServer(StdioStream, RPCRouter, AppDoc):
         """
         # 注册 __system__ 方法，用于获取服务器方法树
         self.methods["__system__"] = (self.__system_info__, "系统信息")
+        self.methods.set_options("__system__", system=True)
+
+        # 注册 __metrics__ 方法，用于获取方法指标
+        self.methods["__metrics__"] = (self.__metrics_info__, "运行指标")
+        self.methods.set_options("__metrics__", system=True)
+
+    def enable_metrics(self) -> ServerMetrics:
+        """启用方法指标统计
+
+        已启用时返回现有的指标对象。
+
+        Returns:
+            ServerMetrics: 指标对象
+        """
+        if self.metrics is None:
+            self.metrics = ServerMetrics()
+            self._invalidate_routes()
+        return self.metrics
+
+    def disable_metrics(self) -> None:
+        """停用方法指标统计并丢弃已有统计"""
+        if self.metrics is not None:
+            self.metrics = None
+            self._invalidate_routes()
+
+    def invalidate_cache(self, method: Optional[str] = None, params: Any = None) -> int:
+        """丢弃缓存的方法结果
 
-    def __system_info__(self) -> dict:
+        方法结果依赖的数据变化后调用，如在修改数据的方法中使查询方法的缓存失效。
+
+        Args:
+            method: 方法路径（可带服务器名称前缀），默认 None（所有方法）
+            params: 只丢弃该参数对应的结果，默认 None（丢弃方法的全部结果）。
+                参数需与请求中的 params 一致（字典的键顺序无关）
+
+        Returns:
+            int: 丢弃的结果数量
+
+        例子：
+            ```python
+            @app.add_method(name="user.update")
+            def update_user(user_id: int, name: str) -> dict:
+                users[user_id]["name"] = name
+                app.invalidate_cache("user.get", {"user_id": user_id})
+                return users[user_id]
+            ```
+        """
+        if method is not None and method.startswith(f"{self.server_name}."):
+            if method not in self.result_cache.methods:
+                method = method[len(self.server_name) + 1 :]
+        return self.result_cache.invalidate(method, params)
+
+    def _invalidate_routes(self) -> None:
+        """路由树变化时丢弃路由表和方法树缓存，下次请求时重建"""
+        self._routes = None
+        self._method_tree = None
+        super()._invalidate_routes()
+
+    def _build_routes(self) -> dict[str, Route]:
+        """构建扁平路由表
+
+        将路由树中的每个方法同时以完整路径和带服务器名称前缀的路径登记，
+        请求分发时只需一次字典查找。每个路由的中间件与方法执行预先组合为调用链，
+        没有中间件的路由直接调用方法执行。
+
+        Returns:
+            dict[str, Route]: 完整方法路径 → 路由项
+        """
+        routes = [
+            replace(route, call=self._compose_route(route))
+            for route in self.iter_routes()
+        ]
+        table = {route.path: route for route in routes}
+        # 带服务器名称前缀的路径优先，与按段分发时先去除服务器名称的行为一致
+        for route in routes:
+            table[f"{self.server_name}.{route.path}"] = route
+        return table
+
+    def _compose_route(self, route: Route) -> Callable:
+        """组合路由的调用链
+
+        Args:
+            route: 路由项
+
+        Returns:
+            Callable: 接收 JSONRPCRequest、返回响应 awaitable 的调用链
+        """
+        plan, executor = route.plan, route.executor
+
+        # __system__ 直接返回缓存的方法树，不经过参数绑定和结果序列化
+        if route.system and route.path == "__system__":
+            return self._system_call
+
+        def handler(request: JSONRPCRequest):
+            return self.__execute_method(plan, request.params, request.id, executor)
+
+        # 结果缓存位于中间件之内，命中时中间件照常执行，跳过参数校验和方法执行
+        call = handler
+        if route.cache is not None:
+            call = self.result_cache.method(route.path, route.cache, plan.func).wrap(call)
+        # 系统方法与没有中间件的路由跳过中间件链
+        if route.middlewares:
+            call = MiddlewareManager(route.middlewares).compose(call)
+        # 启用指标时在调用链外包一层计时，系统方法不计入
+        if self.metrics is not None and not route.system:
+            call = self.metrics.wrap(route.path, call)
+        return call
+
+    def _get_method_tree(self) -> _MethodTree:
+        """获取缓存的方法树，不存在时生成
+
+        生成方法树需要遍历路由树并对每个方法执行签名解析、JSON Schema 生成和文档提取，
+        因此结果连同序列化后的字节一起缓存，直到方法、中间件或路由器发生变化。
+
+        Returns:
+            _MethodTree: 方法树、JSON 字节和 etag
+        """
+        cache = self._method_tree
+        if cache is None:
+            tree = self.get_method_tree()
+            etag = hashlib.blake2b(to_json(tree), digest_size=8).hexdigest()
+            tree["etag"] = etag
+            cache = self._method_tree = _MethodTree(tree, to_json(tree), etag)
+        return cache
+
+    async def _system_call(self, request: JSONRPCRequest) -> JSONRPCResponse:
+        """__system__ 方法的调用链
+
+        客户端携带的 etag 与当前方法树一致时只返回 not_modified，
+        否则返回预先序列化的方法树。
+
+        Args:
+            request: __system__ 请求
+
+        Returns:
+            JSONRPCResponse: 响应对象
+        """
+        params = request.params
+        etag = params.get("etag") if isinstance(params, dict) else None
+        cache = self._get_method_tree()
+        if etag is not None and etag == cache.etag:
+            return JSONRPCResponse(
+                id=request.id, result={"not_modified": True, "etag": etag}
+            )
+        return EncodedJSONRPCResponse.from_encoded(request.id, cache.tree, cache.json)
+
+    def __system_info__(self, etag: Optional[str] = None) -> dict:
         """获取服务器系统信息
 
         返回服务器的完整方法树结构，包括所有注册的方法、中间件和路由器。
+        方法树在首次请求时生成并缓存，方法、中间件或路由器变化后重新生成。
+
+        Args:
+            etag: 客户端已有方法树的 etag，与当前方法树一致时不再返回方法树
 
         Returns:
             dict: 服务器方法树字典，包含：
@@ -281,6 +608,9 @@ class RPCServer(StdioStream, RPCRouter, AppDoc):
                 - methods: 方法列表
                 - middlewares: 中间件列表
                 - routers: 路由器字典
+                - etag: 方法树内容的摘要
+            etag 一致时返回 {"not_modified": True, "etag": etag}。
+            返回的方法树为缓存对象，不应修改
 
         例子：
             ```python
@@ -288,21 +618,76 @@ class RPCServer(StdioStream, RPCRouter, AppDoc):
             response = await client.send("__system__")
             method_tree = (await response).result
             print(method_tree["methods"])
+
+            # 条件请求：方法树未变化时只返回 not_modified
+            result = await client.call("__system__", {"etag": method_tree["etag"]})
+            result["not_modified"]  # True
             ```
         """
-        return self.get_method_tree()
+        cache = self._get_method_tree()
+        if etag is not None and etag == cache.etag:
+            return {"not_modified": True, "etag": etag}
+        return cache.tree
+
+    def __metrics_info__(self, reset: bool = False) -> dict:
+        """获取服务器运行指标
+
+        Args:
+            reset: 返回后是否清空已完成调用的统计和缓存命中统计，默认 False
+
+        Returns:
+            dict: 包含：
+                - server_name: 服务器名称
+                - enabled: 是否启用了指标统计
+                - uptime_s: 统计时长（秒），仅启用时返回
+                - methods: 方法路径 → calls / errors / in_flight / calls_per_s /
+                  latency（count、mean_ms、min_ms、max_ms、p50_ms、p90_ms、p99_ms、p99.9_ms）
+                - cache: 启用结果缓存的方法路径 → entries / bytes / hits / misses /
+                  hit_rate / evictions / expirations，不受 enabled 影响
 
-    async def handle_request(self, request_string: str) -> JSONRPCResponse:
+        例子：
+            ```python
+            metrics = await client.call("__metrics__")
+            print(metrics["methods"]["hello"]["latency"]["p99_ms"])
+            ```
+        """
+        cache = self.result_cache.snapshot()
+        if reset:
+            self.result_cache.reset_stats()
+        if self.metrics is None:
+            return {
+                "server_name": self.server_name,
+                "enabled": False,
+                "methods": {},
+                "cache": cache,
+            }
+        snapshot = self.metrics.snapshot()
+        if reset:
+            self.metrics.reset()
+        return {"server_name": self.server_name, "enabled": True, **snapshot, "cache": cache}
+
+    async def handle_request(
+        self, request_string: bytes | bytearray | str
+    ) -> JSONRPCResponse | JSONRPCError | list[JSONRPCResponse | JSONRPCError] | None:
         """处理 JSON-RPC 请求
 
         解析请求、分发到对应的处理函数、返回响应。
         该方法会自动处理异常并返回适当的错误响应。
 
+        支持 JSON-RPC 2.0 批量请求：请求为数组时，数组中的各个请求并发执行，
+        返回与之对应的响应列表（单个请求的错误转换为该请求的错误响应）。
+
+        支持 JSON-RPC 2.0 通知：没有 id 字段的请求照常执行，但不产生任何响应。
+
+        单个请求直接从原始字节一次完成 JSON 解析和模型校验，不经过字符串解码和中间字典；
+        只有校验失败时才重新解析以取得请求 id 用于错误响应。
+
         Args:
-            request_string: JSON 字符串格式的请求
+            request_string: JSON 格式的请求（字节或字符串）
 
         Returns:
-            JSONRPCResponse: 响应对象
+            单个请求返回 JSONRPCResponse 或 JSONRPCError，批量请求返回响应列表；
+            通知或全部由通知组成的批量请求返回 None
 
         Raises:
             RPCError: 当请求处理失败时
@@ -310,77 +695,167 @@ class RPCServer(StdioStream, RPCRouter, AppDoc):
         处理流程：
             1. 解析 JSON 请求
             2. 验证 JSON-RPC 2.0 格式
-            3. 分割路由路径
-            4. 收集中间件
-            5. 分发到处理函数
-            6. 处理异常并返回错误响应
+            3. 在路由表中查找方法（路径可带或不带服务器名称前缀）
+            4. 执行路由预先组合的调用链（中间件 + 方法）
+            5. 处理异常并返回错误响应
         """
+        if isinstance(request_string, str):
+            request_string = request_string.encode("utf-8")
+        if _BATCH_PREFIX.match(request_string):
+            try:
+                requests: list = json.loads(request_string)
+            except json.JSONDecodeError:
+                # 抛出语法解析错误
+                raise RPCParseError()
+            return await self._handle_batch(requests)
+
         try:
-            request: dict = json.loads(request_string)
-        except json.JSONDecodeError:
-            # 抛出语法解析错误
-            raise RPCParseError()
+            json_rpc_request = JSONRPCRequest.model_validate_json(request_string)
+        except ValidationError as exc:
+            if any(error["type"] == "json_invalid" for error in exc.errors()):
+                # 抛出语法解析错误
+                raise RPCParseError()
+            # 校验失败的慢路径：重新解析以取得请求 id
+            raise self._invalid_request_error(exc, json.loads(request_string))
+        return await self._route_request(json_rpc_request)
+
+    async def _handle_batch(
+        self, requests: list
+    ) -> list[JSONRPCResponse | JSONRPCError] | None:
+        """并发处理批量请求
 
-        json_rpc_request = JSONRPCRequest.model_validate(request)
-        method_router = json_rpc_request.method
-        logger.info(f"收到请求：{json_rpc_request}")
+        Args:
+            requests: 请求对象列表
 
-        # 分割路由
-        segments = method_router.split(".")
-        if segments[0] == self.server_name:
-            segments = segments[1:]
+        Returns:
+            list[JSONRPCResponse | JSONRPCError] | None: 与请求顺序一致的响应列表，
+                通知不产生响应；全部为通知时返回 None
 
-        collected_middlewares = []
+        Raises:
+            RPCInvalidRequestError: 当批量请求为空数组时
+        """
+        if not requests:
+            raise RPCInvalidRequestError()
 
-        async def dispatch(current: RPCRouter, parts: list[str]) -> JSONRPCResponse:
-            """分发请求"""
-            collected_middlewares.extend(current.middlewares)
+        async def dispatch_one(request: Any) -> JSONRPCResponse | JSONRPCError | None:
+            try:
+                return await self._dispatch(request)
+            except RPCError as e:
+                return self._error_response(e)
+            except Exception as e:
+                logger.exception(f"批量请求处理触发未处理异常: {e}")
+                request_id = request.get("id", 0) if isinstance(request, dict) else 0
+                return self._unhandled_error_response(e, request_id)
 
-            head, *tail = parts
+        responses = await asyncio.gather(*(dispatch_one(r) for r in requests))
+        return [response for response in responses if response is not None] or None
 
-            # 特殊处理系统方法
-            if head == "__system__" and not tail:
+    async def _dispatch(self, request: Any) -> JSONRPCResponse | JSONRPCError | None:
+        """校验单个已解析的请求（批量请求中的元素）并分发到对应的调用链
 
-                # 系统方法不经过中间件，保证系统功能可用性
-                return JSONRPCResponse(
-                    id=json_rpc_request.id, result=self.__system_info__()
-                )
+        Args:
+            request: 已解析的请求对象
+
+        Returns:
+            JSONRPCResponse | JSONRPCError | None: 响应对象，通知返回 None
+
+        Raises:
+            RPCInvalidRequestError: 当请求不是有效的 JSON-RPC 请求对象时
+            RPCMethodNotFoundError: 当方法不存在时
+        """
+        try:
+            json_rpc_request = JSONRPCRequest.model_validate(request)
+        except ValidationError as exc:
+            raise self._invalid_request_error(exc, request)
+        return await self._route_request(json_rpc_request)
+
+    @staticmethod
+    def _invalid_request_error(
+        exc: ValidationError, request: Any
+    ) -> RPCInvalidRequestError:
+        """将请求模型的校验错误转换为 RPCInvalidRequestError
+
+        Args:
+            exc: 校验错误
+            request: 已解析的请求对象，用于取得请求 id
+
+        Returns:
+            RPCInvalidRequestError: 无效请求错误
+        """
+        return RPCInvalidRequestError(
+            data=exc.errors(
+                include_url=False, include_input=False, include_context=False
+            ),
+            from_id=request.get("id", 0) if isinstance(request, dict) else 0,
+        )
 
-            if not tail:
+    async def _route_request(
+        self, json_rpc_request: JSONRPCRequest
+    ) -> JSONRPCResponse | JSONRPCError | None:
+        """在路由表中查找方法并执行调用链
 
-                func = current.methods.get(head)
-                if func is None:
-                    raise RPCMethodNotFoundError(data=None, from_id=json_rpc_request.id)
+        Args:
+            json_rpc_request: 已校验的请求
 
-                async def handler(request: JSONRPCRequest):
-                    return await self.__execute_method(func, request.params, request.id)
+        Returns:
+            JSONRPCResponse | JSONRPCError | None: 响应对象，通知返回 None
 
-                manager = MiddlewareManager()
-                for mw in collected_middlewares:
-                    manager.add(mw)
+        Raises:
+            RPCMethodNotFoundError: 当方法不存在时
+        """
+        # 格式化整个请求开销较大，只在启用 INFO 日志时进行
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(f"收到请求：{json_rpc_request}")
 
-                # 将 json_rpc_request 作为参数传入, 因为中间件也需要.
-                return await manager.run(json_rpc_request, handler)
+        routes = self._routes
+        if routes is None:
+            routes = self._routes = self._build_routes()
 
-            child = current.sub_routers.get(head)
-            if child is None:
-                raise RPCMethodNotFoundError(data=None, from_id=json_rpc_request.id)
+        route = routes.get(json_rpc_request.method)
 
-            return await dispatch(child, tail)
+        if json_rpc_request.is_notification:
+            await self._notify(route, json_rpc_request)
+            return None
 
-        return await dispatch(self, segments)
+        if route is None:
+            raise RPCMethodNotFoundError(data=None, from_id=json_rpc_request.id)
+
+        # 将 json_rpc_request 作为参数传入, 因为中间件也需要.
+        return await route.call(json_rpc_request)
+
+    async def _notify(self, route: Route | None, request: JSONRPCRequest) -> None:
+        """执行通知
+
+        通知不返回响应，执行结果被丢弃，错误只记录日志。
+
+        Args:
+            route: 路由项，方法不存在时为 None
+            request: 通知请求
+        """
+        if route is None:
+            logger.warning(f"通知的方法不存在: {request.method}")
+            return
+        try:
+            await route.call(request)
+        except Exception as e:
+            logger.warning(f"通知 {request.method} 处理失败: {e}")
 
     async def __execute_method(
-        self, func: Callable, params: Any, request_id: str | int
+        self,
+        plan: CallPlan,
+        params: Any,
+        request_id: str | int,
+        executor: str = "inline",
     ):
         """执行方法
 
-        解析函数签名、自动注入依赖、执行函数并返回结果。
+        按注册时生成的调用计划绑定参数、自动注入依赖、执行函数并返回结果。
 
         Args:
-            func: 要执行的函数
+            plan: 方法的调用计划
             params: 请求参数
             request_id: 请求 ID
+            executor: 同步方法的执行策略，"inline"、"thread" 或 "process"
 
         Returns:
             JSONRPCResponse: 响应对象
@@ -392,47 +867,68 @@ class RPCServer(StdioStream, RPCRouter, AppDoc):
             - 默认参数：使用函数默认值
 
         异常处理：
+            - params 不是对象（按位置传参）或缺少必需参数：抛出 RPCInvalidParamsError
             - ValidationError: 转换为 RPCInvalidParamsError
             - 其他异常：根据返回类型处理
         """
+        container = self._dependency_container
+        if not isinstance(params, dict):
+            # 只支持按名称传参；null 与空数组视为没有参数
+            if params is not None and params != []:
+                raise RPCInvalidParamsError(
+                    data=[
+                        {
+                            "type": "dict_type",
+                            "loc": [],
+                            "msg": "params 必须为对象，不支持按位置传参",
+                        }
+                    ],
+                    from_id=request_id,
+                )
+            params = {}
         try:
-            sig = inspect.signature(func)
-            # 如果函数使用 Pydantic 参数，则自动校验
             bound_args = {}
-            for name, param in sig.parameters.items():
-                ann = param.annotation
+            for param in plan.params:
+                name = param.name
                 # Annotated[T, Inject()] 显式依赖注入
-                if is_inject_param(ann):
-                    actual_type = unwrap_inject_type(ann)
-                    dep = self._dependency_container.resolve_parameter(actual_type)
+                if param.inject:
+                    dep = container.resolve_parameter(param.annotation)
                     if dep is not None:
                         bound_args[name] = dep
-                    elif param.default is not inspect._empty:
+                    elif param.has_default:
                         bound_args[name] = param.default
                 # Pydantic 模型参数
-                elif (
-                    inspect.isclass(ann)
-                    and issubclass(ann, BaseModel)
-                    and isinstance(params, dict)
-                ):
-                    # bound_args[name] = ann(**params)
-                    bound_args[name] = ann(**params[name])
+                elif param.model is not None and name in params:
+                    bound_args[name] = param.model(**params[name])
                 # 依赖注入：从依赖容器解析
                 elif (
-                    dep := self._dependency_container.resolve_parameter(ann)
-                ) is not None:
+                    param.dependency
+                    and (dep := container.resolve_parameter(param.annotation))
+                    is not None
+                ):
                     bound_args[name] = dep
                 # 普通参数
                 elif name in params:
                     bound_args[name] = params[name]
                 # 默认参数
-                else:
+                elif param.has_default:
                     bound_args[name] = param.default
+                else:
+                    raise RPCInvalidParamsError(
+                        data=[{"type": "missing", "loc": [name], "msg": "缺少必需参数"}],
+                        from_id=request_id,
+                    )
 
-            if inspect.iscoroutinefunction(func):
+            func = plan.func
+            if plan.is_coroutine:
                 result = await func(**bound_args)
-            else:
+            elif executor == "inline":
                 result = func(**bound_args)
+            else:
+                loop = asyncio.get_running_loop()
+                result = await loop.run_in_executor(
+                    self._get_executor(executor), functools.partial(func, **bound_args)
+                )
 
             # 如果返回的类型是 JSONRPCErrorDetail 则结果错误.
             # 这是函数内部判断出错误时应返回的对象.
@@ -449,40 +945,246 @@ class RPCServer(StdioStream, RPCRouter, AppDoc):
                 from_id=request_id,
             )
 
+    def _error_response(self, error: RPCError) -> JSONRPCError:
+        """将 RPCError 转换为错误响应"""
+        return JSONRPCError(
+            id=error.from_id,
+            error=JSONRPCErrorDetail.model_validate(error.to_dict()),
+        )
+
+    def _unhandled_error_response(
+        self, exc: Exception, request_id: int | str = 0
+    ) -> JSONRPCError:
+        """将未处理异常转换为服务端错误响应"""
+        server_error = RPCServerError(code=-32099, message=f"未处理异常: {str(exc)}")
+        return JSONRPCError(
+            id=request_id,
+            error=JSONRPCErrorDetail.model_validate(server_error.to_dict()),
+        )
+
+    async def _process_request(self, request: bytes | bytearray) -> None:
+        """处理一条请求并写回响应
+
+        RPCError 会被转换为错误响应写回，其他异常向上抛出。通知不写回响应。
+
+        Args:
+            request: 原始请求字节
+        """
+        try:
+            result = await self.handle_request(request)
+            if result is not None:
+                await self.write_line(result)
+        except RPCError as e:
+            await self.write_line(self._error_response(e))
+
+    async def _process_request_task(
+        self, request: bytes | bytearray, limiter: asyncio.Semaphore
+    ) -> None:
+        """并发模式下的单请求任务
+
+        任务内的未处理异常只影响当前请求，不会中断服务器主循环。
+
+        Args:
+            request: 原始请求字节
+            limiter: 并发限制信号量，任务结束时释放
+        """
+        try:
+            await self._process_request(request)
+        except Exception as e:
+            logger.exception(f"请求处理触发未处理异常: {e}")
+            await self.write_line(self._unhandled_error_response(e))
+        finally:
+            limiter.release()
+
     async def _runserver(self):
         """运行服务器主循环
 
         持续从标准输入读取请求，处理后写入标准输出。
+
+        开始读取前先发送 __ready__ 通知（参数为服务器名称和版本），
+        客户端据此确认服务器已就绪，无需固定等待。
+
+        max_concurrency 为 1 时逐条处理请求；大于 1 时每个请求在独立任务中处理，
+        同时处理的请求数达到上限后暂停读取，直到有请求处理完成。
+        存在流控的流时，等待名额期间继续读取并处理流控通知（见 _acquire_reading_credit）。
+
         循环会在以下情况停止：
-            - 对端关闭连接（EOF）
+            - 对端关闭连接（EOF），并发模式下会等待已接收的请求处理完成
             - 发生未处理的异常
         """
+        in_flight: set[asyncio.Task] = set()
+        limiter = asyncio.Semaphore(self.max_concurrency)
+        next_read: Optional[asyncio.Future] = None
+        # 等待并发名额期间读到的普通请求，按读取顺序先于 next_read 处理
+        pending: deque[bytes | bytearray] = deque()
         try:
+            await self.write_line(
+                JSONRPCNotification(
+                    method=READY_METHOD,
+                    params={"server_name": self.server_name, "version": self.version},
+                )
+            )
             while True:
-                try:
+                if pending:
+                    request = pending.popleft()
+                elif next_read is not None:
+                    request, next_read = await next_read, None
+                else:
                     request = await self.read_line()
-                    if not request:
-                        # 典型触发：对端关闭了写端或连接（到达 EOF），或本端/底层 transport 已被关闭
-                        break
-                    result = await self.handle_request(request)
-                    
-                    await self.write_line(result)
-                except RPCError as e:
-                    error = JSONRPCError(
-                        id=e.from_id,
-                        error=JSONRPCErrorDetail.model_validate(e.to_dict()),
+                if not request:
+                    # 典型触发：对端关闭了写端或连接（到达 EOF），或本端/底层 transport 已被关闭
+                    break
+
+                # 流控通知不经过并发限制：推送方可能正占满并发名额等待额度
+                if _CREDIT_MARKER in request and self._apply_credit(request):
+                    continue
+
+                if self.max_concurrency == 1:
+                    if self._credit_windows:
+                        next_read = await self._process_reading_credit(request)
+                    else:
+                        await self._process_request(request)
+                    continue
+
+                if self._credit_windows and limiter.locked():
+                    next_read = await self._acquire_reading_credit(
+                        limiter, pending, next_read
                     )
-                    await self.write_line(error)
+                else:
+                    await limiter.acquire()
+                task = asyncio.create_task(
+                    self._process_request_task(request, limiter)
+                )
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+
+            if in_flight:
+                await asyncio.gather(*in_flight, return_exceptions=True)
         except Exception as e:
-            server_error = RPCServerError(code=-32099, message=f"未处理异常: {str(e)}")
-            error = JSONRPCError(
-                error=JSONRPCErrorDetail.model_validate(server_error.to_dict())
-            )
-            await self.write_line(error)
+            await self.write_line(self._unhandled_error_response(e))
         finally:
+            for task in in_flight:
+                task.cancel()
+            if next_read is not None:
+                next_read.cancel()
+            self._shutdown_executors()
             if hasattr(self, "writer") and self.writer:
                 self.close()
 
+    async def _process_reading_credit(
+        self, request: bytes | bytearray
+    ) -> asyncio.Future:
+        """顺序模式下处理请求，同时继续读取并处理流控通知
+
+        存在流控的流时，推送方可能在等待额度，而额度通知要由读循环读取；
+        处理期间读到的第一条普通请求留待当前请求完成后再处理，保持顺序执行。
+
+        Args:
+            request: 请求原始字节
+
+        Returns:
+            asyncio.Future: 下一条请求的读取，可能已完成
+        """
+        task = asyncio.ensure_future(self._process_request(request))
+        read = asyncio.ensure_future(self.read_line())
+        while not task.done():
+            await asyncio.wait({task, read}, return_when=asyncio.FIRST_COMPLETED)
+            if not read.done():
+                break
+            line = read.result()
+            if not (line and _CREDIT_MARKER in line and self._apply_credit(line)):
+                break
+            read = asyncio.ensure_future(self.read_line())
+        await task
+        return read
+
+    async def _acquire_reading_credit(
+        self,
+        limiter: asyncio.Semaphore,
+        pending: deque,
+        read: Optional[asyncio.Future] = None,
+    ) -> Optional[asyncio.Future]:
+        """并发模式下等待并发名额，同时继续读取并处理流控通知
+
+        占满名额的可能是等待额度的推送方，而归还额度的通知要由读循环读取。
+        等待期间读到的流控通知立即处理，普通请求（及 EOF）按读取顺序存入 pending，
+        取得名额后依次处理。
+
+        Args:
+            limiter: 并发名额
+            pending: 暂存普通请求的队列
+            read: 上一次等待名额时尚未完成的读取，继续使用而不再发起新的读取，
+                否则它读到的行会丢失
+
+        Returns:
+            asyncio.Future | None: 取得名额时尚未完成的读取，没有时为 None
+        """
+        acquire = asyncio.ensure_future(limiter.acquire())
+        try:
+            while not acquire.done():
+                if read is None:
+                    if pending and not pending[-1]:
+                        # 已读到 EOF：不再读取，只等待名额
+                        break
+                    read = asyncio.ensure_future(self.read_line())
+                await asyncio.wait({acquire, read}, return_when=asyncio.FIRST_COMPLETED)
+                if not read.done():
+                    break
+                line, read = read.result(), None
+                if line and _CREDIT_MARKER in line and self._apply_credit(line):
+                    continue
+                pending.append(line)
+                if not line:
+                    # EOF：不再读取，只等待名额
+                    break
+            await acquire
+        except BaseException:
+            acquire.cancel()
+            if read is not None:
+                read.cancel()
+            raise
+        return read
+
+    def _apply_credit(self, request: bytes | bytearray) -> bool:
+        """处理 __credit__ 流控通知
+
+        Args:
+            request: 请求原始字节
+
+        Returns:
+            bool: 是 __credit__ 通知时为 True，否则为 False（按普通请求处理）
+        """
+        try:
+            message = json.loads(request)
+        except ValueError:
+            return False
+        if (
+            not isinstance(message, dict)
+            or message.get("method") != CREDIT_METHOD
+            or "id" in message
+        ):
+            return False
+
+        params = message.get("params")
+        if not isinstance(params, dict) or "id" not in params:
+            logger.warning(f"流控通知参数无效: {params}")
+            return True
+        stream_id, credit = params["id"], params.get("credit")
+        if credit is None:
+            window = self._credit_windows.pop(stream_id, None)
+            if window is not None:
+                window.close()
+            return True
+        if not isinstance(credit, int) or credit < 0:
+            logger.warning(f"流控额度无效: {credit}")
+            return True
+
+        window = self._credit_windows.get(stream_id)
+        if window is None:
+            window = self._credit_windows[stream_id] = _CreditWindow()
+        window.grant(credit)
+        return True
+
     def runserver(self):
         """启动服务器
 
@@ -0,0 +1,333 @@
+"""结果缓存模块
+
+为幂等方法（相同参数总是返回相同结果的查询类方法）提供服务器端结果缓存，
+支持 TTL 过期与按条目数、字节数的 LRU 淘汰。
+"""
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, NamedTuple, Optional
+
+from pydantic_core import PydanticSerializationError, to_json
+
+from ..general.jsonrpc_model import (
+    EncodedJSONRPCResponse,
+    JSONRPCRequest,
+    JSONRPCResponse,
+)
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """结果缓存策略
+
+    Args:
+        ttl: 缓存有效期（秒），默认 None（不过期）
+        max_entries: 最多缓存的结果数量，默认 1024，None 表示不限制
+        max_bytes: 缓存结果序列化后的总字节数上限，默认 None（不限制）
+
+    超过 max_entries 或 max_bytes 时淘汰最久未使用的结果。
+
+    Raises:
+        ValueError: 当 ttl 不大于 0，或 max_entries、max_bytes 小于 1 时
+    """
+
+    ttl: Optional[float] = None
+    max_entries: Optional[int] = 1024
+    max_bytes: Optional[int] = None
+
+    def __post_init__(self):
+        if self.ttl is not None and self.ttl <= 0:
+            raise ValueError("ttl 必须大于 0")
+        if self.max_entries is not None and self.max_entries < 1:
+            raise ValueError("max_entries 必须大于等于 1")
+        if self.max_bytes is not None and self.max_bytes < 1:
+            raise ValueError("max_bytes 必须大于等于 1")
+
+
+# add_method / RPCRouter 的 cache 参数：
+#   None        - 继承上级路由器的策略（默认）
+#   False       - 不缓存，子路由器也不再继承上级策略
+#   True        - 使用默认策略 CachePolicy()
+#   CachePolicy - 使用指定策略
+CacheOption = CachePolicy | bool | None
+
+
+def resolve_cache_option(cache: CacheOption) -> CachePolicy | bool | None:
+    """规范化 cache 参数，True 转换为默认策略
+
+    Args:
+        cache: cache 参数
+
+    Returns:
+        CachePolicy | bool | None: CachePolicy、False 或 None
+
+    Raises:
+        TypeError: 当 cache 不是 CachePolicy、bool 或 None 时
+    """
+    if cache is True:
+        return CachePolicy()
+    if cache is None or cache is False or isinstance(cache, CachePolicy):
+        return cache
+    raise TypeError(f"cache 必须是 CachePolicy、bool 或 None，而不是 {type(cache).__name__}")
+
+
+def cache_key(params: Any) -> bytes:
+    """参数的规范化缓存键
+
+    顶层字典按键排序后序列化，键顺序不同的相同参数得到相同的缓存键。
+    嵌套字典保持原有顺序，顺序不同时只会导致未命中，不会返回错误的结果。
+
+    Args:
+        params: 请求参数
+
+    Returns:
+        bytes: 缓存键
+
+    Raises:
+        TypeError: 当顶层字典的键无法排序时
+        PydanticSerializationError: 当参数无法序列化为 JSON 时
+    """
+    if type(params) is dict and len(params) > 1:
+        params = dict(sorted(params.items()))
+    return to_json(params)
+
+
+class _Entry(NamedTuple):
+    """缓存的结果"""
+
+    result: Any
+    result_json: bytes
+    size: int
+    expires_at: Optional[float]
+
+
+class MethodCache:
+    """单个方法的结果缓存
+
+    Args:
+        path: 完整方法路径
+        policy: 缓存策略
+        hits: 命中次数
+        misses: 未命中次数（包括已过期）
+        evictions: 因超出条目数或字节数被淘汰的结果数量
+        expirations: 因过期被丢弃的结果数量
+        size: 当前缓存结果的总字节数
+    """
+
+    def __init__(self, path: str, policy: CachePolicy, func: Optional[Callable] = None):
+        self.path = path
+        self.policy = policy
+        # 方法函数，路由表重建时用于判断缓存是否仍然有效
+        self.func = func
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.size = 0
+        self._entries: "OrderedDict[bytes, _Entry]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: bytes) -> Optional[_Entry]:
+        """查找缓存的结果并计入命中 / 未命中
+
+        Args:
+            key: 缓存键（cache_key 的结果）
+
+        Returns:
+            _Entry | None: 缓存的结果，不存在或已过期时返回 None
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry.expires_at is not None and entry.expires_at <= time.monotonic():
+            self._discard(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key: bytes, result: Any, result_json: bytes) -> None:
+        """缓存结果，超出限制时淘汰最久未使用的结果
+
+        单个结果超过 max_bytes 时不缓存。
+
+        Args:
+            key: 缓存键（cache_key 的结果）
+            result: 方法返回的结果
+            result_json: 结果序列化后的 JSON 字节
+        """
+        policy = self.policy
+        size = len(key) + len(result_json)
+        if policy.max_bytes is not None and size > policy.max_bytes:
+            return
+        if key in self._entries:
+            self._discard(key)
+        expires_at = None if policy.ttl is None else time.monotonic() + policy.ttl
+        self._entries[key] = _Entry(result, result_json, size, expires_at)
+        self.size += size
+        while (
+            policy.max_entries is not None and len(self._entries) > policy.max_entries
+        ) or (policy.max_bytes is not None and self.size > policy.max_bytes):
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= evicted.size
+            self.evictions += 1
+
+    def _discard(self, key: bytes) -> None:
+        entry = self._entries.pop(key)
+        self.size -= entry.size
+
+    def invalidate(self, params: Any = None) -> int:
+        """丢弃缓存的结果
+
+        Args:
+            params: 只丢弃该参数对应的结果，默认 None（丢弃全部）
+
+        Returns:
+            int: 丢弃的结果数量
+        """
+        if params is None:
+            count = len(self._entries)
+            self._entries.clear()
+            self.size = 0
+            return count
+        key = cache_key(params)
+        if key not in self._entries:
+            return 0
+        self._discard(key)
+        return 1
+
+    def wrap(
+        self, call: Callable[[JSONRPCRequest], Awaitable[Any]]
+    ) -> Callable[[JSONRPCRequest], Awaitable[Any]]:
+        """为方法执行包一层结果缓存
+
+        命中时直接以缓存的 JSON 字节构造响应，跳过参数校验和方法执行；
+        未命中时执行方法，只缓存成功的响应。
+
+        Args:
+            call: 方法执行
+
+        Returns:
+            Callable: 带结果缓存的方法执行
+        """
+
+        async def cached(request: JSONRPCRequest):
+            try:
+                key = cache_key(request.params)
+            except (TypeError, PydanticSerializationError):
+                # 进程内调用可能传入无法排序或序列化的参数，不缓存
+                return await call(request)
+            entry = self.get(key)
+            if entry is not None:
+                return EncodedJSONRPCResponse.from_encoded(
+                    request.id, entry.result, entry.result_json
+                )
+            response = await call(request)
+            if type(response) is not JSONRPCResponse:
+                return response
+            try:
+                result_json = to_json(response.result)
+            except PydanticSerializationError:
+                return response
+            self.put(key, response.result, result_json)
+            return EncodedJSONRPCResponse.from_encoded(
+                response.id, response.result, result_json
+            )
+
+        return cached
+
+    def reset_stats(self) -> None:
+        """清空命中、未命中、淘汰和过期计数"""
+        self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def snapshot(self) -> dict:
+        """统计快照"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class ResultCache:
+    """服务器的结果缓存，按方法路径保存各方法的 MethodCache
+
+    与 ServerMetrics 一样不注册为中间件，而是由 RPCServer 在构建路由表时为启用缓存的方法
+    在方法执行外包一层；中间件仍然执行，命中时跳过参数校验和方法执行。
+
+    例子：
+        ```python
+        @router.add_method(name="get", cache=CachePolicy(ttl=60, max_entries=10_000))
+        def get_user(user_id: int) -> dict:
+            ...
+
+        # 数据变化后使缓存失效
+        app.invalidate_cache("user.get", {"user_id": 1})
+
+        # 命中统计
+        app.result_cache.snapshot()["user.get"]["hits"]
+        ```
+    """
+
+    def __init__(self):
+        self.methods: Dict[str, MethodCache] = {}
+
+    def method(
+        self, path: str, policy: CachePolicy, func: Optional[Callable] = None
+    ) -> MethodCache:
+        """获取方法的缓存
+
+        路由表重建时，方法函数与策略均未变化的方法保留已缓存的结果，否则重新创建。
+
+        Args:
+            path: 完整方法路径
+            policy: 缓存策略
+            func: 方法函数
+
+        Returns:
+            MethodCache: 方法缓存
+        """
+        cache = self.methods.get(path)
+        if cache is None or cache.policy != policy or cache.func is not func:
+            cache = self.methods[path] = MethodCache(path, policy, func)
+        return cache
+
+    def invalidate(self, path: Optional[str] = None, params: Any = None) -> int:
+        """丢弃缓存的结果
+
+        Args:
+            path: 完整方法路径，默认 None（所有方法）
+            params: 只丢弃该参数对应的结果，默认 None（丢弃方法的全部结果）
+
+        Returns:
+            int: 丢弃的结果数量
+        """
+        if path is None:
+            return sum(cache.invalidate() for cache in self.methods.values())
+        cache = self.methods.get(path)
+        return cache.invalidate(params) if cache is not None else 0
+
+    def reset_stats(self) -> None:
+        """清空所有方法的命中统计，缓存的结果保持不变"""
+        for cache in self.methods.values():
+            cache.reset_stats()
+
+    def snapshot(self) -> dict:
+        """统计快照
+
+        Returns:
+            dict: 方法路径 → entries / bytes / hits / misses / hit_rate / evictions / expirations
+        """
+        return {path: cache.snapshot() for path, cache in self.methods.items()}
@@ -0,0 +1,106 @@
+"""调用计划模块
+
+在方法注册时预先解析函数签名，生成参数绑定计划。
+请求处理时直接按计划绑定参数，避免每次请求重复执行 inspect.signature 等内省操作。
+"""
+
+import inspect
+from dataclasses import dataclass
+from typing import Any, Callable, Optional, Tuple
+from pydantic import BaseModel
+
+from .dependencies import is_inject_param, unwrap_inject_type
+
+
+@dataclass(frozen=True)
+class ParamPlan:
+    """单个参数的绑定计划
+
+    Args:
+        name: 参数名
+        annotation: 参数注解，显式注入参数为 Annotated 中的实际类型
+        default: 参数默认值，无默认值时为 inspect.Parameter.empty
+        inject: 是否为 Annotated[T, Inject()] 显式依赖注入参数
+        model: 参数为 Pydantic 模型时的模型类，否则为 None
+        dependency: 注解是否可能对应依赖容器中的依赖（类型或字符串注解）
+    """
+
+    name: str
+    annotation: Any
+    default: Any
+    inject: bool = False
+    model: Optional[type] = None
+    dependency: bool = False
+
+    @property
+    def has_default(self) -> bool:
+        """参数是否有默认值"""
+        return self.default is not inspect.Parameter.empty
+
+
+@dataclass(frozen=True)
+class CallPlan:
+    """方法的调用计划
+
+    例子：
+        ```python
+        def hello(name: str = "World") -> str:
+            return f"hello {name} !"
+
+        plan = CallPlan.compile(hello)
+        plan.params[0].name     # "name"
+        plan.params[0].default  # "World"
+        plan.is_coroutine       # False
+        ```
+
+    Args:
+        func: 方法函数
+        params: 各参数的绑定计划，按签名顺序排列
+        is_coroutine: 方法是否为协程函数
+    """
+
+    func: Callable
+    params: Tuple[ParamPlan, ...]
+    is_coroutine: bool
+
+    @classmethod
+    def compile(cls, func: Callable) -> "CallPlan":
+        """解析函数签名并生成调用计划
+
+        Args:
+            func: 方法函数
+
+        Returns:
+            CallPlan: 调用计划
+        """
+        params = []
+        for name, param in inspect.signature(func).parameters.items():
+            ann = param.annotation
+            if is_inject_param(ann):
+                params.append(
+                    ParamPlan(
+                        name=name,
+                        annotation=unwrap_inject_type(ann),
+                        default=param.default,
+                        inject=True,
+                    )
+                )
+                continue
+
+            is_model = inspect.isclass(ann) and issubclass(ann, BaseModel)
+            params.append(
+                ParamPlan(
+                    name=name,
+                    annotation=ann,
+                    default=param.default,
+                    model=ann if is_model else None,
+                    dependency=ann is not inspect.Parameter.empty
+                    and isinstance(ann, (type, str)),
+                )
+            )
+
+        return cls(
+            func=func,
+            params=tuple(params),
+            is_coroutine=inspect.iscoroutinefunction(func),
+        )
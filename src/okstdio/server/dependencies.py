@@ -7,6 +7,9 @@ import threading
 from typing import Annotated, Any, Callable, Dict, Tuple, Type, Optional, get_args, get_origin
 from collections import defaultdict
 
+# resolve_parameter 缓存中表示“没有匹配的依赖”
+_NO_DEPENDENCY = object()
+
 
 class DependencyContainer:
     """依赖注入容器
@@ -39,6 +42,8 @@ class DependencyContainer:
         self._dependencies: Dict[Any, Tuple[Callable, bool, Optional[Any]]] = {}
         # 线程锁，用于单例依赖的线程安全创建
         self._lock = threading.Lock()
+        # 参数类型 → 匹配的依赖键，注册新依赖时清空
+        self._resolve_cache: Dict[Any, Any] = {}
     
     def register(
         self, 
@@ -69,6 +74,7 @@ class DependencyContainer:
             else:
                 # 非单例依赖：只存储工厂函数
                 self._dependencies[key] = (factory, False, None)
+            self._resolve_cache.clear()
     
     def get(self, key: Type | str) -> Any:
         """获取依赖实例
@@ -139,7 +145,7 @@ class DependencyContainer:
         """根据参数类型解析依赖
         
         按类型查找依赖，如果找到则返回实例，否则返回 None。
-        支持子类匹配。
+        支持子类匹配。参数类型匹配到的依赖键会被缓存，注册新依赖时失效。
         
         Args:
             param_type: 参数类型
@@ -156,10 +162,27 @@ class DependencyContainer:
             instance = container.resolve_parameter(UnknownType)  # None
             ```
         """
+        key = self._resolve_cache.get(param_type)
+        if key is None:
+            key = self._match_key(param_type)
+            self._resolve_cache[param_type] = key
+        if key is _NO_DEPENDENCY:
+            return None
+        return self.get(key)
+
+    def _match_key(self, param_type: Type) -> Any:
+        """查找参数类型匹配的依赖键
+
+        Args:
+            param_type: 参数类型
+
+        Returns:
+            匹配的依赖键，未找到时返回 _NO_DEPENDENCY
+        """
         # 首先尝试精确匹配
         if self.has(param_type):
-            return self.get(param_type)
-        
+            return param_type
+
         # 尝试子类匹配（遍历所有已注册的类型键）
         with self._lock:
             for key in self._dependencies.keys():
@@ -168,12 +191,12 @@ class DependencyContainer:
                     try:
                         # 检查 param_type 是否是 key 的子类
                         if issubclass(param_type, key):
-                            return self.get(key)
+                            return key
                     except TypeError:
                         # 如果 key 不是类型，跳过
                         continue
-        
-        return None
+
+        return _NO_DEPENDENCY
 
 
 class Inject:
@@ -0,0 +1,136 @@
+"""服务器指标模块
+
+按方法路径统计调用次数、错误次数、正在执行的请求数和延迟直方图。
+"""
+
+import time
+from typing import Any, Awaitable, Callable, Dict
+
+from ..general.jsonrpc_model import JSONRPCError, JSONRPCRequest
+from ..general.metrics import LatencyHistogram
+
+
+class MethodMetrics:
+    """单个方法的指标
+
+    Args:
+        calls: 已完成的调用次数
+        errors: 抛出异常或返回错误响应的调用次数
+        in_flight: 正在执行的调用数量
+        latency: 延迟直方图
+    """
+
+    __slots__ = ("calls", "errors", "in_flight", "latency")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.latency = LatencyHistogram()
+
+    def snapshot(self, elapsed: float) -> dict:
+        """指标快照
+
+        Args:
+            elapsed: 统计时长（秒），用于计算吞吐量
+        """
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "in_flight": self.in_flight,
+            "calls_per_s": round(self.calls / elapsed, 3) if elapsed > 0 else 0.0,
+            "latency": self.latency.snapshot(),
+        }
+
+
+class ServerMetrics:
+    """服务器指标
+
+    不注册为中间件，而是由 RPCServer 在构建路由表时为每个方法的调用链（含中间件）
+    包一层计时；未启用指标时路由表中不存在这一层，没有任何开销。系统方法不计入。
+
+    例子：
+        ```python
+        app = RPCServer("my_server", metrics=True)
+
+        # 客户端查询
+        metrics = await client.call("__metrics__")
+        metrics["methods"]["user.get"]["latency"]["p99_ms"]
+        ```
+    """
+
+    def __init__(self):
+        self.methods: Dict[str, MethodMetrics] = {}
+        self.started_at = time.time()
+
+    def method(self, path: str) -> MethodMetrics:
+        """获取方法的指标，不存在时创建
+
+        Args:
+            path: 完整方法路径
+
+        Returns:
+            MethodMetrics: 方法指标
+        """
+        metrics = self.methods.get(path)
+        if metrics is None:
+            metrics = self.methods[path] = MethodMetrics()
+        return metrics
+
+    def wrap(
+        self, path: str, call: Callable[[JSONRPCRequest], Awaitable[Any]]
+    ) -> Callable[[JSONRPCRequest], Awaitable[Any]]:
+        """为方法的调用链包一层计时
+
+        Args:
+            path: 完整方法路径
+            call: 调用链
+
+        Returns:
+            Callable: 记录指标的调用链
+        """
+        metrics = self.method(path)
+        latency = metrics.latency
+        clock = time.perf_counter
+
+        async def timed(request: JSONRPCRequest):
+            metrics.in_flight += 1
+            started = clock()
+            try:
+                response = await call(request)
+            except Exception:
+                metrics.errors += 1
+                raise
+            finally:
+                metrics.in_flight -= 1
+                metrics.calls += 1
+                latency.record(clock() - started)
+            if isinstance(response, JSONRPCError):
+                metrics.errors += 1
+            return response
+
+        return timed
+
+    def reset(self) -> None:
+        """清空已完成调用的统计，正在执行的请求数保持不变"""
+        for metrics in self.methods.values():
+            metrics.calls = 0
+            metrics.errors = 0
+            metrics.latency.reset()
+        self.started_at = time.time()
+
+    def snapshot(self) -> dict:
+        """指标快照
+
+        Returns:
+            dict: 包含：
+                - uptime_s: 距启用指标（或上次重置）的秒数
+                - methods: 方法路径 → 调用次数、错误次数、正在执行数、吞吐量、延迟统计（毫秒）
+        """
+        elapsed = time.time() - self.started_at
+        return {
+            "uptime_s": round(elapsed, 3),
+            "methods": {
+                path: metrics.snapshot(elapsed) for path, metrics in self.methods.items()
+            },
+        }
@@ -1,8 +1,20 @@
 """中间件"""
 
-from typing import Any, Callable, Awaitable, List
+from typing import Any, Callable, Awaitable, Iterable, List, Optional
 from ..general.jsonrpc_model import JSONRPCRequest
 
+Handler = Callable[[JSONRPCRequest], Awaitable[Any]]
+Middleware = Callable[[JSONRPCRequest, Handler], Awaitable[Any]]
+
+
+def _bind(middleware: Middleware, call_next: Handler) -> Handler:
+    """将中间件与下一环绑定为单参数的调用"""
+
+    def call(request: JSONRPCRequest) -> Awaitable[Any]:
+        return middleware(request, call_next)
+
+    return call
+
 
 class MiddlewareManager:
     """### 中间件管理器
@@ -32,15 +44,19 @@ class MiddlewareManager:
             如果已经是最后一个中间件, 就会调用最终的业务处理函数，
             返回 await 之后得到的响应 dict.
     ```
+
+    #### 预先组合
+    ```
+    compose 将中间件与处理函数组合为一个调用链, 组合结果可以缓存并重复使用,
+    每次请求不再重新创建管理器和中间闭包.
+
+        chain = MiddlewareManager(middlewares).compose(handler)
+        response = await chain(request)
+    ```
     """
 
-    def __init__(self):
-        self.middlewares: List[
-            Callable[
-                [JSONRPCRequest, Callable[[JSONRPCRequest], Awaitable[Any]]],
-                Awaitable[Any],
-            ]
-        ] = []
+    def __init__(self, middlewares: Optional[Iterable[Middleware]] = None):
+        self.middlewares: List[Middleware] = list(middlewares or [])
 
     def add(
         self,
@@ -50,14 +66,16 @@ class MiddlewareManager:
     ):
         self.middlewares.append(middleware)
 
-    async def run(self, request: JSONRPCRequest, handler: Callable):
-        """依次执行中间件链条"""
+    def compose(self, handler: Handler) -> Handler:
+        """将中间件与处理函数组合为调用链
 
-        async def next_middleware(index: int, req: JSONRPCRequest):
-            if index < len(self.middlewares):
-                return await self.middlewares[index](
-                    req, lambda r: next_middleware(index + 1, r)
-                )
-            return await handler(req)
+        没有中间件时直接返回 handler.
+        """
+        call = handler
+        for middleware in reversed(self.middlewares):
+            call = _bind(middleware, call)
+        return call
 
-        return await next_middleware(0, request)
+    async def run(self, request: JSONRPCRequest, handler: Callable):
+        """依次执行中间件链条"""
+        return await self.compose(handler)(request)
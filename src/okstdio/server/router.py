@@ -4,15 +4,27 @@
 """
 
 import inspect
-from typing import Dict, Callable, List, Awaitable, Any, Tuple
+from dataclasses import dataclass
+from typing import Dict, Callable, List, Awaitable, Any, Tuple, Literal, Optional, Iterator
 from ..general.jsonrpc_model import JSONRPCRequest
+from .callplan import CallPlan
+from .cache import CacheOption, CachePolicy, resolve_cache_option
+
+# 同步方法的执行策略：
+#   inline  - 直接在事件循环中调用（默认）
+#   thread  - 提交到服务器管理的线程池
+#   process - 提交到服务器管理的进程池（函数与参数需可被 pickle）
+MethodExecutor = Literal["inline", "thread", "process"]
+METHOD_EXECUTORS = ("inline", "thread", "process")
 
 
 class MethodsDict:
-    """封装方法字典，额外记录 label
+    """封装方法字典，额外记录 label 与执行选项
 
     用于存储 RPC 方法的字典，每个方法都关联一个标签（label）用于分类和文档生成。
     提供了便捷的方法来获取方法和标签信息。
+    方法的执行选项（如 executor）通过 set_options/get_options 单独保存。
+    设置方法时会预先生成调用计划（CallPlan），请求处理时通过 get_plan 获取。
 
     例子：
         ```python
@@ -31,18 +43,73 @@ class MethodsDict:
         ```
     """
 
-    def __init__(self):
-        """初始化方法字典"""
+    def __init__(self, on_change: Optional[Callable[[], None]] = None):
+        """初始化方法字典
+
+        Args:
+            on_change: 方法或执行选项变化时的回调，默认 None
+        """
         self._content: Dict[str, Tuple[Callable, str]] = {}
+        self._options: Dict[str, Dict[str, Any]] = {}
+        self._plans: Dict[str, CallPlan] = {}
+        self._on_change = on_change
+
+    def _changed(self) -> None:
+        """通知方法字典已变化"""
+        if self._on_change is not None:
+            self._on_change()
 
     def __setitem__(self, method_name: str, value: Tuple[Callable, str]) -> None:
         """设置方法
 
+        设置时解析方法签名并生成调用计划。
+        重新设置同名方法时，之前的执行选项会被清除。
+
         Args:
             method_name: 方法名称
             value: 元组 (方法函数, 标签)
         """
+        self._plans[method_name] = CallPlan.compile(value[0])
         self._content[method_name] = value
+        self._options.pop(method_name, None)
+        self._changed()
+
+    def get_plan(self, method_name: str) -> CallPlan | None:
+        """获取方法的调用计划
+
+        Args:
+            method_name: 方法名称
+
+        Returns:
+            CallPlan | None: 调用计划，方法不存在时返回 None
+        """
+        return self._plans.get(method_name)
+
+    def set_options(self, method_name: str, **options: Any) -> None:
+        """设置方法的执行选项
+
+        Args:
+            method_name: 方法名称
+            **options: 执行选项，如 executor="thread"
+
+        Raises:
+            KeyError: 当方法不存在时
+        """
+        if method_name not in self._content:
+            raise KeyError(method_name)
+        self._options.setdefault(method_name, {}).update(options)
+        self._changed()
+
+    def get_options(self, method_name: str) -> Dict[str, Any]:
+        """获取方法的执行选项
+
+        Args:
+            method_name: 方法名称
+
+        Returns:
+            Dict[str, Any]: 执行选项，未设置时返回空字典
+        """
+        return self._options.get(method_name, {})
 
     def __getitem__(self, method_name: str) -> Tuple[Callable, str]:
         """获取方法和标签
@@ -135,8 +202,13 @@ class MiddlewaresList:
         ```
     """
 
-    def __init__(self) -> None:
-        """初始化中间件列表"""
+    def __init__(self, on_change: Optional[Callable[[], None]] = None) -> None:
+        """初始化中间件列表
+
+        Args:
+            on_change: 中间件变化时的回调，默认 None
+        """
+        self._on_change = on_change
         self._content: List[
             Tuple[
                 Callable[
@@ -161,6 +233,8 @@ class MiddlewaresList:
             label: 中间件标签，默认 ""
         """
         self._content.append((middleware, label))
+        if self._on_change is not None:
+            self._on_change()
 
     def __iter__(self):
         """迭代中间件函数
@@ -168,7 +242,7 @@ class MiddlewaresList:
         Returns:
             iterator: 只包含中间件函数的迭代器
         """
-        return iter(self._content)
+        return (middleware for middleware, _ in self._content)
 
     def __len__(self) -> int:
         """获取中间件数量
@@ -187,6 +261,31 @@ class MiddlewaresList:
         return self._content
 
 
+@dataclass(frozen=True)
+class Route:
+    """路由表中的一项
+
+    由 RPCRouter.iter_routes 生成，描述一个完整方法路径对应的处理信息。
+
+    Args:
+        path: 完整方法路径（不含服务器名称），如 "user.get"
+        plan: 方法的调用计划
+        executor: 同步方法的执行策略
+        middlewares: 从根路由到方法所在路由依次收集的中间件
+        system: 是否为系统方法，系统方法不经过中间件
+        cache: 结果缓存策略，None 表示不缓存
+        call: 预先组合好的调用链（中间件 + 方法执行），由 RPCServer 构建路由表时填充
+    """
+
+    path: str
+    plan: CallPlan
+    executor: str = "inline"
+    middlewares: Tuple[Callable, ...] = ()
+    system: bool = False
+    cache: Optional[CachePolicy] = None
+    call: Optional[Callable[[JSONRPCRequest], Awaitable[Any]]] = None
+
+
 class RPCRouter:
     """RPC 路由器
 
@@ -223,18 +322,79 @@ class RPCRouter:
         ```
     """
 
-    def __init__(self, prefix: str, label: str = ""):
+    def __init__(self, prefix: str, label: str = "", cache: CacheOption = None):
         """初始化路由器
 
         Args:
             prefix: 路由前缀
             label: 路由标签，默认 ""
+            cache: 路由器内方法（含子路由器）默认的结果缓存策略，默认 None（继承上级路由器）。
+                True 使用默认策略，False 不缓存；方法注册时指定的 cache 优先
+
+        Raises:
+            TypeError: 当 cache 不是 CachePolicy、bool 或 None 时
         """
         self.prefix = prefix
         self.label = label
-        self.methods = MethodsDict()
-        self.middlewares = MiddlewaresList()
+        self.cache_policy = resolve_cache_option(cache)
+        self.methods = MethodsDict(on_change=self._invalidate_routes)
+        self.middlewares = MiddlewaresList(on_change=self._invalidate_routes)
         self.sub_routers: Dict[str, RPCRouter] = {}
+        # 挂载了当前路由器的父路由器，用于向上传递路由变化
+        self._parents: List[RPCRouter] = []
+
+    def _invalidate_routes(self) -> None:
+        """通知路由树已变化
+
+        方法、中间件或子路由器变化时调用，并逐级通知父路由器。
+        持有路由表的子类（如 RPCServer）重写该方法以丢弃缓存的路由表。
+        """
+        for parent in self._parents:
+            parent._invalidate_routes()
+
+    def iter_routes(
+        self,
+        prefix: str = "",
+        middlewares: Tuple[Callable, ...] = (),
+        cache: Optional[CachePolicy] = None,
+    ) -> Iterator[Route]:
+        """遍历路由树，生成所有方法的路由项
+
+        Args:
+            prefix: 当前路由器的完整路径前缀，默认 ""
+            middlewares: 上级路由器收集的中间件，默认 ()
+            cache: 上级路由器的结果缓存策略，默认 None
+
+        Yields:
+            Route: 路由项，中间件按从根到叶的顺序排列
+
+        例子：
+            ```python
+            for route in app.iter_routes():
+                print(route.path, len(route.middlewares))
+            ```
+        """
+        middlewares = middlewares + tuple(self.middlewares)
+        if self.cache_policy is not None:
+            cache = self.cache_policy or None
+        for method_name, _ in self.methods.items():
+            options = self.methods.get_options(method_name)
+            system = options.get("system", False)
+            method_cache = options.get("cache")
+            if method_cache is None:
+                method_cache = cache
+            yield Route(
+                path=".".join(filter(None, [prefix, method_name])),
+                plan=self.methods.get_plan(method_name),
+                executor=options.get("executor", "inline"),
+                middlewares=() if system else middlewares,
+                system=system,
+                cache=None if system else method_cache or None,
+            )
+        for sub_prefix, sub_router in self.sub_routers.items():
+            yield from sub_router.iter_routes(
+                ".".join(filter(None, [prefix, sub_prefix])), middlewares, cache
+            )
 
     def add_middleware(self, label: str = "") -> Callable:
         """注册中间件装饰器
@@ -264,7 +424,13 @@ class RPCRouter:
 
         return decorator
 
-    def add_method(self, name: str = None, label: str = "") -> Callable:
+    def add_method(
+        self,
+        name: str = None,
+        label: str = "",
+        executor: MethodExecutor = "inline",
+        cache: CacheOption = None,
+    ) -> Callable:
         """注册 RPC 方法装饰器
 
         用于注册 RPC 方法。方法名称可以指定，也可以使用函数名。
@@ -272,10 +438,25 @@ class RPCRouter:
         Args:
             name: 方法名称，默认为函数名
             label: 方法标签，默认 ""
+            executor: 同步方法的执行策略，默认 "inline"
+                - "inline": 直接在事件循环中调用
+                - "thread": 在服务器线程池中执行，适合阻塞 I/O
+                - "process": 在服务器进程池中执行，适合 CPU 密集计算。
+                  方法必须定义在模块顶层，参数与返回值需可被 pickle
+                异步方法始终在事件循环中执行，忽略该选项。
+            cache: 结果缓存策略，默认 None（使用路由器的策略）
+                - True: 使用默认策略 CachePolicy()
+                - CachePolicy(ttl, max_entries, max_bytes): 使用指定策略
+                - False: 不缓存，即使路由器启用了缓存
+                只应用于相同参数总是返回相同结果的方法；命中时不执行方法
 
         Returns:
             Callable: 装饰器函数
 
+        Raises:
+            ValueError: 当 executor 不是支持的执行策略时
+            TypeError: 当 cache 不是 CachePolicy、bool 或 None 时
+
         例子：
             ```python
             # 使用函数名作为方法名
@@ -287,12 +468,28 @@ class RPCRouter:
             @router.add_method(name="user.get", label="获取用户")
             def get_user(user_id: int) -> dict:
                 return {"id": user_id}
+
+            # CPU 密集方法放入进程池执行
+            @router.add_method(name="resize", executor="process")
+            def resize(path: str, width: int) -> str:
+                ...
+
+            # 缓存查询结果 60 秒
+            @router.add_method(name="user.info", cache=CachePolicy(ttl=60))
+            def user_info(user_id: int) -> dict:
+                ...
             ```
         """
+        if executor not in METHOD_EXECUTORS:
+            raise ValueError(
+                f"不支持的 executor: {executor}，可选值为 {', '.join(METHOD_EXECUTORS)}"
+            )
+        cache = resolve_cache_option(cache)
 
         def decorator(func):
             method_name = name or func.__name__
             self.methods[method_name] = (func, label)
+            self.methods.set_options(method_name, executor=executor, cache=cache)
             return func
 
         return decorator
@@ -326,3 +523,5 @@ class RPCRouter:
         if router.prefix in self.sub_routers:
             raise ValueError(f"前缀为 {router.prefix} 的路由器已存在.")
         self.sub_routers[router.prefix] = router
+        router._parents.append(self)
+        self._invalidate_routes()
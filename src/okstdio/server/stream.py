@@ -7,13 +7,21 @@
 import asyncio
 import sys
 import os
+import stat
+import itertools
 import json
-from typing import Optional, Any
+from collections import deque
+from typing import Optional, Any, Deque
 import logging
 import io
+from pydantic import BaseModel
+from ..general.jsonrpc_model import EncodedJSONRPCResponse
 
 logger = logging.getLogger("okstdio.server.stream")
 
+# 单次 writev 提交的最大缓冲区数量（POSIX IOV_MAX 的常见下限）
+_IOV_MAX = 1024
+
 
 # 在 Windows 上强制使用 UTF-8 编码
 if os.name == "nt":
@@ -22,128 +30,427 @@ if os.name == "nt":
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8", line_buffering=True)
 
 
+def _dump_json(model: BaseModel) -> bytes:
+    """将 Pydantic 模型直接序列化为 JSON 字节
+
+    model_dump_json 会先生成字节再解码为字符串，这里直接使用序列化器输出字节，
+    大型响应不再产生额外的字符串副本。结果已预先序列化的响应直接拼接缓存的字节。
+    """
+    if isinstance(model, EncodedJSONRPCResponse):
+        return model.encode()
+    return model.__pydantic_serializer__.to_json(model)
+
+
 class PackStreamReader:
     """PackStreamReader 是用于读取标准输入的类。
-    
-    在 Windows 上，它使用 asyncio.to_thread 来读取输入数据。
-    在 Linux 和 macOS 上，它使用事件循环的 add_reader 方法来添加标准输入的读取事件。
-    
+
+    直接从标准输入的原始文件描述符按块读取字节（os.read），在可复用的 bytearray 中
+    切分出完整的行，一次读取中的所有完整行会同时放入队列。读取到的行保持为字节，
+    不经过文本层解码，由调用方直接按字节解析。
+
+    在 Windows 上，它使用 asyncio.to_thread 来读取数据块。
+    在 Linux 和 macOS 上，它使用事件循环的 add_reader 方法，在标准输入可读时读取数据块。
+
     支持异步读取，通过 readline 方法读取一行数据。
-    
+
     例子：
         ```python
         reader = PackStreamReader()
         line = await reader.readline()
-        print(f"收到: {line}")
+        print(f"收到: {line!r}")
         ```
     """
 
-    def __init__(self):
+    def __init__(
+        self, chunk_size: int = 64 * 1024, max_line_length: int = 64 * 1024 * 1024
+    ):
         """初始化 PackStreamReader
-        
+
         根据操作系统选择不同的读取策略：
             - Windows: 使用 asyncio.to_thread
             - Linux/macOS: 使用 _loop.add_reader
+
+        读取事件在第一次 readline 时才注册到正在运行的事件循环上，
+        因此可以在模块导入阶段（事件循环启动前）创建实例。
+
+        Args:
+            chunk_size: 单次读取的最大字节数，默认 64 KiB
+            max_line_length: 单行最大字节数，默认 64 MiB。超出的行会被丢弃并记录错误日志
         """
         self.stdin = sys.stdin
+        self.chunk_size = chunk_size
+        self.max_line_length = max_line_length
         self._queue = asyncio.Queue()
-        self._loop = asyncio.get_event_loop()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._buffer = bytearray()
+        # 缓冲区中已确认不含换行符的前缀长度，下次从此处开始查找
+        self._scanned = 0
+        # 正在丢弃超长行，直到遇到下一个换行符
+        self._discarding = False
+        self._eof = False
 
+    def _ensure_reader(self):
+        """确保标准输入的读取事件已注册到当前运行的事件循环"""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop or self._eof:
+            return
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.remove_reader(self.stdin.fileno())
+        self._loop = loop
         # 在 Linux 和 macOS 上，使用 _loop.add_reader 方法来添加标准输入的读取事件.
-        if os.name != "nt":
-            self._loop.add_reader(self.stdin.fileno(), self._on_stdin_ready)
+        self._loop.add_reader(self.stdin.fileno(), self._on_stdin_ready)
 
     def _on_stdin_ready(self):
         """标准输入就绪回调
-        
+
         在 Linux/macOS 上，当标准输入有数据时被调用。
-        读取数据并放入队列。
+        读取一个数据块，并将其中所有完整的行放入队列。
         """
-        line = self.stdin.readline()
-        self._queue.put_nowait(line)
+        try:
+            data = os.read(self.stdin.fileno(), self.chunk_size)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError as e:
+            logger.error(f"PackStreamReader 读取错误: {e}")
+            data = b""
+        if not data:
+            self._loop.remove_reader(self.stdin.fileno())
+        self._feed(data)
+
+    def _feed(self, data: bytes) -> None:
+        """将读取到的数据块切分为行并放入队列
+
+        Args:
+            data: 读取到的数据块，空字节表示 EOF
+        """
+        buffer = self._buffer
+        if not data:
+            # EOF：最后一行可能没有换行符，之后放入空字符串表示流结束
+            self._eof = True
+            if buffer and not self._discarding:
+                self._queue.put_nowait(bytes(buffer))
+            buffer.clear()
+            self._queue.put_nowait(b"")
+            return
+
+        buffer += data
+        start = 0
+        end = buffer.find(b"\n", self._scanned)
+        while end != -1:
+            if self._discarding:
+                self._discarding = False
+            elif end - start > self.max_line_length:
+                # 整行在同一个数据块中到达时同样受长度限制
+                self._log_dropped()
+            elif start == 0 and end + 1 == len(buffer):
+                # 缓冲区恰好是一整行（大请求的常见情况）：直接交出缓冲区，避免再复制一次
+                self._queue.put_nowait(buffer)
+                buffer = self._buffer = bytearray()
+                break
+            else:
+                self._queue.put_nowait(buffer[start : end + 1])
+            start = end + 1
+            end = buffer.find(b"\n", start)
+        if start:
+            del buffer[:start]
+        self._scanned = len(buffer)
+
+        if self._scanned > self.max_line_length:
+            if not self._discarding:
+                self._log_dropped()
+            self._discarding = True
+            buffer.clear()
+            self._scanned = 0
+
+    def _log_dropped(self) -> None:
+        """记录超长行已被丢弃"""
+        logger.error(f"PackStreamReader 单行超过 {self.max_line_length} 字节，已丢弃")
 
     async def readline(self):
         """读取一行数据
-        
-        在 Windows 上，使用 asyncio.to_thread 方法来读取输入数据。
+
+        在 Windows 上，使用 asyncio.to_thread 方法来读取数据块。
         在 Linux/macOS 上，从队列中获取数据。
-        
+
         Returns:
-            str: 读取的一行数据
+            bytes | bytearray: 读取的一行数据（包含换行符），到达 EOF 时返回空字节
         """
         # 在 Windows 上，使用 asyncio.to_thread 方法来读取输入数据.
         if os.name == "nt":
-            return await asyncio.to_thread(self.stdin.readline)
+            while self._queue.empty() and not self._eof:
+                data = await asyncio.to_thread(
+                    os.read, self.stdin.fileno(), self.chunk_size
+                )
+                self._feed(data)
+            if self._queue.empty():
+                return b""
+            return self._queue.get_nowait()
+        self._ensure_reader()
         return await self._queue.get()
 
 
 class PackStreamWriter:
     """PackStreamWriter 是用于写入标准输出的类。
-    
-    在 Windows 上，它使用 asyncio.to_thread 来写入数据。
-    在 Linux 和 macOS 上，它使用事件循环的 run_in_executor 方法来写入数据。
-    
-    支持异步写入，通过 write 方法写入数据。
-    
+
+    写入的数据先追加到缓冲区，随后合并为一次系统调用写出：
+        - 缓冲区超过 flush_threshold 时立即写出
+        - 否则在 flush_interval 秒后写出（默认 0，即当前事件循环迭代结束时写出）
+
+    在 Linux 和 macOS 上，当标准输出是管道或套接字时，以非阻塞方式通过 os.writev
+    直接写入原始文件描述符，管道写满时由事件循环的 add_writer 在可写后继续写出。
+    在 Windows 上或标准输出为终端、普通文件时，合并后的数据通过 asyncio.to_thread 写出。
+
+    缓冲区中未写出的数据超过 high_water 时，write 会等待数据写出后再返回，形成背压。
+
     例子：
         ```python
         writer = PackStreamWriter()
         await writer.write("Hello\n")
-        await writer.write(JSONRPCResponse(result="ok"))
+        await writer.write(b'{"id":1,"jsonrpc":"2.0","result":"ok"}\n')
         ```
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        flush_threshold: int = 64 * 1024,
+        flush_interval: float = 0.0,
+        high_water: int = 4 * 1024 * 1024,
+    ):
         """初始化 PackStreamWriter
-        
-        根据操作系统选择不同的写入策略：
-            - Windows: 使用 asyncio.to_thread
-            - Linux/macOS: 使用事件循环的 run_in_executor
+
+        写入方式在第一次写入时根据平台和标准输出类型确定：
+            - Linux/macOS 且标准输出为管道或套接字: 非阻塞 os.writev
+            - 其他情况: 使用 asyncio.to_thread
+
+        Args:
+            flush_threshold: 缓冲区达到该字节数时立即写出，默认 64 KiB
+            flush_interval: 缓冲数据的最长等待写出时间（秒），默认 0.0
+            high_water: 未写出数据超过该字节数时 write 等待写出，默认 4 MiB
         """
         self.stdout = sys.stdout
-        self._loop = asyncio.get_event_loop()
+        self.flush_threshold = flush_threshold
+        self.flush_interval = flush_interval
+        self.high_water = high_water
         self._lock = asyncio.Lock()
+        self._chunks: Deque[bytes | memoryview] = deque()
+        self._buffered = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # 非阻塞写入的原始文件描述符，为 None 时使用线程写入
+        self._fd: Optional[int] = None
+        self._flush_handle: Optional[asyncio.Handle] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._writer_active = False
+        self._drained: Optional[asyncio.Event] = None
+        self._error: Optional[BaseException] = None
+
+    def _ensure_started(self) -> None:
+        """绑定当前运行的事件循环并确定写入方式"""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        self._loop = loop
+        self._drained = asyncio.Event()
+        self._drained.set()
+
+        if os.name == "nt":
+            return
+        try:
+            fd = self.stdout.fileno()
+            mode = os.fstat(fd).st_mode
+        except (AttributeError, OSError, ValueError):
+            return
+        # 只对管道和套接字启用非阻塞写入，避免修改终端等共享设备的文件状态
+        if stat.S_ISFIFO(mode) or stat.S_ISSOCK(mode):
+            self.stdout.flush()
+            os.set_blocking(fd, False)
+            self._fd = fd
 
     async def write(self, data):
         """写入数据
-        
-        在 Windows 上，使用 asyncio.to_thread 方法来写入数据。
-        在 Linux/macOS 上，使用事件循环的 run_in_executor 方法来写入数据。
-        
+
+        数据追加到缓冲区后立即返回，由缓冲区阈值或延迟窗口触发合并写出。
+        未写出的数据超过 high_water 时等待写出。
+
         Args:
             data: 要写入的数据，可以是字符串或字节
-        
+
+        Raises:
+            OSError: 当之前的写出已失败（如对端关闭管道）时
+
         例子：
             ```python
             # 写入字符串
             await writer.write("Hello\n")
-            
+
             # 写入字节
             await writer.write(b"Hello\n")
             ```
         """
-        if isinstance(data, bytes):
-            data = data.decode("utf-8")
-        async with self._lock:
-            if os.name == "nt":
-                await asyncio.to_thread(self.stdout.write, data)
-                await asyncio.to_thread(self.stdout.flush)
+        await self.writelines((data,))
+
+    async def writelines(self, chunks):
+        """依次写入多个数据片段
+
+        所有片段在同一次调用中连续追加到缓冲区（中间不会让出事件循环），
+        因此并发写入时一行数据的各个片段不会与其他写入交错。
+        片段不会被拼接，写出时由 writev 一次提交。
+
+        Args:
+            chunks: 要写入的数据片段序列，每个片段可以是字符串或字节
+
+        Raises:
+            OSError: 当之前的写出已失败（如对端关闭管道）时
+        """
+        self._ensure_started()
+        if self._error is not None:
+            raise self._error
+
+        for data in chunks:
+            if isinstance(data, str):
+                data = data.encode("utf-8")
+            if data:
+                self._chunks.append(data)
+                self._buffered += len(data)
+        if not self._chunks:
+            return
+
+        if self._buffered >= self.flush_threshold:
+            self._flush()
+        elif self._flush_handle is None:
+            if self.flush_interval > 0:
+                self._flush_handle = self._loop.call_later(
+                    self.flush_interval, self._flush
+                )
+            else:
+                self._flush_handle = self._loop.call_soon(self._flush)
+
+        if self._buffered > self.high_water:
+            self._drained.clear()
+            await self._drained.wait()
+            if self._error is not None:
+                raise self._error
+
+    def _flush(self) -> None:
+        """开始写出缓冲区"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        if self._fd is None:
+            if self._flush_task is None or self._flush_task.done():
+                self._flush_task = self._loop.create_task(self._flush_in_thread())
+            return
+
+        # 已在等待可写事件时，由 add_writer 回调继续写出
+        if not self._writer_active:
+            self._on_writable()
+
+    def _on_writable(self) -> None:
+        """以非阻塞方式尽可能多地写出缓冲区，写不完时等待可写事件"""
+        while self._chunks:
+            batch = list(itertools.islice(self._chunks, _IOV_MAX))
+            try:
+                written = os.writev(self._fd, batch)
+            except (BlockingIOError, InterruptedError):
+                break
+            except OSError as e:
+                self._fail(e)
+                return
+            self._consume(written)
+            if written < sum(len(chunk) for chunk in batch):
+                break
+
+        if self._chunks and not self._writer_active:
+            self._loop.add_writer(self._fd, self._on_writable)
+            self._writer_active = True
+        elif not self._chunks and self._writer_active:
+            self._loop.remove_writer(self._fd)
+            self._writer_active = False
+
+        if self._buffered <= self.high_water:
+            self._drained.set()
+
+    def _consume(self, size: int) -> None:
+        """从缓冲区移除已写出的字节"""
+        self._buffered -= size
+        while size:
+            chunk = self._chunks[0]
+            if size >= len(chunk):
+                self._chunks.popleft()
+                size -= len(chunk)
             else:
-                await self._loop.run_in_executor(None, self.stdout.write, data)
-                await self._loop.run_in_executor(None, self.stdout.flush)
+                self._chunks[0] = memoryview(chunk)[size:]
+                size = 0
+
+    async def _flush_in_thread(self) -> None:
+        """在线程中写出缓冲区，写出期间新写入的数据在下一轮合并写出"""
+        async with self._lock:
+            while self._chunks:
+                data = b"".join(self._chunks)
+                self._chunks.clear()
+                try:
+                    await asyncio.to_thread(self._write_blocking, data)
+                except Exception as e:
+                    self._fail(e)
+                    return
+                self._buffered -= len(data)
+                if self._buffered <= self.high_water:
+                    self._drained.set()
+
+    def _write_blocking(self, data: bytes) -> None:
+        """阻塞写入标准输出"""
+        buffer = getattr(self.stdout, "buffer", None)
+        if buffer is None:
+            self.stdout.write(data.decode("utf-8"))
+        else:
+            self.stdout.flush()
+            buffer.write(data)
+            buffer.flush()
+        self.stdout.flush()
+
+    def _fail(self, error: BaseException) -> None:
+        """写出失败，丢弃缓冲区并唤醒等待的写入"""
+        logger.error(f"PackStreamWriter 写出错误: {error}")
+        self._error = error
+        self._chunks.clear()
+        self._buffered = 0
+        if self._writer_active:
+            self._loop.remove_writer(self._fd)
+            self._writer_active = False
+        self._drained.set()
 
     def close(self):
         """关闭 PackStreamWriter
-        
-        刷新标准输出缓冲区。
+
+        同步写出缓冲区中剩余的数据并刷新标准输出缓冲区，
+        非阻塞模式下恢复标准输出的阻塞状态。
         注意：不会关闭标准输出本身，只做 flush 操作。
         """
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
         try:
+            data = b"".join(self._chunks)
+            self._chunks.clear()
+            self._buffered = 0
+            if self._fd is not None:
+                if self._writer_active:
+                    self._loop.remove_writer(self._fd)
+                    self._writer_active = False
+                os.set_blocking(self._fd, True)
+                view = memoryview(data)
+                while view:
+                    view = view[os.write(self._fd, view):]
+                self._fd = None
+            elif data:
+                self._write_blocking(data)
             # 只做 flush 而不要关闭；或至少在捕获时记录日志、区分 IOError 等常见情况。
             self.stdout.flush()
         except Exception as e:
             logger.exception(f"PackStreamWriter 关闭错误: {e}")
             raise e
+        finally:
+            self._loop = None
 
 
 class StdioStream:
@@ -172,28 +479,35 @@ class StdioStream:
         ```
     """
 
-    def __init__(self):
+    def __init__(
+        self, flush_interval: float = 0.0, max_line_length: int = 64 * 1024 * 1024
+    ):
         """初始化 StdioStream
         
         创建 PackStreamReader 和 PackStreamWriter 实例。
+
+        Args:
+            flush_interval: 写入数据的最长合并等待时间（秒），默认 0.0
+            max_line_length: 读取的单行最大字节数，默认 64 MiB
         """
-        self.reader = PackStreamReader()
-        self.writer = PackStreamWriter()
+        self.reader = PackStreamReader(max_line_length=max_line_length)
+        self.writer = PackStreamWriter(flush_interval=flush_interval)
 
-    async def read_line(self) -> str:
+    async def read_line(self) -> bytes | bytearray:
         """读取一行数据
         
         Returns:
-            str: 读取的一行数据，如果读取失败则返回空字符串
+            bytes | bytearray: 读取的一行数据（未解码的原始字节），如果读取失败则返回空字节
         """
         line = await self.reader.readline()
-        return line if line else ""
+        return line if line else b""
 
     async def write_line(self, line: Any) -> None:
         """写入一行数据
         
         Args:
-            line: 要写入的行数据，可以是字符串或 Pydantic 模型
+            line: 要写入的行数据，可以是字符串、字节、JSON-RPC 模型或模型列表（写为 JSON 数组）。
+                模型直接序列化为 JSON 字节写出，不经过字符串中转
         
         Raises:
             Exception: 当写入失败时
@@ -212,14 +526,26 @@ class StdioStream:
         """
         try:
             # 处理 Pydantic 模型
-            if hasattr(line, "model_dump_json"):
-                line_str = line.model_dump_json()
+            if isinstance(line, BaseModel):
+                chunks = [_dump_json(line)]
+            # 处理批量响应
+            elif isinstance(line, list):
+                chunks = [b"["]
+                for i, item in enumerate(line):
+                    if i:
+                        chunks.append(b",")
+                    chunks.append(_dump_json(item))
+                chunks.append(b"]")
+            elif isinstance(line, (bytes, bytearray, memoryview)):
+                chunks = [line]
             else:
-                line_str = str(line)
-            
-            logger.debug(f"StdioStream 准备响应: {line_str}")
-            await self.writer.write(line_str.encode("utf-8") + b"\n")
-            logger.debug(f"StdioStream 发送响应: {line_str}")
+                chunks = [str(line).encode("utf-8")]
+            # 各片段分别进入写缓冲区，由写出时的 writev 合并，避免拼接大块数据
+            chunks.append(b"\n")
+
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"StdioStream 准备响应: {b''.join(chunks)!r}")
+            await self.writer.writelines(chunks)
         except Exception as e:
             logger.exception(f"StdioStream 发送响应错误: {e}")
             raise e
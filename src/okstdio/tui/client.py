@@ -3,14 +3,10 @@
 继承 RPCClient，拦截所有 I/O 消息用于调试显示。
 """
 
-import json
-import asyncio
-from typing import Callable, Optional, Any
-
-from pydantic import ValidationError
+from typing import Callable, List, Optional, Any
 
 from ..client import RPCClient
-from ..general.jsonrpc_model import JSONRPCRequest, JSONRPCResponse, JSONRPCError
+from ..general.jsonrpc_model import JSONRPCNotification, JSONRPCRequest
 
 
 class TUIClient(RPCClient):
@@ -34,75 +30,38 @@ class TUIClient(RPCClient):
         self._on_recv = on_recv
         self._on_push = on_push
 
-    async def read_loop(self):
-        """重写读循环，在消息分发前通过回调通知 TUI"""
-        while self._running:
-            try:
-                response_line = await asyncio.wait_for(
-                    self.process.stdout.readline(), timeout=1.0
-                )
-
-                if not response_line:
-                    self.logger.debug("连接已断开")
-                    break
-
-                try:
-                    response_text = response_line.decode("utf-8").strip()
-                    self.logger.debug(response_text)
-                except UnicodeDecodeError as e:
-                    self.logger.warning(f"解码错误，跳过此行: {e}")
-                    continue
-
-                if not response_text:
-                    continue
-
-                try:
-                    response = json.loads(response_text)
-                    response_id = response.get("id")
-                    if not response_id:
-                        continue
-
-                    # 钩子：记录所有接收的原始消息
-                    if self._on_recv:
-                        self._on_recv(response)
-
-                    if response.get("result"):
-                        parsed = JSONRPCResponse.model_validate(response)
-                    elif response.get("error"):
-                        parsed = JSONRPCError.model_validate(response)
-                    else:
-                        continue
-
-                    # 匹配监听队列
-                    if response_id in self._listen_queue.keys():
-                        await self._listen_queue[response_id].put(parsed)
-                        continue
-
-                    # 匹配 pending future
-                    future = self._pending_future.pop(response_id, None)
-                    if future:
-                        future.set_result(parsed)
-                        continue
-
-                    # 未匹配 → 服务器主动推送
-                    if self._on_push:
-                        self._on_push(response_id, parsed)
-
-                except json.JSONDecodeError as e:
-                    self.logger.error(f"解析消息失败: {e}")
-                except ValidationError as e:
-                    self.logger.error(f"响应校验错误 {e.errors(include_url=False)}")
-                except Exception as e:
-                    self.logger.error(f"处理消息时出错: {e}")
-
-            except asyncio.TimeoutError:
-                continue
-            except Exception as e:
-                self.logger.exception(f"READ 触发未处理异常: {e}")
-                break
-
-    async def _do_send(self, request: JSONRPCRequest):
+    async def _dispatch_message(self, message) -> None:
+        """重写消息分发，在分发前通过 on_recv 回调通知 TUI
+
+        __ready__ 等系统通知（方法名以双下划线包围）只由父类处理，不计入接收记录。
+        """
+        if isinstance(message, dict):
+            method = message.get("method") if "id" not in message else None
+        elif isinstance(message, JSONRPCNotification):
+            method = message.method
+        else:
+            method = None
+        # 钩子：记录接收的原始消息
+        if self._on_recv and not (
+            method and method.startswith("__") and method.endswith("__")
+        ):
+            self._on_recv(message if isinstance(message, dict) else message.model_dump())
+        await super()._dispatch_message(message)
+
+    def _on_unmatched(self, response_id, message) -> None:
+        """未匹配 Future 或监听队列的响应视为服务器主动推送"""
+        if self._on_push:
+            self._on_push(response_id, message)
+
+    def _send_request(self, request: JSONRPCRequest) -> None:
         """重写发送方法，在发送前触发 on_send 回调"""
         if self._on_send:
             self._on_send(request.method, request.params, request.id)
-        await super()._do_send(request)
+        super()._send_request(request)
+
+    def _send_batch(self, requests: List[JSONRPCRequest]) -> None:
+        """重写批量发送方法，在发送前为每个请求触发 on_send 回调"""
+        if self._on_send:
+            for request in requests:
+                self._on_send(request.method, request.params, request.id)
+        super()._send_batch(requests)
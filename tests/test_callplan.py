@@ -0,0 +1,156 @@
+import asyncio
+import inspect
+import json
+from typing import Annotated
+from pydantic import BaseModel
+from okstdio.general.errors import RPCInvalidParamsError
+from okstdio.server import Inject, IOWrite, RPCRouter, RPCServer
+from okstdio.server.callplan import CallPlan
+
+
+class Point(BaseModel):
+    x: int
+    y: int = 0
+
+
+class Service:
+    def __init__(self, name: str):
+        self.name = name
+
+
+def request(method: str, params, id: int = 1) -> bytes:
+    return json.dumps({"jsonrpc": "2.0", "id": id, "method": method, "params": params}).encode()
+
+
+def test_compile():
+
+    async def handler(
+        point: Point,
+        io_write: IOWrite,
+        service: Annotated[Service, Inject()] = None,
+        name: str = "World",
+        raw=None,
+    ):
+        pass
+
+    plan = CallPlan.compile(handler)
+    assert plan.is_coroutine
+    point, io_write, service, name, raw = plan.params
+    assert point.model is Point and not point.has_default
+    assert io_write.dependency and io_write.model is None
+    assert service.inject and service.annotation is Service and service.default is None
+    assert not name.inject and name.dependency and name.default == "World"
+    assert not raw.dependency and raw.annotation is inspect.Parameter.empty
+
+    def plain(a: int) -> int:
+        return a
+
+    assert not CallPlan.compile(plain).is_coroutine
+
+
+async def test_injection():
+
+    app = RPCServer("plan_app")
+
+    @app.add_method()
+    async def inject(
+        point: Point,
+        io_write: IOWrite,
+        service: Annotated[Service, Inject()] = None,
+        name: str = "World",
+    ) -> dict:
+        return {
+            "point": point.x + point.y,
+            "io_write": io_write is app.get_dependency(IOWrite),
+            "service": service.name if service is not None else None,
+            "name": name,
+        }
+
+    # 未注册的 Inject 依赖使用默认值，IOWrite 由服务器内置注册
+    response = await app.handle_request(request("inject", {"point": {"x": 1, "y": 2}}))
+    assert response.result == {"point": 3, "io_write": True, "service": None, "name": "World"}
+
+    # 运行时注册的依赖在下一次请求中注入，请求参数无法覆盖注入参数
+    app.register_dependency(Service, lambda: Service("db"))
+    response = await app.handle_request(
+        request("inject", {"point": {"x": 1}, "service": "ignored", "name": "okstdio"})
+    )
+    assert response.result == {"point": 1, "io_write": True, "service": "db", "name": "okstdio"}
+
+    # 模型参数校验失败
+    try:
+        await app.handle_request(request("inject", {"point": {"x": "a"}}))
+        assert False, "should raise RPCInvalidParamsError"
+    except RPCInvalidParamsError as e:
+        assert e.data[0]["loc"] == ("x",)
+
+
+async def test_invalid_params():
+
+    app = RPCServer("plan_app")
+
+    @app.add_method()
+    def add(a: int, b: int = 2) -> int:
+        return a + b
+
+    @app.add_method()
+    def ping() -> str:
+        return "pong"
+
+    assert (await app.handle_request(request("add", {"a": 1}))).result == 3
+
+    # 按位置传参
+    try:
+        await app.handle_request(request("add", [1, 5], id=7))
+        assert False, "should raise RPCInvalidParamsError"
+    except RPCInvalidParamsError as e:
+        assert e.from_id == 7
+        assert e.data[0]["type"] == "dict_type"
+
+    # 缺少必需参数
+    try:
+        await app.handle_request(request("add", {"b": 1}, id=8))
+        assert False, "should raise RPCInvalidParamsError"
+    except RPCInvalidParamsError as e:
+        assert e.from_id == 8
+        assert e.data == [{"type": "missing", "loc": ["a"], "msg": "缺少必需参数"}]
+
+    # null 与空数组视为没有参数
+    assert (await app.handle_request(request("ping", None))).result == "pong"
+    assert (await app.handle_request(request("ping", []))).result == "pong"
+
+
+async def test_rebuild_after_add_method():
+
+    app = RPCServer("plan_app")
+    router = RPCRouter(prefix="math")
+    app.include_router(router)
+
+    @router.add_method()
+    def double(n: int) -> int:
+        return n * 2
+
+    assert (await app.handle_request(request("math.double", {"n": 2}))).result == 4
+
+    # 路由器已被包含、路由表已构建后继续注册方法
+    @router.add_method()
+    def triple(n: int) -> int:
+        return n * 3
+
+    assert (await app.handle_request(request("math.triple", {"n": 2}))).result == 6
+
+    # 重新注册同名方法时使用新函数的调用计划
+    @router.add_method(name="double")
+    def double_with_offset(n: int, offset: int = 1) -> int:
+        return n * 2 + offset
+
+    assert (await app.handle_request(request("math.double", {"n": 2}))).result == 5
+    response = await app.handle_request(request("plan_app.math.double", {"n": 2, "offset": 0}))
+    assert response.result == 4
+
+
+if __name__ == "__main__":
+    test_compile()
+    asyncio.run(test_injection())
+    asyncio.run(test_invalid_params())
+    asyncio.run(test_rebuild_after_add_method())
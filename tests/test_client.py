@@ -1,8 +1,14 @@
 import asyncio
+import json
+import os
+import signal
 import sys
 from pathlib import Path
-from okstdio.client import RPCClient
+from types import SimpleNamespace
+import pytest
+from okstdio.client import ForkServer, RPCClient, StreamQueue, prefixed_ids
 from okstdio.general.errors import RPCError
+from okstdio.server import CachePolicy, RPCRouter, RPCServer
 from rich import print
 import logging
 
@@ -26,6 +32,10 @@ async def test_client():
         result = await client.call("healthy")
         print(result)
 
+        # 默认请求 ID 为递增整数
+        response = await (await client.send("healthy"))
+        assert isinstance(response.id, int) and response.id > 1
+
         # then + BaseModel 自动注入
         async def handle_task(task: TestTask):
             print(f"Task: {task.task_id}")
@@ -47,6 +57,530 @@ async def test_client():
         except RPCError as e:
             print(f"预期错误: {e.code}")
 
+        # 嵌套路由与中间件，路径可带服务器名称前缀
+        first = await client.call("tools.text.upper", {"text": "ok"})
+        second = await client.call("test_server.tools.text.upper", {"text": "ok"})
+        assert first["text"] == "OK"
+        assert second["calls"] == first["calls"] + 1
+
+        # 批量请求：一次写入，一次读取
+        futures = client.call_many(["healthy", ("hello", {"name": "batch"}), "nonexistent"])
+        assert await futures[0] == {"status": "healthy"}
+        assert await futures[1] == "hello batch !"
+        try:
+            await futures[2]
+            assert False, "should raise RPCError"
+        except RPCError as e:
+            assert e.code == -32601
+
+        async with client.batch() as batch:
+            upper_future = batch.call("tools.text.upper", {"text": "a"})
+            hello_future = batch.call("hello")
+        assert (await upper_future)["text"] == "A"
+        assert await hello_future == "hello World !"
+
+        # 通知：不登记 Future，服务器不返回响应
+        await client.notify("record", {"value": "n1"})
+        await client.notify("nonexistent")
+        await client.notify("record", {"value": "n2"})
+        assert await client.call("recorded") == ["n1", "n2"]
+        assert not client._pending_future
+
+        # 并发处理：慢请求不阻塞快请求
+        slow = asyncio.ensure_future(client.call("sleep", {"seconds": 2}))
+        fast = await asyncio.wait_for(client.call("healthy"), timeout=1)
+        assert fast == {"status": "healthy"}
+        assert not slow.done()
+        assert await slow == {"slept": 2}
+
+        # 同步方法在线程池中执行，不阻塞事件循环
+        blocking = asyncio.ensure_future(client.call("block", {"seconds": 2}))
+        fast = await asyncio.wait_for(client.call("healthy"), timeout=1)
+        assert fast == {"status": "healthy"}
+        assert await blocking == {"blocked": 2}
+
+        # 同步方法在进程池中执行
+        assert await client.call("square_sum", {"n": 1000}) == sum(i * i for i in range(1000))
+
+
+class ChunkedStdout:
+    """按给定的数据块边界返回数据的子进程标准输出，数据读完后返回 EOF"""
+
+    def __init__(self, *chunks: bytes):
+        self.chunks = list(chunks)
+
+    async def read(self, n: int) -> bytes:
+        await asyncio.sleep(0)
+        return self.chunks.pop(0) if self.chunks else b""
+
+
+async def read_lines(client: RPCClient, *chunks: bytes) -> list:
+    """让读循环读取给定的数据块直到 EOF，返回切分出的行"""
+    lines = []
+
+    async def handle_line(line):
+        lines.append(bytes(line))
+
+    client.process = SimpleNamespace(stdout=ChunkedStdout(*chunks))
+    client._handle_line = handle_line
+    client._running = True
+    await asyncio.wait_for(client.read_loop(), timeout=5)
+    assert not client.running
+    return lines
+
+
+async def test_read_loop_lines():
+
+    client = RPCClient("chunks", max_line_length=16)
+    # 一行跨越多个数据块，一个数据块中的多行
+    lines = await read_lines(client, b'{"id":', b"1,", b'"a":2}\n', b"a\nbb\nc", b"c\n")
+    assert lines == [b'{"id":1,"a":2}\n', b"a\n", b"bb\n", b"cc\n"]
+    # EOF 时最后一行没有换行符
+    assert await read_lines(client, b"a\nta", b"il") == [b"a\n", b"tail"]
+    # 超长的行被丢弃（跨越多个数据块或在一个数据块中完整到达），之后的行照常送达
+    lines = await read_lines(
+        client, b"x" * 10, b"x" * 10, b"x" * 100, b"x\nok\n", b"y" * 17 + b"\nok2\n", b"z" * 20
+    )
+    assert lines == [b"ok\n", b"ok2\n"]
+
+    # 默认不限制单行长度
+    client = RPCClient("chunks")
+    line = b"x" * (1024 * 1024) + b"\n"
+    chunks = [line[i : i + 65536] for i in range(0, len(line), 65536)]
+    assert await read_lines(client, *chunks) == [line]
+
+
+async def test_raw_responses():
+
+    # raw_responses：响应只做 JSON 解析，以字典交付
+    # prefixed_ids：多个客户端共用日志时用前缀区分请求
+    async with RPCClient(
+        "test_server",
+        app="tests.test_server",
+        raw_responses=True,
+        id_generator=prefixed_ids("raw-"),
+    ) as client:
+        assert await client.call("healthy") == {"status": "healthy"}
+
+        future = await client.send("hello", {"name": "raw"})
+        response = await future
+        assert isinstance(response, dict) and response["result"] == "hello raw !"
+
+        futures = client.call_many(["hello", "nonexistent"])
+        assert await futures[0] == "hello World !"
+        try:
+            await futures[1]
+            assert False, "should raise RPCError"
+        except RPCError as e:
+            assert e.code == -32601
+
+        request_id = await client.call("hello").then(lambda response: response["id"])
+        assert request_id.startswith("raw-")
+
+
+async def test_send_frames():
+
+    async with RPCClient("frames", app="tests.test_server") as client:
+        writes = []
+        writelines = client.process.stdin.writelines
+
+        def counting_writelines(chunks):
+            writes.append(len(chunks))
+            writelines(chunks)
+
+        client.process.stdin.writelines = counting_writelines
+
+        async def record(i: int):
+            return await (await client.send("record", {"value": f"v{i}"}, request_id=f"frame-{i}"))
+
+        # 并发发起的请求在同一次事件循环迭代中合并为一次写入，每个请求恰好送达一次
+        responses = await asyncio.gather(*(record(i) for i in range(200)))
+        assert writes == [400]
+        assert [response.id for response in responses] == [f"frame-{i}" for i in range(200)]
+        assert sorted(response.result for response in responses) == list(range(1, 201))
+        assert sorted(await client.call("recorded")) == sorted(f"v{i}" for i in range(200))
+
+    # stop() 之后的发送立即失败，不写入已关闭的传输
+    for attempt in (
+        lambda: client.send("healthy"),
+        lambda: client.notify("record", {"value": "late"}),
+        lambda: client.call("healthy"),
+        lambda: client.call_many(["healthy"]),
+    ):
+        try:
+            await attempt()
+            assert False, "should raise RuntimeError"
+        except RuntimeError:
+            pass
+    assert not client._out_chunks and client._flush_handle is None
+
+    # 等待写出的大请求不会阻塞 stop()，其 Future 随 stop() 取消
+    client = RPCClient("frames", app="tests.test_server")
+    await client.start()
+    sending = asyncio.ensure_future(client.send("hello", {"name": "x" * (8 * 1024 * 1024)}))
+    await asyncio.sleep(0)
+    await asyncio.wait_for(client.stop(), timeout=5)
+    assert (await sending).cancelled()
+
+
+@pytest.mark.skipif(os.name != "posix", reason="需要 SIGSTOP 暂停子进程")
+async def test_call_backpressure():
+
+    # 子进程不读取 stdin 时，await call() 先等待写缓冲降到高水位以下再等待响应
+    async with RPCClient("slow", app="tests.test_server") as client:
+        pid = client.process.pid
+        payload = "x" * (512 * 1024)
+        os.kill(pid, signal.SIGSTOP)
+        try:
+            calls = [
+                asyncio.ensure_future(client.call("hello", {"name": payload})) for _ in range(8)
+            ]
+            await asyncio.sleep(0.3)
+            assert not any(call.done() for call in calls)
+            assert client._drain_task is not None and not client._drain_task.done()
+        finally:
+            os.kill(pid, signal.SIGCONT)
+        results = await asyncio.wait_for(asyncio.gather(*calls), timeout=30)
+        assert results == [f"hello {payload} !"] * 8
+        assert client._drain_task.done()
+
+
+async def test_start_failure():
+
+    # 子进程在就绪前退出：立即报错，不等待 ready_timeout
+    client = RPCClient("broken", app="tests.nonexistent_server", ready_timeout=30)
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    try:
+        await client.start()
+        assert False, "should raise RuntimeError"
+    except RuntimeError as e:
+        print(f"预期启动失败: {str(e).splitlines()[0]}")
+    assert loop.time() - started < 10
+
+
+async def test_stream_queue():
+
+    # 溢出时丢弃或替换的消息计为已处理，消费完剩余消息后 join() 返回
+    for overflow, expected in (
+        ("drop_oldest", [3, 4]),
+        ("drop_newest", [0, 1]),
+        ("latest", [0, 4]),
+    ):
+        released = []
+        queue = StreamQueue(maxsize=2, overflow=overflow, credit=2, on_credit=released.append)
+        for i in range(5):
+            assert queue.offer(i)
+        assert queue.dropped == 3 and sum(released) == 3
+        items = []
+        while not queue.empty():
+            items.append(queue.get_nowait())
+            queue.task_done()
+        assert items == expected
+        await asyncio.wait_for(queue.join(), timeout=1)
+        assert sum(released) == 5
+
+
+async def test_stream_flow_control():
+
+    async with RPCClient("flow", app="tests.test_server") as client:
+        # drop_oldest：不消费时只保留最新的 maxsize 条
+        async with client.stream("s1", maxsize=3, overflow="drop_oldest") as listener:
+            assert await client.call("burst", {"stream_id": "s1", "count": 10}) == 10
+            assert [(await listener.get()).result for _ in range(3)] == [7, 8, 9]
+            assert client.get_listen_queue("s1").dropped == 7
+
+        # latest：保留较早的消息，最后一条替换为最新消息
+        async with client.stream("s2", maxsize=3, overflow="latest") as listener:
+            await client.call("burst", {"stream_id": "s2", "count": 10})
+            assert [(await listener.get()).result for _ in range(3)] == [0, 1, 9]
+
+        # credit：服务器最多领先 4 条，消费后才继续推送
+        async with client.stream("s3", credit=4, timeout=5) as listener:
+            task = asyncio.ensure_future(client.call("burst", {"stream_id": "s3", "count": 20}))
+            await asyncio.sleep(0.3)
+            assert not task.done()
+            assert client.get_listen_queue("s3").qsize() == 4
+            assert [(await listener.get()).result for _ in range(20)] == list(range(20))
+            assert await task == 20
+
+        # 并发请求不受流控影响
+        assert await client.call("healthy") == {"status": "healthy"}
+
+
+async def test_credit_concurrency():
+
+    # 流控的流多于服务器的 max_concurrency（16）：推送方占满名额等待额度时，
+    # 服务器仍需读取归还额度的通知
+    async with RPCClient("flow", app="tests.test_server") as client:
+        streams = 20
+        listeners = [client.add_listen_queue(f"c{i}", credit=2) for i in range(streams)]
+        calls = [
+            asyncio.ensure_future(client.call("burst", {"stream_id": f"c{i}", "count": 10}))
+            for i in range(streams)
+        ]
+        await asyncio.sleep(0.2)
+
+        async def consume(queue):
+            return [(await queue.get()).result for _ in range(10)]
+
+        results = await asyncio.wait_for(
+            asyncio.gather(*(consume(queue) for queue in listeners)), timeout=10
+        )
+        assert results == [list(range(10))] * streams
+        assert await asyncio.wait_for(asyncio.gather(*calls), timeout=10) == [10] * streams
+        assert await client.call("healthy") == {"status": "healthy"}
+
+
+async def test_credit_burst():
+
+    # 并发模式下存在流控的流，名额占满时连续到达的请求都要处理，不能被多余的读取吞掉
+    app = RPCServer("burst", max_concurrency=2)
+    release = asyncio.Event()
+
+    @app.add_method()
+    async def hold() -> str:
+        await release.wait()
+        return "held"
+
+    @app.add_method()
+    async def hello() -> str:
+        await asyncio.sleep(0.05)
+        return "hello"
+
+    def line(method: str, params=None, id=None) -> bytes:
+        message = {"jsonrpc": "2.0", "method": method, "params": params or {}}
+        if id is not None:
+            message["id"] = id
+        return json.dumps(message).encode() + b"\n"
+
+    lines: asyncio.Queue = asyncio.Queue()
+    responses = {}
+
+    async def read_line():
+        return await lines.get()
+
+    async def write_line(message):
+        if getattr(message, "id", None) is not None:
+            responses[message.id] = message
+
+    app.read_line, app.write_line, app.writer = read_line, write_line, None
+    lines.put_nowait(line("__credit__", {"id": "s", "credit": 0}))
+    lines.put_nowait(line("hold", id=1))
+    server = asyncio.ensure_future(app._runserver())
+    await asyncio.sleep(0.1)
+    # 名额占满期间连续到达的请求暂存待处理，此时还有一次未完成的读取
+    for i in range(2, 6):
+        lines.put_nowait(line("hello", id=i))
+    await asyncio.sleep(0.3)
+    # 之后到达的请求由这次读取交付
+    for i in range(6, 8):
+        lines.put_nowait(line("hello", id=i))
+    await asyncio.sleep(0.3)
+    assert sorted(responses) == list(range(2, 8))
+    release.set()
+    lines.put_nowait(b"")
+    await asyncio.wait_for(server, timeout=5)
+    assert sorted(responses) == list(range(1, 8))
+    assert responses[1].result == "held"
+
+
+async def test_metrics():
+
+    async with RPCClient("metrics", app="tests.test_server") as client:
+        for _ in range(5):
+            await client.call("hello")
+        await client.call("block", {"seconds": 0.2})
+        try:
+            await client.call("nonexistent")
+        except RPCError:
+            pass
+
+        metrics = await client.call("__metrics__", {"reset": True})
+        assert metrics["enabled"]
+        hello = metrics["methods"]["hello"]
+        assert hello["calls"] == 5 and hello["errors"] == 0 and hello["in_flight"] == 0
+        assert hello["latency"]["count"] == 5
+        block = metrics["methods"]["block"]["latency"]
+        assert 190 <= block["p50_ms"] <= block["max_ms"] < 1000
+        # 系统方法和不存在的方法不计入
+        assert "__system__" not in metrics["methods"] and "nonexistent" not in metrics["methods"]
+
+        metrics = await client.call("__metrics__")
+        assert metrics["methods"]["hello"]["calls"] == 0
+
+
+async def test_method_tree_cache():
+
+    async with RPCClient("tree", app="tests.test_server") as client:
+        tree = await client.get_server_methods()
+        assert tree["etag"] and any(m["name"] == "hello" for m in tree["methods"])
+        # 条件请求：方法树未变化时服务器只返回 not_modified
+        result = await client.call("__system__", {"etag": tree["etag"]})
+        assert result == {"not_modified": True, "etag": tree["etag"]}
+        assert await client.get_server_methods() is tree
+        assert await client.get_server_methods(refresh=True) == tree
+
+    # 方法、中间件、路由器变化后重新生成，etag 随之改变
+    app = RPCServer("tree")
+    request = b'{"jsonrpc":"2.0","id":1,"method":"__system__","params":{}}'
+    etag = (await app.handle_request(request)).result["etag"]
+    assert (await app.handle_request(request)).result["etag"] == etag
+
+    router = RPCRouter("users")
+    app.include_router(router)
+    changed = (await app.handle_request(request)).result["etag"]
+    assert changed != etag
+
+    router.add_method(name="get")(lambda user_id: user_id)
+    response = await app.handle_request(request)
+    assert response.result["etag"] != changed
+    assert response.result["routers"]["users"]["methods"][0]["name"] == "get"
+    assert b'"etag":"%s"' % response.result["etag"].encode() in response.encode()
+
+
+async def test_result_cache():
+
+    async with RPCClient("cache", app="tests.test_server") as client:
+        first = await client.call("lookup", {"key": "a"})
+        assert await client.call("lookup", {"key": "a"}) == first
+        # max_entries=2：b、c 进入缓存后 a 被淘汰
+        await client.call("lookup", {"key": "b"})
+        await client.call("lookup", {"key": "c"})
+        assert (await client.call("lookup", {"key": "a"}))["calls"] > first["calls"]
+
+        # 显式失效
+        cached = await client.call("lookup", {"key": "c"})
+        assert await client.call("invalidate", {"key": "c"}) == 1
+        assert (await client.call("lookup", {"key": "c"}))["calls"] > cached["calls"]
+
+        # TTL 过期
+        cached = await client.call("lookup", {"key": "c"})
+        await asyncio.sleep(0.6)
+        assert (await client.call("lookup", {"key": "c"}))["calls"] > cached["calls"]
+
+        cache = (await client.call("__metrics__"))["cache"]["lookup"]
+        assert cache["hits"] == 3 and cache["misses"] == 6
+        assert cache["evictions"] == 2 and cache["expirations"] == 1
+        assert cache["entries"] == 2
+
+    # 路由器级策略由子路由器继承，方法可单独关闭；max_bytes 按结果字节数淘汰
+    app = RPCServer("cache")
+    users = RPCRouter("users", cache=CachePolicy(max_bytes=200))
+    admin = RPCRouter("admin")
+    calls = []
+    seen = []
+
+    # 缓存位于中间件之内：中间件每次都执行，命中时不执行方法
+    @app.add_middleware(label="记录请求")
+    async def record(request, call_next):
+        seen.append(request.method)
+        return await call_next(request)
+
+    @users.add_method(name="get")
+    def get_user(user_id: int) -> dict:
+        calls.append(user_id)
+        return {"id": user_id, "name": "x" * 50}
+
+    @admin.add_method(name="count", cache=False)
+    def count() -> int:
+        calls.append("count")
+        return len(calls)
+
+    admin.add_method(name="echo")(lambda text: text)
+    users.include_router(admin)
+    app.include_router(users)
+
+    def request(method: str, params: str) -> bytes:
+        return b'{"jsonrpc":"2.0","id":1,"method":"%s","params":%s}' % (
+            method.encode(),
+            params.encode(),
+        )
+
+    for user_id in (1, 1, 2, 3, 1):
+        await app.handle_request(request("users.get", '{"user_id":%d}' % user_id))
+    # 每个结果约 80 字节，只能保留两个：1 在 3 写入时被淘汰
+    assert calls == [1, 2, 3, 1]
+    assert seen == ["users.get"] * 5
+    assert app.result_cache.snapshot()["users.get"]["hits"] == 1
+    await app.handle_request(request("users.admin.count", "{}"))
+    await app.handle_request(request("users.admin.count", "{}"))
+    assert calls.count("count") == 2
+
+    # 按参数失效，方法路径可带服务器名称前缀
+    await app.handle_request(request("users.admin.echo", '{"text":"a"}'))
+    assert app.result_cache.snapshot()["users.admin.echo"]["entries"] == 1
+    assert app.invalidate_cache("cache.users.admin.echo", {"text": "a"}) == 1
+    assert app.invalidate_cache() == 2
+    assert set(app.result_cache.snapshot()) == {"users.get", "users.admin.echo"}
+
+
+@pytest.mark.skipif(os.name != "posix", reason="ForkServer 需要 POSIX（AF_UNIX SEQPACKET 与 send_fds）")
+async def test_fork_server():
+
+    fork_server = ForkServer("tests.test_server")
+    await fork_server.start()
+    try:
+        clients = [RPCClient(f"forked{i}", fork_server=fork_server) for i in range(4)]
+        await asyncio.gather(*(client.start() for client in clients))
+        results = await asyncio.gather(
+            *(client.call("hello", {"name": client.client_name}) for client in clients)
+        )
+        assert results == [f"hello forked{i} !" for i in range(4)]
+        assert len({client.process.pid for client in clients}) == 4
+
+        # 子进程中的进程池可以正常使用
+        assert await clients[0].call("square_sum", {"n": 100}) == 328350
+
+        process = clients[0].process
+        await asyncio.gather(*(client.stop() for client in clients))
+        assert process.returncode is not None
+
+        # 与派生服务预加载的应用不一致时报错
+        try:
+            await RPCClient("mismatch", "tests.other_server", fork_server=fork_server).start()
+            assert False, "should raise RuntimeError"
+        except RuntimeError:
+            pass
+
+        # 取消中的 spawn 关闭父进程一端的管道
+        if os.path.isdir("/proc/self/fd"):
+            open_fds = len(os.listdir("/proc/self/fd"))
+            for _ in range(3):
+                task = asyncio.ensure_future(fork_server.spawn())
+                await asyncio.sleep(0)
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+            assert len(os.listdir("/proc/self/fd")) == open_fds
+            # 控制通道按序送达：完成一次派生后，被取消请求派生的子进程都已登记；
+            # 这些子进程读到 EOF 后退出，等派生服务回收后再关闭
+            client = RPCClient("after-cancel", fork_server=fork_server)
+            await client.start()
+            await client.stop()
+            await asyncio.wait_for(
+                asyncio.gather(*fork_server._children.values()), timeout=10
+            )
+    finally:
+        await fork_server.close()
+    assert not fork_server.running
+
 
 if __name__ == "__main__":
     asyncio.run(test_client())
+    asyncio.run(test_read_loop_lines())
+    asyncio.run(test_raw_responses())
+    asyncio.run(test_send_frames())
+    asyncio.run(test_start_failure())
+    asyncio.run(test_stream_queue())
+    asyncio.run(test_stream_flow_control())
+    asyncio.run(test_credit_concurrency())
+    asyncio.run(test_credit_burst())
+    asyncio.run(test_metrics())
+    asyncio.run(test_method_tree_cache())
+    asyncio.run(test_result_cache())
+    if sys.platform != "win32":
+        asyncio.run(test_call_backpressure())
+        asyncio.run(test_fork_server())
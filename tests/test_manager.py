@@ -1,7 +1,8 @@
 import asyncio
 import sys
 from pathlib import Path
-from okstdio.client import RPCClient, ClientManager, BroadcastResult
+from okstdio.client import RPCClient, ClientManager, BroadcastResult, HashRing
+from okstdio.client import manager as manager_module
 from rich import print
 import logging
 
@@ -140,12 +141,202 @@ async def test_remove_and_stop():
     print("[green]test_remove_and_stop PASSED[/green]")
 
 
+async def test_warm_pool():
+    """测试预热池 acquire 与后台补充"""
+    async with ClientManager() as manager:
+        pool = manager.warm_pool(SERVER_MODULE, size=2, name_prefix="warm")
+        await pool.start()
+        assert pool.idle_count == 2
+
+        # 有空闲客户端时立即交出，并加入 manager
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        client = await pool.acquire()
+        assert loop.time() - started < 0.1
+        assert client.client_name in manager
+        assert await client.call("healthy") == {"status": "healthy"}
+
+        # 后台补足空闲数量
+        for _ in range(100):
+            if pool.idle_count == 2:
+                break
+            await asyncio.sleep(0.1)
+        assert pool.idle_count == 2
+
+        # 空闲期间退出的客户端被丢弃，由预热池持有的后台任务停止
+        dead = pool._idle[0]
+        dead.process.kill()
+        await dead.process.wait()
+        fresh = await pool.acquire()
+        assert fresh is not dead and dead.client_name not in manager
+        assert len(pool._stopping) == 1
+
+        # 超过空闲数量时等待新启动的客户端
+        clients = [await pool.acquire(timeout=10) for _ in range(3)]
+        assert len({c.client_name for c in clients + [client, fresh]}) == 5
+
+    # stop_all 同时关闭预热池，并等待后台停止任务完成
+    assert pool.idle_count == 0
+    assert not pool._stopping and dead.process is None
+    print("[green]test_warm_pool PASSED[/green]")
+
+
+async def test_warm_pool_failure():
+    """测试预热池后台启动失败时 acquire 不会一直等待，以及客户端名称不重复"""
+    async with ClientManager() as manager:
+        pool = manager.warm_pool("tests.no_such_server", size=1, name_prefix="broken")
+        try:
+            await pool.start()
+        except RuntimeError:
+            pass
+        else:
+            raise AssertionError("预热池应启动失败")
+
+        # 默认不超时：启动错误交给等待中的 acquire
+        try:
+            await asyncio.wait_for(pool.acquire(), timeout=20)
+        except RuntimeError as e:
+            assert "启动失败" in str(e)
+        else:
+            raise AssertionError("acquire 应抛出启动错误")
+        await pool.close()
+
+        # 前缀相同的预热池与 manager 中已有的客户端不重名
+        # 预先占用下一个将要生成的名称
+        taken = f"same-{next(manager_module._warm_client_ids) + 1}"
+        manager.add(taken, SERVER_MODULE)
+        first = manager.warm_pool(SERVER_MODULE, size=1, name_prefix="same")
+        second = manager.warm_pool(SERVER_MODULE, size=1, name_prefix="same")
+        clients = [await first.acquire(timeout=10), await second.acquire(timeout=10)]
+        names = [client.client_name for client in clients]
+        assert len(set(names)) == 2 and taken not in names
+        assert all(name in manager for name in names)
+
+    print("[green]test_warm_pool_failure PASSED[/green]")
+
+
+async def test_group():
+    """测试负载均衡客户端组"""
+    async with ClientManager() as manager:
+        for name in ("g1", "g2", "g3"):
+            manager.add(name, SERVER_MODULE)
+        await manager.start_all()
+
+        # round_robin：依次轮转
+        group = manager.group()
+        picked = [group.pick().client_name for _ in range(6)]
+        assert sorted(picked) == ["g1", "g1", "g2", "g2", "g3", "g3"]
+        assert picked[:3] != picked[1:4]
+
+        # least_outstanding：避开有未完成请求的客户端
+        group = manager.group(["g1", "g2"], strategy="least_outstanding")
+        slow = manager["g1"].call("sleep", {"seconds": 1})
+        assert group.pick().client_name == "g2"
+        assert await group.call("healthy") == {"status": "healthy"}
+        await slow
+
+        # p2c：并发调用分散到各客户端
+        group = manager.group(strategy="p2c")
+        results = await asyncio.gather(*(group.call("healthy") for _ in range(30)))
+        assert len(results) == 30
+
+        # 已停止的客户端被跳过
+        await manager["g3"].stop()
+        group = manager.group()
+        assert {group.pick().client_name for _ in range(6)} == {"g1", "g2"}
+
+        try:
+            manager.group(strategy="random")
+            assert False, "should raise ValueError"
+        except ValueError:
+            pass
+
+    print("[green]test_group PASSED[/green]")
+
+
+async def test_consistent_hash():
+    """测试一致性哈希分片"""
+    # 增删节点时只有约 1/N 的键改变归属
+    ring = HashRing([f"n{i}" for i in range(8)])
+    keys = range(10000)
+    before = {k: ring.get(k) for k in keys}
+    ring.remove("n3")
+    after = {k: ring.get(k) for k in keys}
+    moved = [k for k in keys if before[k] != after[k]]
+    assert all(before[k] == "n3" for k in moved)
+    assert len(moved) < len(keys) / 4
+
+    async with ClientManager() as manager:
+        for name in ("h1", "h2", "h3"):
+            manager.add(name, SERVER_MODULE)
+        await manager.start_all()
+
+        group = manager.group(strategy="consistent_hash", key_param="name")
+        # 同一个键总是路由到同一个客户端
+        owner = group.pick("张三").client_name
+        assert all(group.pick("张三").client_name == owner for _ in range(10))
+        assert await group.call("hello", {"name": "张三"}) == "hello 张三 !"
+        assert manager[owner].pending_count == 0
+
+        # 显式传入 key
+        assert group.pick(key=42).client_name == group.pick(42).client_name
+
+        # 所属客户端停止后沿哈希环选择下一个
+        await manager[owner].stop()
+        fallback = group.pick("张三").client_name
+        assert fallback != owner
+        assert await group.call("hello", {"name": "张三"}) == "hello 张三 !"
+
+        try:
+            group.call("healthy")
+            assert False, "should raise ValueError"
+        except ValueError:
+            pass
+
+    print("[green]test_consistent_hash PASSED[/green]")
+
+
+async def test_client_metrics():
+    """测试客户端请求耗时统计与汇总"""
+    async with ClientManager() as manager:
+        for i in range(2):
+            manager.add(f"timed{i}", SERVER_MODULE, metrics=True)
+        manager.add("untimed", SERVER_MODULE)
+        await manager.start_all()
+
+        for name in ("timed0", "timed1", "untimed"):
+            client = manager.get(name)
+            await asyncio.gather(*(client.call("hello") for _ in range(10)))
+            await client.call("block", {"seconds": 0.1}).then(lambda result: result)
+            await (await client.send("healthy"))
+
+        timings = manager.get("timed0").metrics.snapshot()["methods"]
+        assert timings["hello"]["calls"] == 10 and timings["hello"]["errors"] == 0
+        assert set(timings["hello"]["phases"]) == {"queue", "response", "resume", "total"}
+        assert set(timings["block"]["phases"]) >= {"then", "total"}
+        assert timings["block"]["phases"]["response"]["p50_ms"] >= 90
+        # send() 返回的 Future 没有 resume 阶段，total 在收到响应时记录
+        assert set(timings["healthy"]["phases"]) == {"queue", "response", "total"}
+        assert manager.get("untimed").metrics is None
+
+        # 汇总所有启用指标的客户端
+        combined = manager.metrics().snapshot()["methods"]
+        assert combined["hello"]["calls"] == 20
+        assert combined["block"]["phases"]["total"]["count"] == 2
+    print("[green]test_client_metrics PASSED[/green]")
+
+
 async def main():
     await test_add_remove()
     await test_start_stop_all()
     await test_broadcast()
     await test_send_to_and_call_to()
     await test_remove_and_stop()
+    await test_warm_pool()
+    await test_warm_pool_failure()
+    await test_group()
+    await test_consistent_hash()
+    await test_client_metrics()
     print("[bold green]All manager tests PASSED![/bold green]")
 
 
@@ -0,0 +1,160 @@
+import asyncio
+import json
+from okstdio.general.jsonrpc_model import (
+    JSONRPCError,
+    JSONRPCErrorDetail,
+    JSONRPCRequest,
+    JSONRPCResponse,
+)
+from okstdio.server import RPCRouter, RPCServer
+from okstdio.server.middleware import MiddlewareManager
+
+
+def request(method: str, params=None, id: int = 1) -> bytes:
+    message = {"jsonrpc": "2.0", "id": id, "method": method, "params": params or {}}
+    return json.dumps(message).encode()
+
+
+def recorder(name: str, calls: list):
+    """记录前后处理顺序的中间件"""
+
+    async def middleware(request, call_next):
+        calls.append(f"{name}>")
+        response = await call_next(request)
+        calls.append(f"<{name}")
+        return response
+
+    return middleware
+
+
+async def test_compose():
+
+    calls = []
+
+    async def handler(request):
+        calls.append("handler")
+        return JSONRPCResponse(id=request.id, result=request.method)
+
+    # 没有中间件时直接返回 handler
+    assert MiddlewareManager().compose(handler) is handler
+
+    manager = MiddlewareManager([recorder("mw1", calls), recorder("mw2", calls)])
+    chain = manager.compose(handler)
+    req = JSONRPCRequest(id=1, method="hello", params={})
+    assert (await chain(req)).result == "hello"
+    assert calls == ["mw1>", "mw2>", "handler", "<mw2", "<mw1"]
+
+    # 组合结果可以重复使用，之后添加的中间件不影响已组合的调用链
+    calls.clear()
+    manager.add(recorder("mw3", calls))
+    await chain(req)
+    assert calls == ["mw1>", "mw2>", "handler", "<mw2", "<mw1"]
+
+    calls.clear()
+    await manager.run(req, handler)
+    assert calls == ["mw1>", "mw2>", "mw3>", "handler", "<mw3", "<mw2", "<mw1"]
+
+
+async def test_route_order():
+
+    calls = []
+    app = RPCServer("mw_app")
+    router = RPCRouter(prefix="user")
+    nested = RPCRouter(prefix="admin")
+    sibling = RPCRouter(prefix="order")
+
+    app.add_middleware()(recorder("app", calls))
+    router.add_middleware()(recorder("router", calls))
+    nested.add_middleware()(recorder("nested", calls))
+
+    @router.add_method()
+    def get() -> str:
+        calls.append("get")
+        return "get"
+
+    @nested.add_method()
+    def ban() -> str:
+        calls.append("ban")
+        return "ban"
+
+    @sibling.add_method(name="list")
+    def list_orders() -> str:
+        calls.append("list")
+        return "list"
+
+    router.include_router(nested)
+    app.include_router(router)
+    app.include_router(sibling)
+
+    # 中间件按从根到叶的顺序执行
+    assert (await app.handle_request(request("user.admin.ban"))).result == "ban"
+    assert calls == ["app>", "router>", "nested>", "ban", "<nested", "<router", "<app"]
+
+    # 上级路由器的方法不经过子路由器的中间件
+    calls.clear()
+    await app.handle_request(request("mw_app.user.get"))
+    assert calls == ["app>", "router>", "get", "<router", "<app"]
+
+    # 兄弟路由器只经过应用中间件
+    calls.clear()
+    await app.handle_request(request("order.list"))
+    assert calls == ["app>", "list", "<app"]
+
+    # 系统方法不经过中间件
+    calls.clear()
+    await app.handle_request(request("__system__"))
+    assert calls == []
+
+    # 路由表构建后注册的中间件在下一次请求中生效
+    nested.add_middleware()(recorder("nested2", calls))
+
+    calls.clear()
+    await app.handle_request(request("user.admin.ban"))
+    assert calls == [
+        "app>", "router>", "nested>", "nested2>", "ban", "<nested2", "<nested", "<router", "<app",
+    ]
+
+
+async def test_short_circuit():
+
+    calls = []
+    app = RPCServer("mw_app")
+    router = RPCRouter(prefix="user")
+
+    app.add_middleware()(recorder("outer", calls))
+
+    @router.add_middleware()
+    async def auth(request, call_next):
+        # 拦截请求，不调用 call_next
+        if request.params.get("token") != "secret":
+            calls.append("denied")
+            return JSONRPCError(
+                id=request.id, error=JSONRPCErrorDetail(code=-32001, message="未授权")
+            )
+        return await call_next(request)
+
+    router.add_middleware()(recorder("inner", calls))
+
+    @router.add_method()
+    def get(token: str) -> str:
+        calls.append("get")
+        return "ok"
+
+    app.include_router(router)
+
+    # 被拦截时内层中间件和方法都不执行，外层中间件照常完成后处理
+    response = await app.handle_request(request("user.get", {"token": "wrong"}, id=3))
+    assert isinstance(response, JSONRPCError)
+    assert response.id == 3 and response.error.code == -32001
+    assert calls == ["outer>", "denied", "<outer"]
+
+    calls.clear()
+    response = await app.handle_request(request("user.get", {"token": "secret"}))
+    assert response.result == "ok"
+    assert calls == ["outer>", "inner>", "get", "<inner", "<outer"]
+
+
+if __name__ == "__main__":
+    asyncio.run(test_compose())
+    asyncio.run(test_route_order())
+    asyncio.run(test_short_circuit())
@@ -1,7 +1,9 @@
 import asyncio
 import sys
+import time
 from pathlib import Path
 from okstdio.server.application import RPCServer, RPCRouter, IOWrite
+from okstdio.server.cache import CachePolicy
 from okstdio.general.jsonrpc_model import (
     JSONRPCResponse,
     JSONRPCError,
@@ -26,6 +28,7 @@ from test_schema import TestTask, TestTaskMessage
 # 否则会干扰 JSON-RPC 通信
 FORMAT = "[%(asctime)s] %(levelname)s @%(name)s > %(message)s"
 DATEFMT = "%m-%d %H:%M:%S"
+Path(".logs").mkdir(exist_ok=True)
 LOG_HANDLER = RotatingFileHandler(
     filename=".logs/app.log",
     maxBytes=2 * 1024 * 1024,  # 2MB
@@ -44,7 +47,9 @@ SERVER_NAME = "test_server"
 
 logger = logging.getLogger(SERVER_NAME)
 
-app = RPCServer(SERVER_NAME, label="测试服务器", version="v1.0.0")
+app = RPCServer(
+    SERVER_NAME, label="测试服务器", version="v1.0.0", max_concurrency=16, metrics=True
+)
 
 
 @app.add_method(name="healthy", label="健康检查")
@@ -59,6 +64,26 @@ def hello(name: str = "World") -> str:
     return f"hello {name} !"
 
 
+@app.add_method(name="sleep", label="延时方法")
+async def sleep(seconds: float = 1.0) -> dict:
+    """延时指定秒数后返回"""
+    await asyncio.sleep(seconds)
+    return {"slept": seconds}
+
+
+@app.add_method(name="block", label="阻塞方法", executor="thread")
+def block(seconds: float = 1.0) -> dict:
+    """在线程池中阻塞指定秒数"""
+    time.sleep(seconds)
+    return {"blocked": seconds}
+
+
+@app.add_method(name="square_sum", label="平方和", executor="process")
+def square_sum(n: int) -> int:
+    """在进程池中计算 0..n-1 的平方和"""
+    return sum(i * i for i in range(n))
+
+
 async def background_task(
     task_id: Annotated[str, Field(description="任务的ID")],
     io_write: IOWrite,
@@ -88,6 +113,14 @@ async def test_background(io_write: IOWrite) -> TestTask:
     return task_info
 
 
+@app.add_method(name="burst", label="连续推送")
+async def burst(stream_id: str, count: int, io_write: IOWrite) -> int:
+    """不等待地向 stream_id 连续推送 count 条消息，结果依次为 0..count-1"""
+    for i in range(count):
+        await io_write.write({"id": stream_id, "result": i})
+    return count
+
+
 @app.add_method(name="test_error", label="测试错误")
 def test_error() -> JSONRPCServerErrorDetail:
     """测试错误"""
@@ -98,6 +131,63 @@ def test_error() -> JSONRPCServerErrorDetail:
         data={"param": "value"},
     )
 
+lookup_calls = 0
+
+
+@app.add_method(name="lookup", label="缓存的查询", cache=CachePolicy(ttl=0.5, max_entries=2))
+def lookup(key: str) -> dict:
+    """返回 key 与方法的执行次数，结果缓存 0.5 秒"""
+    global lookup_calls
+    lookup_calls += 1
+    return {"key": key, "calls": lookup_calls}
+
+
+@app.add_method(name="invalidate", label="使查询缓存失效")
+def invalidate(key: str | None = None) -> int:
+    """丢弃 lookup 的缓存结果，返回丢弃的数量"""
+    return app.invalidate_cache("lookup", None if key is None else {"key": key})
+
+
+notifications: list[str] = []
+
+
+@app.add_method(name="record", label="记录通知")
+def record(value: str) -> int:
+    """记录一条通知，返回已记录的数量"""
+    notifications.append(value)
+    return len(notifications)
+
+
+@app.add_method(name="recorded", label="已记录的通知")
+def recorded() -> list:
+    """返回已记录的通知"""
+    return notifications
+
+
+tools_router = RPCRouter("tools", label="工具路由")
+text_router = RPCRouter("text", label="文本路由")
+
+
+@tools_router.add_middleware(label="调用计数")
+async def count_middleware(request, call_next):
+    """记录工具路由的调用次数"""
+    count_middleware.calls += 1
+    return await call_next(request)
+
+
+count_middleware.calls = 0
+
+
+@text_router.add_method(name="upper", label="转大写")
+def upper(text: str) -> dict:
+    """转换为大写，并返回工具路由中间件的调用次数"""
+    return {"text": text.upper(), "calls": count_middleware.calls}
+
+
+tools_router.include_router(text_router)
+app.include_router(tools_router)
+
+
 if __name__ == "__main__":
     # print("开始启动测试服务器")
     app.runserver()
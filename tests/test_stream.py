@@ -0,0 +1,176 @@
+import asyncio
+import os
+import tempfile
+import time
+import pytest
+from okstdio.server import stream
+from okstdio.server.stream import PackStreamReader, PackStreamWriter
+
+
+def pipe_writer(**kwargs):
+    """创建写入管道的 PackStreamWriter，返回 (writer, 读端文件描述符)"""
+    read_fd, write_fd = os.pipe()
+    writer = PackStreamWriter(**kwargs)
+    writer.stdout = os.fdopen(write_fd, "wb", buffering=0)
+    return writer, read_fd
+
+
+def read_all(fd: int, delay: float = 0.0) -> bytes:
+    """读取管道直到 EOF，delay 模拟慢速读取方"""
+    data = bytearray()
+    while chunk := os.read(fd, 16 * 1024):
+        data += chunk
+        time.sleep(delay)
+    os.close(fd)
+    return bytes(data)
+
+
+async def drained(writer: PackStreamWriter) -> None:
+    """等待缓冲区全部写出"""
+    while writer._buffered:
+        await asyncio.sleep(0.01)
+
+
+async def test_coalescing(monkeypatch):
+
+    writev = os.writev
+    calls = []
+
+    def counting_writev(fd, buffers):
+        calls.append(len(buffers))
+        return writev(fd, buffers)
+
+    monkeypatch.setattr(stream.os, "writev", counting_writev)
+    writer, read_fd = pipe_writer()
+    reading = asyncio.ensure_future(asyncio.to_thread(read_all, read_fd))
+    # 同一次事件循环迭代中的写入合并为一次 writev
+    for i in range(100):
+        await writer.write(f"line {i}\n")
+    await writer.writelines([b'{"id":1}', b"\n"])
+    assert calls == []
+    await asyncio.sleep(0)
+    assert calls == [101 + 1]
+
+    # 达到 flush_threshold 时立即写出，不等到迭代结束
+    calls.clear()
+    await writer.write(b"x" * (writer.flush_threshold - 1) + b"\n")
+    assert len(calls) == 1
+
+    writer.close()
+    writer.stdout.close()
+    expected = "".join(f"line {i}\n" for i in range(100)).encode()
+    expected += b'{"id":1}\n' + b"x" * (writer.flush_threshold - 1) + b"\n"
+    assert await asyncio.wait_for(reading, timeout=10) == expected
+
+    # flush_interval 内的写入合并后再写出
+    calls.clear()
+    writer, read_fd = pipe_writer(flush_interval=0.05)
+    await writer.write(b"a\n")
+    await asyncio.sleep(0)
+    await writer.write(b"b\n")
+    await asyncio.sleep(0.01)
+    assert calls == []
+    await asyncio.sleep(0.1)
+    assert calls == [2]
+    writer.close()
+    writer.stdout.close()
+    assert read_all(read_fd) == b"a\nb\n"
+
+
+async def test_backpressure():
+
+    writer, read_fd = pipe_writer(high_water=256 * 1024)
+    lines = [f"{i:08d}".encode() * 8191 + b"\n" for i in range(64)]  # 每行 64 KiB
+
+    async def produce():
+        for line in lines:
+            await writer.write(line)
+
+    # 没有读取方时管道写满，缓冲超过 high_water 后 write 等待
+    producer = asyncio.ensure_future(produce())
+    await asyncio.sleep(0.2)
+    assert not producer.done()
+    assert writer._buffered > writer.high_water
+    assert writer._writer_active
+
+    # 慢速读取方读出数据后写入继续，输出保持顺序
+    reading = asyncio.ensure_future(asyncio.to_thread(read_all, read_fd, 0.001))
+    await asyncio.wait_for(producer, timeout=30)
+    writer.close()
+    writer.stdout.close()
+    assert await asyncio.wait_for(reading, timeout=30) == b"".join(lines)
+
+    # 对端关闭管道后，之后的写入抛出错误，不再阻塞
+    writer, read_fd = pipe_writer(high_water=64 * 1024)
+    os.close(read_fd)
+    await writer.write(b"lost\n")
+    await asyncio.sleep(0)
+    try:
+        await writer.write(b"x" * 128 * 1024)
+        assert False, "should raise BrokenPipeError"
+    except BrokenPipeError:
+        pass
+    writer.stdout.close()
+
+
+async def test_thread_fallback():
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "out.jsonl")
+        with open(path, "w", encoding="utf-8") as out:
+            writer = PackStreamWriter(flush_threshold=1024)
+            writer.stdout = out
+            await writer.write("你好\n")
+            # 普通文件不启用非阻塞写入，通过线程写出
+            assert writer._fd is None
+            for i in range(100):
+                await writer.write(f"{i}\n")
+            await asyncio.wait_for(drained(writer), timeout=10)
+            await writer.write(b"tail\n")
+            writer.close()
+        with open(path, encoding="utf-8") as f:
+            assert f.read() == "你好\n" + "".join(f"{i}\n" for i in range(100)) + "tail\n"
+
+
+def feed(reader: PackStreamReader, *chunks: bytes) -> list:
+    """按给定的数据块边界送入读取器，返回切分出的行"""
+    for chunk in chunks:
+        reader._feed(chunk)
+    lines = []
+    while not reader._queue.empty():
+        lines.append(reader._queue.get_nowait())
+    return lines
+
+
+def test_reader_lines():
+
+    reader = PackStreamReader(max_line_length=16)
+    # 一行跨越多个数据块
+    assert feed(reader, b'{"id":') == []
+    assert feed(reader, b"1,", b'"a":2}\n') == [b'{"id":1,"a":2}\n']
+    # 一个数据块中的多行，以及数据块末尾不完整的行
+    assert feed(reader, b"a\nbb\nccc\nd") == [b"a\n", b"bb\n", b"ccc\n"]
+    assert feed(reader, b"d\n") == [b"dd\n"]
+
+    # 超长的行被丢弃，之后的行照常送达：跨越多个数据块的超长行
+    assert feed(reader, b"x" * 10, b"x" * 10) == []
+    assert feed(reader, b"x" * 100, b"x\nok\n") == [b"ok\n"]
+    # 同一个数据块中完整到达的超长行
+    lines = feed(reader, b"y" * 17 + b"\n" + b"z" * 16 + b"\nok\n")
+    assert lines == [b"z" * 16 + b"\n", b"ok\n"]
+
+    # EOF：最后一行没有换行符时照常送达，之后是表示流结束的空字节
+    assert feed(reader, b"tail", b"") == [b"tail", b""]
+    assert reader._eof
+
+    # EOF 时正在丢弃的超长行不会送达
+    reader = PackStreamReader(max_line_length=16)
+    assert feed(reader, b"ok\n" + b"w" * 20, b"") == [b"ok\n", b""]
+
+
+if __name__ == "__main__":
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        asyncio.run(test_coalescing(monkeypatch))
+    asyncio.run(test_backpressure())
+    asyncio.run(test_thread_fallback())
+    test_reader_lines()